@@ -0,0 +1,82 @@
+"""
+Build time and query latency of an EntityGraph over a synthetic topology.
+
+The topology has hosts running process group instances, each serving one service, services calling a few other
+services and database services.
+
+Usage: python benchmarks/entity_graph.py [hosts]
+"""
+
+import random
+import sys
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from dynatrace.environment_v2.entity_graph import DIRECTION_OUT, EntityGraph
+from dynatrace.environment_v2.monitored_entities import Entity
+
+
+def _ref(entity_id):
+    return {"id": entity_id, "type": entity_id.rsplit("-", 1)[0]}
+
+
+def topology(hosts: int):
+    random.seed(1)
+    host_ids = [f"HOST-{i:016X}" for i in range(hosts)]
+    services = [f"SERVICE-{i:016X}" for i in range(hosts * 4)]
+    databases = [f"SERVICE-DB{i:014X}" for i in range(max(1, hosts // 10))]
+    entities = []
+    for i, service in enumerate(services):
+        host = host_ids[i % hosts]
+        process = f"PROCESS_GROUP_INSTANCE-{i:016X}"
+        calls = random.sample(services, 3) + random.sample(databases, 1)
+        entities.append(
+            {
+                "entityId": service,
+                "type": "SERVICE",
+                "displayName": f"service-{i}",
+                "fromRelationships": {"calls": [_ref(c) for c in calls], "runsOn": [_ref(process)], "runsOnHost": [_ref(host)]},
+                "toRelationships": {},
+            }
+        )
+        entities.append(
+            {"entityId": process, "type": "PROCESS_GROUP_INSTANCE", "displayName": f"process-{i}", "fromRelationships": {"isProcessOf": [_ref(host)]}, "toRelationships": {}}
+        )
+    for i, host in enumerate(host_ids):
+        entities.append({"entityId": host, "type": "HOST", "displayName": f"host-{i}", "fromRelationships": {}, "toRelationships": {}})
+    return [Entity(raw_element=raw) for raw in entities], services, databases
+
+
+def timed(function, repeat: int) -> float:
+    start = time.perf_counter()
+    for _ in range(repeat):
+        function()
+    return (time.perf_counter() - start) / repeat * 1e6
+
+
+def main():
+    hosts = int(sys.argv[1]) if len(sys.argv) > 1 else 5000
+    entities, services, databases = topology(hosts)
+
+    start = time.perf_counter()
+    graph = EntityGraph(entities)
+    print(f"{graph}: built in {time.perf_counter() - start:.2f}s")
+
+    service, database = services[len(services) // 2], databases[0]
+    print(f"{'query':<40}{'µs':>10}")
+    for name, query in (
+        ("neighbours(service)", lambda: graph.neighbours(service)),
+        ("neighbours(service, out, calls)", lambda: graph.neighbours(service, DIRECTION_OUT, labels="calls")),
+        ("callers(database)", lambda: graph.callers(database)),
+        ("bfs(service, depth=2, out, calls)", lambda: graph.bfs(service, 2, DIRECTION_OUT, labels="calls")),
+    ):
+        print(f"{name:<40}{timed(query, 200):>10.1f}")
+    start = time.perf_counter()
+    components = graph.connected_components()
+    print(f"connected_components: {len(components)} in {time.perf_counter() - start:.2f}s")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,96 @@
+"""
+Compares the HTTP/1.1 connection pool (the default transport) with the HTTP/2 transport on local test servers.
+
+Each request is answered after a fixed delay, simulating the latency of a tenant, and the requests are made by a pool
+of threads. The HTTP/1.1 transport needs one connection per concurrent request, HTTP/2 multiplexes them over one.
+The local servers do not use TLS, with a real tenant every new HTTP/1.1 connection also costs a TLS handshake.
+
+Requires the http2 extra (pip install dt[http2]).
+
+Usage: python benchmarks/http_transport.py [requests] [threads] [delay_ms]
+"""
+
+import socketserver
+import sys
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from http.server import BaseHTTPRequestHandler, HTTPServer
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from dynatrace.http_client import HttpClient
+from dynatrace.transport import HttpxTransport, RequestsTransport
+from test.h2_server import H2Server
+
+
+class ThreadingHTTPServer(socketserver.ThreadingMixIn, HTTPServer):
+    # http.server.ThreadingHTTPServer is only available from Python 3.7
+    daemon_threads = True
+
+
+class Http1Handler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+
+    def do_GET(self):
+        with self.server.lock:
+            self.server.connections.add(self.client_address)
+        time.sleep(self.server.delay)
+        body = b'{"ok": true}'
+        self.send_response(200)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, *args):
+        pass
+
+
+def http1_server(delay: float) -> ThreadingHTTPServer:
+    server = ThreadingHTTPServer(("127.0.0.1", 0), Http1Handler)
+    server.delay = delay
+    server.lock = threading.Lock()
+    server.connections = set()
+    server.url = f"http://127.0.0.1:{server.server_address[1]}"
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server
+
+
+def run(client: HttpClient, requests: int, threads: int) -> float:
+    start = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=threads) as executor:
+        for response in executor.map(lambda i: client.make_request(f"/api/v2/entities/HOST-{i}"), range(requests)):
+            response.json()
+    return time.perf_counter() - start
+
+
+def main():
+    requests = int(sys.argv[1]) if len(sys.argv) > 1 else 500
+    threads = int(sys.argv[2]) if len(sys.argv) > 2 else 50
+    delay = (int(sys.argv[3]) if len(sys.argv) > 3 else 20) / 1000
+
+    print(f"{requests} requests, {threads} threads, {delay * 1000:.0f}ms server latency")
+    print(f"{'transport':<32}{'seconds':>10}{'req/s':>10}{'connections':>14}")
+
+    server = http1_server(delay)
+    for pool_maxsize in (10, threads):
+        client = HttpClient(server.url, "token", transport=RequestsTransport(pool_maxsize=pool_maxsize))
+        with server.lock:
+            server.connections.clear()
+        elapsed = run(client, requests, threads)
+        client.close()
+        print(f"{f'HTTP/1.1 pool_maxsize={pool_maxsize}':<32}{elapsed:>10.2f}{requests / elapsed:>10.0f}{len(server.connections):>14}")
+    server.shutdown()
+
+    h2_server = H2Server(delay)
+    client = HttpClient(h2_server.url, "token", transport=HttpxTransport(http1=False))
+    elapsed = run(client, requests, threads)
+    client.close()
+    h2_server.close()
+    print(f"{'HTTP/2 (httpx)':<32}{elapsed:>10.2f}{requests / elapsed:>10.0f}{h2_server.connections:>14}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,48 @@
+"""
+Decoding and encoding throughput of the JSON codecs, over the API responses in test/mock_data.
+
+Every document is decoded and re-encoded `rounds` times with each codec, the json module and orjson (when installed).
+
+Usage: python benchmarks/json_codec.py [rounds]
+"""
+
+import sys
+import time
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(ROOT))
+
+from dynatrace.codec import CODEC_ORJSON, CODEC_STDLIB, get_codec, orjson
+
+
+def corpus():
+    return [path.read_bytes() for path in sorted((ROOT / "test" / "mock_data").glob("*.json"))]
+
+
+def measure(function, documents, rounds: int) -> float:
+    start = time.perf_counter()
+    for _ in range(rounds):
+        for document in documents:
+            function(document)
+    return time.perf_counter() - start
+
+
+def main():
+    rounds = int(sys.argv[1]) if len(sys.argv) > 1 else 50
+    raw = corpus()
+    total_mb = sum(len(document) for document in raw) * rounds / 1e6
+    print(f"{len(raw)} documents, {sum(len(document) for document in raw) / 1024:.0f} KB, {rounds} rounds")
+    print(f"{'codec':<10}{'decode MB/s':>14}{'encode MB/s':>14}")
+
+    names = [CODEC_STDLIB] + ([CODEC_ORJSON] if orjson is not None else [])
+    for name in names:
+        codec = get_codec(name)
+        parsed = [codec.loads(document) for document in raw]
+        decode = measure(codec.loads, raw, rounds)
+        encode = measure(codec.dumps, parsed, rounds)
+        print(f"{name:<10}{total_mb / decode:>14.0f}{total_mb / encode:>14.0f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,83 @@
+"""
+Measures the memory used per model object, for the classes that are usually created in large numbers.
+
+"before" is an equivalent class without __slots__ (each object has a __dict__) with every field decoded, as objects were
+built before slotted and lazily decoded models. "slots" is the shipped class, with only the listed fields read.
+"slots, no raw" is the shipped class listed with Dynatrace(..., keep_raw_elements=False): objects only keep the raw values
+of the fields not read yet, and each read field replaces its raw value. It only saves memory for the fields that are read
+(their decoded value no longer comes with its raw value) and for members no field is declared for: with only entity_id
+read, it is the same as "slots".
+
+Usage: python benchmarks/model_memory.py [amount_of_objects]
+"""
+
+import copy
+import gc
+import json
+import sys
+import tracemalloc
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from dynatrace.dynatrace_object import DynatraceObject, from_response
+from dynatrace.environment_v2.logs import LogRecord
+from dynatrace.environment_v2.monitored_entities import Entity
+
+MOCK_DATA = Path(__file__).resolve().parent.parent / "test" / "mock_data"
+
+
+class KeepRaw:
+    keep_raw_elements = True
+
+
+class DropRaw:
+    keep_raw_elements = False
+
+
+def dict_based(cls):
+    """The same model without __slots__, as it was before slotted models"""
+    namespace = {"_lazy_fields": cls.__dict__.get("_lazy_fields", {})}
+    if "_create_from_raw_data" in cls.__dict__:
+        namespace["_create_from_raw_data"] = cls.__dict__["_create_from_raw_data"]
+    return type(f"Dict{cls.__name__}", (DynatraceObject,), namespace)
+
+
+def measure(cls, http_client, raw_elements, read_attributes):
+    """Memory retained per object, including its raw element when it is kept"""
+    tracemalloc.start()
+    # Every object gets its own copy of the raw element, as they would when decoded from different responses
+    objects = [from_response(cls, http_client, {}, copy.deepcopy(raw)) for raw in raw_elements]
+    for obj in objects:
+        for attribute in read_attributes:
+            getattr(obj, attribute)
+    gc.collect()
+    size, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return size / len(objects)
+
+
+def main():
+    count = int(sys.argv[1]) if len(sys.argv) > 1 else 2000
+    entity = json.loads((MOCK_DATA / "GET_api_v2_entities_HOST-82F576674F19AC16_eeb2d99e8563a18.json").read_text())
+    entity.setdefault("type", "HOST")
+    log_record = json.loads((MOCK_DATA / "GET_api_v2_logs_export_8b3579556e13525.json").read_text())["results"][0]
+
+    small_entity = {key: entity[key] for key in ("entityId", "displayName", "type")}
+
+    cases = [
+        ("Entity, default fields, entity_id read", Entity, [small_entity] * count, ["entity_id"]),
+        ("Entity, all fields, entity_id read", Entity, [entity] * count, ["entity_id"]),
+        ("Entity, all fields, all read", Entity, [entity] * count, list(Entity._lazy_fields)),
+        ("LogRecord", LogRecord, [log_record] * count, []),
+    ]
+    print(f"{'bytes per object':<40}{'before':>12}{'slots':>12}{'slots, no raw':>16}")
+    for name, cls, raw_elements, attributes in cases:
+        before = measure(dict_based(cls), KeepRaw(), raw_elements, list(cls._lazy_fields))
+        slots = measure(cls, KeepRaw(), raw_elements, attributes)
+        no_raw = measure(cls, DropRaw(), raw_elements, attributes)
+        print(f"{name:<40}{before:>12.0f}{slots:>12.0f}{no_raw:>16.0f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,110 @@
+"""
+Bytes on the wire and end-to-end time of ingest requests, with and without gzip request compression.
+
+A local server receives the requests and decompresses gzip bodies, like the tenant does. Its reading of the body is
+slowed down to the given bandwidth, so the time saved by sending fewer bytes is included (on localhost the network is
+otherwise free and compression only costs CPU).
+
+Usage: python benchmarks/request_compression.py [requests] [bandwidth_mbit_s]
+"""
+
+import gzip
+import random
+import socketserver
+import sys
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, HTTPServer
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from dynatrace import Dynatrace
+from dynatrace.compression import RequestCompression
+
+
+class ThreadingHTTPServer(socketserver.ThreadingMixIn, HTTPServer):
+    # http.server.ThreadingHTTPServer is only available from Python 3.7
+    daemon_threads = True
+
+
+class IngestHandler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+
+    def do_POST(self):
+        length = int(self.headers.get("content-length", 0))
+        body = self.rfile.read(length)
+        if self.server.bandwidth:
+            time.sleep(length * 8 / self.server.bandwidth)
+        if self.headers.get("content-encoding") == "gzip":
+            body = gzip.decompress(body)
+        with self.server.lock:
+            self.server.wire_bytes += length
+            self.server.payload_bytes += len(body)
+        response = b'{"linesOk": 0, "linesInvalid": 0}'
+        self.send_response(202)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(response)))
+        self.end_headers()
+        self.wfile.write(response)
+
+    def log_message(self, *args):
+        pass
+
+
+def log_payload(count: int):
+    levels = ["INFO", "WARN", "ERROR"]
+    return [
+        {
+            "timestamp": 1650000000000 + i,
+            "content": f"{levels[i % 3]} [worker-{i % 8}] request /api/v2/entities/HOST-{random.randint(0, 5000)} handled in {random.randint(1, 900)}ms",
+            "log.source": "/var/log/app/service.log",
+            "dt.entity.host": f"HOST-{i % 50:016X}",
+            "severity": levels[i % 3].lower(),
+        }
+        for i in range(count)
+    ]
+
+
+def metric_payload(count: int) -> bytes:
+    lines = [
+        f"custom.service.requests,service=checkout,endpoint=/api/v{i % 3}/orders,status={200 + (i % 4) * 100} count,delta={random.randint(1, 100)}"
+        for i in range(count)
+    ]
+    return "\n".join(lines).encode("utf-8")
+
+
+def run(server, compression, requests: int):
+    with server.lock:
+        server.wire_bytes = server.payload_bytes = 0
+    with Dynatrace(server.url, "token", compression=compression) as dt:
+        logs = log_payload(1000)
+        lines = metric_payload(1000)
+        start = time.perf_counter()
+        for _ in range(requests):
+            dt.logs.ingest(logs)
+            dt.metrics.ingest(lines.decode().split("\n"))
+        elapsed = time.perf_counter() - start
+    return elapsed, server.wire_bytes, server.payload_bytes
+
+
+def main():
+    requests = int(sys.argv[1]) if len(sys.argv) > 1 else 20
+    bandwidth = float(sys.argv[2]) * 1_000_000 if len(sys.argv) > 2 else 50_000_000
+
+    server = ThreadingHTTPServer(("127.0.0.1", 0), IngestHandler)
+    server.lock = threading.Lock()
+    server.bandwidth = bandwidth
+    server.url = f"http://127.0.0.1:{server.server_address[1]}"
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+
+    print(f"{requests} x (1000 log records + 1000 metric lines), {bandwidth / 1e6:.0f} Mbit/s")
+    print(f"{'compression':<16}{'seconds':>10}{'wire KB':>12}{'payload KB':>12}{'ratio':>8}")
+    for name, compression in (("none", None), ("gzip level 1", RequestCompression(level=1)), ("gzip level 6", RequestCompression(level=6))):
+        elapsed, wire, payload = run(server, compression, requests)
+        print(f"{name:<16}{elapsed:>10.2f}{wire / 1024:>12.0f}{payload / 1024:>12.0f}{wire / payload:>8.2f}")
+    server.shutdown()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,2 @@
+from dynatrace.aio.main import AsyncDynatrace
+from dynatrace.aio.http_client import AsyncHttpClient
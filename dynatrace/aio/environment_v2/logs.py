@@ -0,0 +1,53 @@
+"""
+Copyright 2021 Dynatrace LLC
+
+Licensed under the Apache License, Version 2.0 (the "License");
+you may not use this file except in compliance with the License.
+You may obtain a copy of the License at
+
+    http://www.apache.org/licenses/LICENSE-2.0
+
+Unless required by applicable law or agreed to in writing, software
+distributed under the License is distributed on an "AS IS" BASIS,
+WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+See the License for the specific language governing permissions and
+limitations under the License.
+"""
+
+from datetime import datetime
+from typing import Any, Dict, List, Optional, Union
+
+from dynatrace.aio.http_client import AsyncHttpClient
+from dynatrace.aio.pagination import AsyncPaginatedList
+from dynatrace.environment_v2.logs import LogRecord, LogService as SyncLogService
+from dynatrace.utils import timestamp_to_string
+
+
+class LogService:
+    ENDPOINT = SyncLogService.ENDPOINT
+
+    def __init__(self, http_client: AsyncHttpClient):
+        self.__http_client = http_client
+
+    def export(
+        self,
+        query: Optional[str] = None,
+        time_from: Optional[Union[datetime, str]] = None,
+        time_to: Optional[Union[datetime, str]] = None,
+        sort: Optional[str] = None,
+        page_size: Optional[int] = None,
+    ) -> AsyncPaginatedList[LogRecord]:
+        """Gets the log records matching the provided criteria. Retrieves all records using pagination."""
+        params = {
+            "query": query,
+            "pageSize": page_size,
+            "from": timestamp_to_string(time_from),
+            "to": timestamp_to_string(time_to),
+            "sort": sort,
+        }
+        return AsyncPaginatedList(LogRecord, self.__http_client, f"{self.ENDPOINT}/export", params, list_item="results")
+
+    async def ingest(self, payload: Union[Dict[str, Any], List[Dict[str, Any]]]):
+        """Ingests logs into the Dynatrace log store."""
+        headers = {"Content-Type": "application/json; charset=utf-8"}
+        return await self.__http_client.make_request(f"{self.ENDPOINT}/ingest", params=payload, method="POST", headers=headers)
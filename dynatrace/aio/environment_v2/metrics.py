@@ -0,0 +1,80 @@
+"""
+Copyright 2021 Dynatrace LLC
+
+Licensed under the Apache License, Version 2.0 (the "License");
+you may not use this file except in compliance with the License.
+You may obtain a copy of the License at
+
+    http://www.apache.org/licenses/LICENSE-2.0
+
+Unless required by applicable law or agreed to in writing, software
+distributed under the License is distributed on an "AS IS" BASIS,
+WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+See the License for the specific language governing permissions and
+limitations under the License.
+"""
+
+from datetime import datetime
+from typing import List, Optional, Union
+
+from dynatrace.aio.http_client import AsyncHttpClient
+from dynatrace.aio.pagination import AsyncPaginatedList
+from dynatrace.environment_v2.metrics import MetricDescriptor, MetricSeriesCollection
+from dynatrace.utils import timestamp_to_string
+
+
+class MetricService:
+    def __init__(self, http_client: AsyncHttpClient):
+        self.__http_client = http_client
+
+    def query(
+        self,
+        metric_selector: str,
+        resolution: str = None,
+        time_from: Optional[Union[datetime, str]] = None,
+        time_to: Optional[Union[datetime, str]] = None,
+        entity_selector: Optional[str] = None,
+        mz_selector: Optional[str] = None,
+    ) -> AsyncPaginatedList[MetricSeriesCollection]:
+        params = {
+            "metricSelector": metric_selector,
+            "resolution": resolution,
+            "from": timestamp_to_string(time_from),
+            "to": timestamp_to_string(time_to),
+            "entitySelector": entity_selector,
+            "mzSelector": mz_selector,
+        }
+        return AsyncPaginatedList(MetricSeriesCollection, self.__http_client, "/api/v2/metrics/query", params, list_item="result")
+
+    def list(
+        self,
+        metric_selector: Optional[str] = None,
+        text: Optional[str] = None,
+        fields: Optional[str] = None,
+        written_since: Optional[Union[str, datetime]] = None,
+        metadata_selector: Optional[str] = None,
+        page_size=100,
+    ) -> AsyncPaginatedList[MetricDescriptor]:
+        params = {
+            "pageSize": page_size,
+            "metricSelector": metric_selector,
+            "text": text,
+            "fields": fields,
+            "writtenSince": timestamp_to_string(written_since),
+            "metadataSelector": metadata_selector,
+        }
+        return AsyncPaginatedList(MetricDescriptor, self.__http_client, "/api/v2/metrics", params, list_item="metrics")
+
+    async def get(self, metric_id: str) -> MetricDescriptor:
+        response = await self.__http_client.make_request(f"/api/v2/metrics/{metric_id}")
+        return MetricDescriptor(http_client=self.__http_client, raw_element=response.json())
+
+    async def delete(self, metric_id):
+        return await self.__http_client.make_request(f"/api/v2/metrics/{metric_id}", method="DELETE")
+
+    async def ingest(self, lines: List[str]):
+        lines = "\n".join(lines).encode("utf-8")
+        response = await self.__http_client.make_request(
+            f"/api/v2/metrics/ingest", method="POST", data=lines, headers={"Content-Type": "text/plain; charset=utf-8"}
+        )
+        return response.json()
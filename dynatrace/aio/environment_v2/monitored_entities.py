@@ -0,0 +1,73 @@
+"""
+Copyright 2021 Dynatrace LLC
+
+Licensed under the Apache License, Version 2.0 (the "License");
+you may not use this file except in compliance with the License.
+You may obtain a copy of the License at
+
+    http://www.apache.org/licenses/LICENSE-2.0
+
+Unless required by applicable law or agreed to in writing, software
+distributed under the License is distributed on an "AS IS" BASIS,
+WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+See the License for the specific language governing permissions and
+limitations under the License.
+"""
+
+from datetime import datetime
+from typing import Optional, Union
+
+from dynatrace.aio.http_client import AsyncHttpClient
+from dynatrace.aio.pagination import AsyncPaginatedList
+from dynatrace.environment_v2.monitored_entities import Entity, EntityService as SyncEntityService, EntityType
+from dynatrace.utils import timestamp_to_string
+
+
+class EntityService:
+    ENDPOINT_ENTITIES = SyncEntityService.ENDPOINT_ENTITIES
+    ENDPOINT_TYPES = SyncEntityService.ENDPOINT_TYPES
+
+    def __init__(self, http_client: AsyncHttpClient):
+        self.__http_client = http_client
+
+    def list(
+        self,
+        entity_selector: str,
+        time_from: Optional[Union[datetime, str]] = None,
+        time_to: Optional[Union[datetime, str]] = None,
+        fields: Optional[str] = None,
+        sort: Optional[str] = None,
+        page_size: Optional[int] = None,
+    ) -> AsyncPaginatedList[Entity]:
+        """Gets the information about monitored entities. See EntityService.list for the parameters."""
+        params = {
+            "pageSize": page_size,
+            "entitySelector": entity_selector,
+            "from": timestamp_to_string(time_from),
+            "to": timestamp_to_string(time_to),
+            "fields": fields,
+            "sort": sort,
+        }
+        return AsyncPaginatedList(Entity, self.__http_client, self.ENDPOINT_ENTITIES, target_params=params, list_item="entities")
+
+    async def get(
+        self,
+        entity_id: str,
+        time_from: Optional[Union[datetime, str]] = None,
+        time_to: Optional[Union[datetime, str]] = None,
+        fields: Optional[str] = None,
+    ) -> Entity:
+        """Gets the properties of the specified monitored entity."""
+        params = {"from": timestamp_to_string(time_from), "to": timestamp_to_string(time_to), "fields": fields}
+        response = await self.__http_client.make_request(f"{self.ENDPOINT_ENTITIES}/{entity_id}", params=params)
+        return Entity(raw_element=response.json())
+
+    def list_types(self, page_size: Optional[int] = 50) -> AsyncPaginatedList[EntityType]:
+        """Gets a list of properties for all entity types"""
+        params = {"pageSize": page_size}
+        return AsyncPaginatedList(EntityType, self.__http_client, self.ENDPOINT_TYPES, params, list_item="types")
+
+    async def get_type(self, entity_type: str) -> EntityType:
+        """Gets the properties of a specified entity type."""
+        response = await self.__http_client.make_request(path=f"{self.ENDPOINT_TYPES}/{entity_type}")
+        return EntityType(raw_element=response.json())
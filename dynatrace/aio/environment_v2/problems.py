@@ -0,0 +1,71 @@
+"""
+Copyright 2021 Dynatrace LLC
+
+Licensed under the Apache License, Version 2.0 (the "License");
+you may not use this file except in compliance with the License.
+You may obtain a copy of the License at
+
+    http://www.apache.org/licenses/LICENSE-2.0
+
+Unless required by applicable law or agreed to in writing, software
+distributed under the License is distributed on an "AS IS" BASIS,
+WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+See the License for the specific language governing permissions and
+limitations under the License.
+"""
+
+from datetime import datetime
+from typing import Optional, Union
+
+from dynatrace.aio.http_client import AsyncHttpClient
+from dynatrace.aio.pagination import AsyncPaginatedList
+from dynatrace.environment_v2.problems import Comment, Problem, ProblemCloseResult, ProblemService as SyncProblemService
+
+
+class ProblemService:
+    ENDPOINT = SyncProblemService.ENDPOINT
+
+    def __init__(self, http_client: AsyncHttpClient):
+        self.__http_client = http_client
+
+    def list(
+        self,
+        problem_selector: Optional[str] = None,
+        entity_selector: Optional[str] = None,
+        fields: Optional[str] = None,
+        time_from: Optional[Union[datetime, str]] = None,
+        time_to: Optional[Union[datetime, str]] = None,
+        sort: Optional[str] = None,
+        page_size: Optional[int] = None,
+    ) -> AsyncPaginatedList[Problem]:
+        """Gets a list of Problems based on the given criteria."""
+        params = {
+            "problemSelector": problem_selector,
+            "entitySelector": entity_selector,
+            "fields": fields,
+            "from": time_from,
+            "to": time_to,
+            "sort": sort,
+            "pageSize": page_size,
+        }
+        return AsyncPaginatedList(Problem, self.__http_client, self.ENDPOINT, target_params=params, list_item="problems")
+
+    async def get(self, problem_id: str, fields: Optional[str] = None) -> Problem:
+        """Gets a Problem by specifying its id."""
+        response = await self.__http_client.make_request(path=f"{self.ENDPOINT}/{problem_id}", params={"fields": fields})
+        return Problem(raw_element=response.json())
+
+    async def close(self, problem_id: str, message: str) -> ProblemCloseResult:
+        """Closes an open Problem leaving a closing message as comment"""
+        response = await self.__http_client.make_request(path=f"{self.ENDPOINT}/{problem_id}/close", method="POST", params={"message": message})
+        return ProblemCloseResult(raw_element=response.json())
+
+    def list_comments(self, problem_id: str, page_size: Optional[int] = 10) -> AsyncPaginatedList[Comment]:
+        """Gets a list of comments belonging to a given Problem."""
+        params = {"pageSize": page_size}
+        return AsyncPaginatedList(Comment, self.__http_client, f"{self.ENDPOINT}/{problem_id}/comments", target_params=params, list_item="comments")
+
+    async def get_comment(self, problem_id: str, comment_id: str) -> Comment:
+        """Gets a specific Comment from a specific Problem"""
+        response = await self.__http_client.make_request(path=f"{self.ENDPOINT}/{problem_id}/comments/{comment_id}")
+        return Comment(raw_element=response.json())
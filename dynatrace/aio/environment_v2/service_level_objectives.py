@@ -0,0 +1,78 @@
+"""
+Copyright 2021 Dynatrace LLC
+
+Licensed under the Apache License, Version 2.0 (the "License");
+you may not use this file except in compliance with the License.
+You may obtain a copy of the License at
+
+    http://www.apache.org/licenses/LICENSE-2.0
+
+Unless required by applicable law or agreed to in writing, software
+distributed under the License is distributed on an "AS IS" BASIS,
+WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+See the License for the specific language governing permissions and
+limitations under the License.
+"""
+
+from datetime import datetime
+from typing import Optional, Union
+
+from dynatrace.aio.http_client import AsyncHttpClient
+from dynatrace.aio.pagination import AsyncPaginatedList
+from dynatrace.environment_v2.service_level_objectives import Slo, SloService as SyncSloService
+from dynatrace.utils import timestamp_to_string
+
+
+class SloService:
+    ENDPOINT = SyncSloService.ENDPOINT
+
+    def __init__(self, http_client: AsyncHttpClient):
+        self.__http_client = http_client
+
+    def list(
+        self,
+        page_size: Optional[int] = 10,
+        time_from: Optional[Union[datetime, str]] = "now-2w",
+        time_to: Optional[Union[datetime, str]] = None,
+        slo_selector: Optional[str] = None,
+        sort: Optional[str] = "name",
+        time_frame: Optional[str] = "CURRENT",
+        page_idx: Optional[int] = 1,
+        demo: Optional[bool] = False,
+        evaluate: Optional[str] = "false",
+        enabled_slos: Optional[str] = "all",
+    ) -> AsyncPaginatedList[Slo]:
+        """Lists all available SLOs along with calculated values. See SloService.list for the parameters."""
+        params = {
+            "pageSize": page_size,
+            "from": timestamp_to_string(time_from),
+            "to": timestamp_to_string(time_to),
+            "sloSelector": slo_selector,
+            "sort": sort,
+            "timeFrame": time_frame,
+            "pageIdx": page_idx,
+            "demo": demo,
+            "evaluate": evaluate,
+            "enabledSlos": enabled_slos,
+        }
+        return AsyncPaginatedList(Slo, self.__http_client, self.ENDPOINT, target_params=params, list_item="slo")
+
+    async def get(
+        self,
+        slo_id: str,
+        time_from: Optional[Union[datetime, str]] = "now-2w",
+        time_to: Optional[Union[datetime, str]] = None,
+        time_frame: Optional[str] = "CURRENT",
+    ) -> Slo:
+        """Gets parameters and the calculated value of an SLO"""
+        params = {
+            "from": timestamp_to_string(time_from),
+            "to": timestamp_to_string(time_to),
+            "timeFrame": time_frame,
+        }
+        response = await self.__http_client.make_request(f"{self.ENDPOINT}/{slo_id}", params=params)
+        return Slo(raw_element=response.json())
+
+    async def delete(self, slo_id: str):
+        """Deletes an SLO"""
+        return await self.__http_client.make_request(path=f"{self.ENDPOINT}/{slo_id}", method="DELETE")
@@ -0,0 +1,85 @@
+"""
+Copyright 2021 Dynatrace LLC
+
+Licensed under the Apache License, Version 2.0 (the "License");
+you may not use this file except in compliance with the License.
+You may obtain a copy of the License at
+
+    http://www.apache.org/licenses/LICENSE-2.0
+
+Unless required by applicable law or agreed to in writing, software
+distributed under the License is distributed on an "AS IS" BASIS,
+WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+See the License for the specific language governing permissions and
+limitations under the License.
+"""
+
+from typing import List, Optional, Union
+
+from dynatrace.aio.http_client import AsyncHttpClient
+from dynatrace.aio.pagination import AsyncPaginatedList
+from dynatrace.environment_v2.settings import (
+    SchemaStub,
+    SettingService as SyncSettingService,
+    SettingsObject,
+    SettingsObjectCreate,
+    SettingsObjectUpdate,
+)
+
+
+class SettingService:
+    OBJECTS_ENDPOINT = SyncSettingService.OBJECTS_ENDPOINT
+    SCHEMAS_ENDPOINT = SyncSettingService.SCHEMAS_ENDPOINT
+
+    def __init__(self, http_client: AsyncHttpClient):
+        self.__http_client = http_client
+
+    def list_schemas(self) -> AsyncPaginatedList[SchemaStub]:
+        """Lists all settings schemas available in your environment"""
+        return AsyncPaginatedList(SchemaStub, self.__http_client, target_url=self.SCHEMAS_ENDPOINT, list_item="items")
+
+    def list_objects(
+        self,
+        schema_id: Optional[str] = None,
+        scope: Optional[str] = None,
+        external_ids: Optional[str] = None,
+        fields: Optional[str] = None,
+        filter: Optional[str] = None,
+        sort: Optional[str] = None,
+        page_size: Optional[str] = None,
+    ) -> AsyncPaginatedList[SettingsObject]:
+        """Lists settings"""
+        params = {
+            "schemaIds": schema_id,
+            "scope": scope,
+            "fields": fields,
+            "externalIds": external_ids,
+            "filter": filter,
+            "sort": sort,
+            "pageSize": page_size,
+        }
+        return AsyncPaginatedList(SettingsObject, self.__http_client, target_url=self.OBJECTS_ENDPOINT, list_item="items", target_params=params)
+
+    async def create_object(self, validate_only: Optional[bool] = False, body: Union[List[SettingsObjectCreate], SettingsObjectCreate] = None):
+        """Creates a new settings object or validates the provided settings object"""
+        if body is None:
+            body = []
+        if isinstance(body, SettingsObjectCreate):
+            body = [body]
+        response = await self.__http_client.make_request(
+            self.OBJECTS_ENDPOINT, params=[o.json() for o in body], method="POST", query_params={"validateOnly": validate_only}
+        )
+        return response.json()
+
+    async def get_object(self, object_id: str) -> SettingsObject:
+        """Gets parameters of specified settings object"""
+        response = await self.__http_client.make_request(f"{self.OBJECTS_ENDPOINT}/{object_id}")
+        return SettingsObject(raw_element=response.json())
+
+    async def update_object(self, object_id: str, body: SettingsObjectUpdate):
+        """Updates an existing settings object"""
+        return await self.__http_client.make_request(f"{self.OBJECTS_ENDPOINT}/{object_id}", params=body.json(), method="PUT")
+
+    async def delete_object(self, object_id: str, update_token: Optional[str] = None):
+        """Deletes the specified object"""
+        return await self.__http_client.make_request(f"{self.OBJECTS_ENDPOINT}/{object_id}", method="DELETE", query_params={"updateToken": update_token})
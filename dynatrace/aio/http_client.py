@@ -0,0 +1,153 @@
+"""
+Copyright 2021 Dynatrace LLC
+
+Licensed under the Apache License, Version 2.0 (the "License");
+you may not use this file except in compliance with the License.
+You may obtain a copy of the License at
+
+    http://www.apache.org/licenses/LICENSE-2.0
+
+Unless required by applicable law or agreed to in writing, software
+distributed under the License is distributed on an "AS IS" BASIS,
+WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+See the License for the specific language governing permissions and
+limitations under the License.
+"""
+import asyncio
+import json
+import logging
+from typing import Dict, Optional, Any, Union
+
+try:
+    import httpx
+except ImportError:  # pragma: no cover - optional dependency
+    httpx = None
+
+from dynatrace.http_client import TOO_MANY_REQUESTS_WAIT, DynatraceHttpError
+from dynatrace.rate_limiter import RateLimiter, get_rate_limiter
+from dynatrace.retry import RetryPolicy, parse_retry_after
+
+
+class AsyncHttpClient:
+    """asyncio counterpart of HttpClient, backed by an httpx.AsyncClient.
+
+    At most `max_concurrency` requests are in flight at the same time for a tenant, further requests wait for a free slot.
+    Install the optional dependency with `pip install dt[async]`.
+    """
+
+    def __init__(
+        self,
+        base_url: str,
+        token: str,
+        log: logging.Logger = None,
+        proxies: Dict = None,
+        too_many_requests_strategy=None,
+        retries: int = 0,
+        retry_delay_ms: int = 0,
+        print_bodies: bool = False,
+        timeout: Optional[int] = None,
+        max_concurrency: int = 10,
+        transport: Optional["httpx.AsyncBaseTransport"] = None,
+        rate_limiter: Union[bool, RateLimiter, None] = None,
+        retry_policy: Optional[RetryPolicy] = None,
+    ):
+        if httpx is None:
+            raise ImportError("The async client requires httpx, install it with 'pip install dt[async]'")
+
+        while base_url.endswith("/"):
+            base_url = base_url[:-1]
+        self.base_url = base_url
+
+        self.auth_header = {"Authorization": f"Api-Token {token}"}
+        self.print_bodies = print_bodies
+        self.log = log
+        if self.log is None:
+            self.log = logging.getLogger(__name__)
+            self.log.setLevel(logging.WARNING)
+
+        self.too_many_requests_strategy = too_many_requests_strategy
+        # Same statuses, backoff and statistics as HttpClient, see RetryPolicy
+        if retry_policy is None:
+            retry_policy = RetryPolicy(max_retries=retries, base_delay_ms=retry_delay_ms)
+        self.retry_policy = retry_policy
+        self.max_concurrency = max_concurrency
+        # Shared with the sync clients of the same tenant when True, see HttpClient
+        if rate_limiter is True:
+            rate_limiter = get_rate_limiter(base_url)
+        self.rate_limiter: Optional[RateLimiter] = rate_limiter or None
+        self.__semaphore: Optional[asyncio.Semaphore] = None
+
+        limits = httpx.Limits(max_connections=max_concurrency, max_keepalive_connections=max_concurrency)
+        if transport is None:
+            # httpx only retries failed connections here, statuses are retried by the policy
+            transport = httpx.AsyncHTTPTransport(verify=False, limits=limits, retries=retry_policy.max_retries)
+        mounts = {f"{scheme}://": httpx.AsyncHTTPTransport(proxy=proxy, verify=False, limits=limits) for scheme, proxy in (proxies or {}).items()}
+        self.client = httpx.AsyncClient(transport=transport, mounts=mounts or None, timeout=timeout, verify=False)
+
+    @property
+    def semaphore(self) -> asyncio.Semaphore:
+        # Created lazily, so that it belongs to the event loop that makes the requests
+        if self.__semaphore is None:
+            self.__semaphore = asyncio.Semaphore(self.max_concurrency)
+        return self.__semaphore
+
+    async def close(self):
+        """Closes the underlying httpx client, releasing all pooled connections."""
+        await self.client.aclose()
+
+    async def make_request(
+        self, path: str, params: Optional[Any] = None, headers: Optional[Dict] = None, method="GET", data=None, files=None, query_params=None
+    ) -> "httpx.Response":
+        url = f"{self.base_url}{path}"
+
+        body = None
+        if method in ["POST", "PUT"]:
+            body = params
+            params = query_params
+
+        if params is not None and isinstance(params, dict):
+            # requests silently drops None values, httpx would send them as empty strings
+            params = {key: value for key, value in params.items() if value is not None}
+
+        # A new dict for every request, the caller's headers may be shared with other requests and coroutines
+        headers = dict(headers) if headers else {}
+        if files is None and "content-type" not in [key.lower() for key in headers.keys()]:
+            headers["content-type"] = "application/json"
+        headers.update(self.auth_header)
+
+        self.log.debug("Making %s request to '%s' with params %s and body: %s", method, url, params, body)
+        if self.print_bodies:
+            print(method, url)
+            if body:
+                print(json.dumps(body, indent=2))
+
+        retry = self.retry_policy.start(method, path)
+        async with self.semaphore:
+            while True:
+                if self.rate_limiter is not None:
+                    wait = self.rate_limiter.reserve()
+                    if wait > 0:
+                        await asyncio.sleep(wait)
+                r = await self.client.request(method, url, headers=headers, params=params, json=body, content=data, files=files)
+                self.log.debug("Received response '%s'", r)
+                if self.rate_limiter is not None:
+                    self.rate_limiter.update_from_headers(r.headers)
+
+                if r.status_code < 400:
+                    retry.finish()
+                    break
+                if r.status_code == 429 and self.too_many_requests_strategy == TOO_MANY_REQUESTS_WAIT:
+                    sleep_amount = parse_retry_after(r.headers.get("retry-after"))
+                    sleep_amount = 5 if sleep_amount is None else sleep_amount
+                    self.log.warning(f"Sleeping for {sleep_amount}s because we have received an HTTP 429")
+                else:
+                    sleep_amount = retry.next_delay(r.status_code, r.headers)
+                    if sleep_amount is None:
+                        break
+                    self.log.warning(f"Retrying {method} {url} in {sleep_amount:.2f}s after an HTTP {r.status_code} (retry {retry.retries})")
+                await asyncio.sleep(sleep_amount)
+
+        if r.status_code >= 400:
+            raise DynatraceHttpError(f"Error making request to {url}: {r}. Response: {r.text}", r)
+
+        return r
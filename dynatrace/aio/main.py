@@ -0,0 +1,73 @@
+"""
+Copyright 2021 Dynatrace LLC
+
+Licensed under the Apache License, Version 2.0 (the "License");
+you may not use this file except in compliance with the License.
+You may obtain a copy of the License at
+
+    http://www.apache.org/licenses/LICENSE-2.0
+
+Unless required by applicable law or agreed to in writing, software
+distributed under the License is distributed on an "AS IS" BASIS,
+WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+See the License for the specific language governing permissions and
+limitations under the License.
+"""
+
+import logging
+from typing import Dict, Optional, Union
+
+from dynatrace.aio.environment_v2.logs import LogService
+from dynatrace.aio.environment_v2.metrics import MetricService
+from dynatrace.aio.environment_v2.monitored_entities import EntityService
+from dynatrace.aio.environment_v2.problems import ProblemService
+from dynatrace.aio.environment_v2.service_level_objectives import SloService
+from dynatrace.aio.environment_v2.settings import SettingService
+from dynatrace.aio.http_client import AsyncHttpClient
+from dynatrace.rate_limiter import RateLimiter
+from dynatrace.retry import RetryPolicy
+
+
+class AsyncDynatrace:
+    """asyncio version of the Dynatrace client, paginated results are consumed with `async for`
+
+    The returned objects are the same classes returned by the synchronous client.
+    Their own request helpers (e.g. Slo.post) are synchronous, use the service methods instead.
+    """
+
+    def __init__(
+        self,
+        base_url: str,
+        token: str,
+        log: logging.Logger = None,
+        proxies: Dict = None,
+        too_many_requests_strategy=None,
+        retries: int = 0,
+        retry_delay_ms: int = 0,
+        print_bodies=False,
+        timeout: Optional[int] = None,
+        max_concurrency: int = 10,
+        rate_limiter: Union[bool, RateLimiter, None] = None,
+        retry_policy: Optional[RetryPolicy] = None,
+    ):
+        self.__http_client = AsyncHttpClient(
+            base_url, token, log, proxies, too_many_requests_strategy, retries, retry_delay_ms, print_bodies, timeout, max_concurrency,
+            rate_limiter=rate_limiter, retry_policy=retry_policy,
+        )
+
+        self.entities: EntityService = EntityService(self.__http_client)
+        self.logs: LogService = LogService(self.__http_client)
+        self.metrics: MetricService = MetricService(self.__http_client)
+        self.problems: ProblemService = ProblemService(self.__http_client)
+        self.settings: SettingService = SettingService(self.__http_client)
+        self.slos: SloService = SloService(self.__http_client)
+
+    async def close(self):
+        """Closes the HTTP connection pool used by this client"""
+        await self.__http_client.close()
+
+    async def __aenter__(self) -> "AsyncDynatrace":
+        return self
+
+    async def __aexit__(self, exc_type, exc_val, exc_tb):
+        await self.close()
@@ -0,0 +1,62 @@
+"""
+Copyright 2021 Dynatrace LLC
+
+Licensed under the Apache License, Version 2.0 (the "License");
+you may not use this file except in compliance with the License.
+You may obtain a copy of the License at
+
+    http://www.apache.org/licenses/LICENSE-2.0
+
+Unless required by applicable law or agreed to in writing, software
+distributed under the License is distributed on an "AS IS" BASIS,
+WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+See the License for the specific language governing permissions and
+limitations under the License.
+"""
+
+from typing import AsyncIterator, Generic, TypeVar
+
+from dynatrace.dynatrace_object import DynatraceObject, from_response
+from dynatrace.aio.http_client import AsyncHttpClient
+
+T = TypeVar("T", bound=DynatraceObject)
+
+
+class AsyncPaginatedList(Generic[T]):
+    """Async iterator over a paginated endpoint, pages are only requested while the list is being consumed.
+
+    Usage: `async for entity in dt.entities.list('type("HOST")'): ...`
+    """
+
+    def __init__(self, target_class, http_client, target_url, target_params=None, headers=None, list_item="result"):
+        self.__target_class = target_class
+        self.__http_client: AsyncHttpClient = http_client
+        self.__target_url = target_url
+        self.__target_params = target_params
+        self.__headers = headers
+        self.__list_item = list_item
+        self.__total_count = None
+
+    @property
+    def total_count(self):
+        """The totalCount reported by the API, only known after the first page was received"""
+        return self.__total_count
+
+    async def __aiter__(self) -> AsyncIterator[T]:
+        params = self.__target_params
+        while True:
+            response = await self.__http_client.make_request(self.__target_url, params=params, headers=self.__headers)
+            json_response = response.json()
+
+            elements = json_response.get(self.__list_item, [])
+            self.__total_count = json_response.get("totalCount") or len(elements)
+            for element in elements:
+                yield from_response(self.__target_class, self.__http_client, response.headers, element)
+
+            next_page_key = json_response.get("nextPageKey")
+            if not next_page_key:
+                break
+            params = {"nextPageKey": next_page_key}
+
+    async def to_list(self):
+        return [element async for element in self]
@@ -0,0 +1,87 @@
+"""
+Copyright 2021 Dynatrace LLC
+
+Licensed under the Apache License, Version 2.0 (the "License");
+you may not use this file except in compliance with the License.
+You may obtain a copy of the License at
+
+    http://www.apache.org/licenses/LICENSE-2.0
+
+Unless required by applicable law or agreed to in writing, software
+distributed under the License is distributed on an "AS IS" BASIS,
+WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+See the License for the specific language governing permissions and
+limitations under the License.
+"""
+
+import threading
+from typing import Any, Callable, Dict, Hashable, Mapping, Optional, Tuple
+
+# Only requests without side effects are coalesced
+COALESCED_METHODS = ("GET", "HEAD")
+
+
+class _Call:
+    __slots__ = ("done", "result", "error")
+
+    def __init__(self):
+        self.done = threading.Event()
+        self.result = None
+        self.error: Optional[BaseException] = None
+
+
+class RequestCoalescer:
+    """Single-flight execution of identical concurrent requests.
+
+    The first caller of do() for a key runs the request, the callers arriving with the same key while it is in flight
+    wait for it and get the same response (or the same exception). Nothing is kept once the request is done, later
+    callers send a new request.
+    `requests` counts the requests actually sent, `deduplicated` the calls that shared the response of another one.
+    """
+
+    def __init__(self):
+        self.requests = 0
+        self.deduplicated = 0
+        self.__in_flight: Dict[Hashable, _Call] = {}
+        self.__lock = threading.Lock()
+
+    @staticmethod
+    def key(method: str, url: str, params: Optional[Any], headers: Mapping[str, str]) -> Tuple:
+        """Identifies a request: method, url, query parameters (None values dropped, order ignored) and headers"""
+        if isinstance(params, dict):
+            params = tuple(sorted((str(k), str(v)) for k, v in params.items() if v is not None))
+        elif isinstance(params, (list, tuple)):
+            params = tuple(sorted((str(k), str(v)) for k, v in params))
+        elif params is not None:
+            params = str(params)
+        return method.upper(), url, params, tuple(sorted((k.lower(), str(v)) for k, v in headers.items()))
+
+    def do(self, key: Hashable, request: Callable[[], Any]) -> Any:
+        with self.__lock:
+            call = self.__in_flight.get(key)
+            leader = call is None
+            if leader:
+                call = self.__in_flight[key] = _Call()
+                self.requests += 1
+            else:
+                self.deduplicated += 1
+
+        if not leader:
+            call.done.wait()
+            if call.error is not None:
+                raise call.error
+            return call.result
+
+        try:
+            call.result = request()
+        except BaseException as e:
+            call.error = e
+            raise
+        finally:
+            with self.__lock:
+                del self.__in_flight[key]
+            call.done.set()
+        return call.result
+
+    def __repr__(self):
+        return f"RequestCoalescer(requests={self.requests}, deduplicated={self.deduplicated})"
@@ -0,0 +1,96 @@
+"""
+Copyright 2021 Dynatrace LLC
+
+Licensed under the Apache License, Version 2.0 (the "License");
+you may not use this file except in compliance with the License.
+You may obtain a copy of the License at
+
+    http://www.apache.org/licenses/LICENSE-2.0
+
+Unless required by applicable law or agreed to in writing, software
+distributed under the License is distributed on an "AS IS" BASIS,
+WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+See the License for the specific language governing permissions and
+limitations under the License.
+"""
+
+import json
+from typing import Any, Union
+
+try:
+    import orjson
+except ImportError:  # pragma: no cover - optional dependency
+    orjson = None
+
+CODEC_STDLIB = "json"
+CODEC_ORJSON = "orjson"
+
+
+class JsonCodec:
+    """Encodes request bodies and decodes responses, the standard library json module"""
+
+    name = CODEC_STDLIB
+
+    def dumps(self, obj: Any) -> bytes:
+        return json.dumps(obj).encode("utf-8")
+
+    def loads(self, data: Union[bytes, str]) -> Any:
+        return json.loads(data)
+
+    def dumps_pretty(self, obj: Any) -> str:
+        return json.dumps(obj, indent=2)
+
+    def __repr__(self):
+        return f"{self.__class__.__name__}()"
+
+
+class OrjsonCodec(JsonCodec):
+    """orjson, several times faster than the json module.
+
+    Values orjson rejects go through the json module, e.g. integers above 64 bits when encoding or NaN when decoding.
+    Note that orjson decodes integers above 64 bits as floats, where the json module keeps them exact.
+    """
+
+    name = CODEC_ORJSON
+
+    def __init__(self):
+        if orjson is None:
+            raise ImportError("The orjson codec requires orjson, install it with 'pip install dt[orjson]'")
+
+    def dumps(self, obj: Any) -> bytes:
+        try:
+            return orjson.dumps(obj, option=orjson.OPT_NON_STR_KEYS)
+        except TypeError:
+            return super().dumps(obj)
+
+    def loads(self, data: Union[bytes, str]) -> Any:
+        try:
+            return orjson.loads(data)
+        except orjson.JSONDecodeError:
+            return super().loads(data)
+
+    def dumps_pretty(self, obj: Any) -> str:
+        try:
+            return orjson.dumps(obj, option=orjson.OPT_INDENT_2 | orjson.OPT_NON_STR_KEYS).decode("utf-8")
+        except TypeError:
+            return super().dumps_pretty(obj)
+
+
+def get_codec(codec: Union[str, JsonCodec, None] = None) -> JsonCodec:
+    """The codec named codec ("json" or "orjson"), by default orjson when it is installed and json otherwise"""
+    if isinstance(codec, JsonCodec):
+        return codec
+    if codec is None:
+        return OrjsonCodec() if orjson is not None else JsonCodec()
+    if codec == CODEC_ORJSON:
+        return OrjsonCodec()
+    if codec == CODEC_STDLIB:
+        return JsonCodec()
+    raise ValueError(f"Unknown codec '{codec}', use '{CODEC_STDLIB}', '{CODEC_ORJSON}' or a JsonCodec instance")
+
+
+def decode_response(codec: JsonCodec, response: Any, **kwargs) -> Any:
+    """Replacement for response.json(), decoding the body with codec. kwargs (json.loads options) force the json module"""
+    if kwargs:
+        return json.loads(response.content, **kwargs)
+    return codec.loads(response.content)
@@ -0,0 +1,87 @@
+"""
+Copyright 2021 Dynatrace LLC
+
+Licensed under the Apache License, Version 2.0 (the "License");
+you may not use this file except in compliance with the License.
+You may obtain a copy of the License at
+
+    http://www.apache.org/licenses/LICENSE-2.0
+
+Unless required by applicable law or agreed to in writing, software
+distributed under the License is distributed on an "AS IS" BASIS,
+WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+See the License for the specific language governing permissions and
+limitations under the License.
+"""
+
+import gzip
+import io
+import re
+import threading
+from typing import Iterable, Optional, Union
+
+# The ingest endpoints: metrics, logs and events, and the custom device push endpoint
+DEFAULT_COMPRESSED_PATHS = (r"^/api/v2/(metrics|logs|events)/ingest$", r"^/api/v1/entity/infrastructure/custom/")
+
+# Encodings requests and httpx can decode without optional dependencies
+DEFAULT_ACCEPT_ENCODING = "gzip, deflate"
+
+
+def gzip_body(body: Union[bytes, str], level: int = 6) -> bytes:
+    """Compresses a request body, to be sent with the Content-Encoding: gzip header"""
+    if isinstance(body, str):
+        body = body.encode("utf-8")
+    # mtime=0 keeps the output deterministic for the same body, gzip.compress only accepts it from Python 3.8
+    buffer = io.BytesIO()
+    with gzip.GzipFile(fileobj=buffer, mode="wb", compresslevel=level, mtime=0) as gzip_file:
+        gzip_file.write(body)
+    return buffer.getvalue()
+
+
+class RequestCompression:
+    """Gzip compression of request bodies, for the POST and PUT requests to the paths matching `paths`
+
+    Bodies smaller than min_size bytes are sent as they are, compressing them would not save anything.
+    Requests that already have a Content-Encoding header (e.g. MetricIngestBatcher batches) are not compressed again.
+    Every request also asks for compressed responses, with the accept_encoding value.
+    """
+
+    def __init__(
+        self,
+        paths: Iterable[str] = DEFAULT_COMPRESSED_PATHS,
+        min_size: int = 1024,
+        level: int = 6,
+        accept_encoding: Optional[str] = DEFAULT_ACCEPT_ENCODING,
+    ):
+        self.paths = [re.compile(pattern) for pattern in paths]
+        self.min_size = min_size
+        self.level = level
+        self.accept_encoding = accept_encoding
+        self.compressed_requests = 0
+        self.bytes_before = 0
+        self.bytes_after = 0
+        self.__lock = threading.Lock()
+
+    def applies(self, method: str, path: str) -> bool:
+        return method.upper() in ("POST", "PUT") and any(pattern.search(path) for pattern in self.paths)
+
+    def compress(self, body: Union[bytes, str]) -> Optional[bytes]:
+        """The compressed body, None when it is smaller than min_size"""
+        if isinstance(body, str):
+            body = body.encode("utf-8")
+        if len(body) < self.min_size:
+            return None
+        compressed = gzip_body(body, self.level)
+        with self.__lock:
+            self.compressed_requests += 1
+            self.bytes_before += len(body)
+            self.bytes_after += len(compressed)
+        return compressed
+
+    @property
+    def ratio(self) -> Optional[float]:
+        """Compressed size / original size of all the compressed bodies"""
+        return self.bytes_after / self.bytes_before if self.bytes_before else None
+
+    def __repr__(self):
+        return f"RequestCompression(compressed_requests={self.compressed_requests}, ratio={self.ratio})"
@@ -15,14 +15,146 @@ limitations under the License.
 """
 
 import pprint
-from typing import Any, Dict, Optional
+import types
+from typing import Any, Callable, Dict, Optional, Union
 
 from requests import Response
 
 from dynatrace.http_client import HttpClient
 
 
+class LazyField:
+    """Declares an attribute that is decoded from the raw element the first time it is read.
+
+    :param key: The key of the value in the raw element
+    :param decode: Converts the raw value (or the default) to the attribute value
+    :param default: Used when the key is missing, callables (e.g. list, dict) are called to create a new default each time
+    :param required: Raise a KeyError when the key is missing, instead of using the default
+    """
+
+    def __init__(self, key: str, decode: Optional[Callable[[Any], Any]] = None, default: Any = None, required: bool = False):
+        self.key = key
+        self.decode = decode
+        self.default = default
+        self.required = required
+
+    def decode_from(self, raw_element: Dict[str, Any]) -> Any:
+        return self.decode_value(raw_element.get(self.key, _MISSING))
+
+    def decode_value(self, value: Any) -> Any:
+        """Decodes the raw value of the field, _MISSING when the raw element has no value for its key"""
+        if value is _MISSING:
+            if self.required:
+                raise KeyError(self.key)
+            value = self.default() if callable(self.default) else self.default
+        return self.decode(value) if self.decode is not None else value
+
+
+_MISSING = object()
+
+
+class _ReleasedElement(dict):
+    """What an object keeps of its raw element once released: the raw values of the lazy fields not read yet.
+
+    Each value is dropped once its field is decoded, so the object ends up with only the decoded value.
+    """
+
+    __slots__ = ()
+
+
+def _decode(instance: "DynatraceObject", attribute: Union["_LazyAttribute", "_LazySlotAttribute"]) -> Any:
+    """Decodes the field of a lazy attribute from the raw element and stores the value in the instance.
+
+    The raw value of a released element is dropped only after the decoded value is stored: a thread that no longer
+    finds it returns the value stored by the thread that decoded it, instead of decoding the default.
+    """
+    field = attribute.field
+    raw_element = instance._raw_element
+    if type(raw_element) is not _ReleasedElement:
+        value = field.decode_from(raw_element)
+        attribute.store(instance, value)
+        return value
+
+    raw_value = raw_element.get(field.key, _MISSING)
+    if raw_value is _MISSING:
+        value = attribute.stored(instance)
+        if value is not _MISSING:
+            return value
+    value = field.decode_value(raw_value)
+    attribute.store(instance, value)
+    raw_element.pop(field.key, None)
+    return value
+
+
+class _LazyAttribute:
+    """Non-data descriptor, the decoded value is stored in the instance __dict__ so later reads skip the descriptor"""
+
+    def __init__(self, name: str, field: LazyField):
+        self.name = name
+        self.field = field
+
+    def __get__(self, instance, owner):
+        if instance is None:
+            return self
+        return _decode(instance, self)
+
+    def stored(self, instance) -> Any:
+        return instance.__dict__.get(self.name, _MISSING)
+
+    def store(self, instance, value: Any):
+        instance.__dict__[self.name] = value
+
+
+class _LazySlotAttribute:
+    """Data descriptor wrapping the slot of a lazy field, for classes that declare __slots__"""
+
+    def __init__(self, name: str, field: LazyField, slot: types.MemberDescriptorType):
+        self.name = name
+        self.field = field
+        self.slot = slot
+
+    def __get__(self, instance, owner):
+        if instance is None:
+            return self
+        try:
+            return self.slot.__get__(instance, owner)
+        except AttributeError:
+            return _decode(instance, self)
+
+    def __set__(self, instance, value):
+        self.slot.__set__(instance, value)
+
+    def __delete__(self, instance):
+        self.slot.__delete__(instance)
+
+    def stored(self, instance) -> Any:
+        try:
+            return self.slot.__get__(instance, type(instance))
+        except AttributeError:
+            return _MISSING
+
+    def store(self, instance, value: Any):
+        self.slot.__set__(instance, value)
+
+
 class DynatraceObject:
+    # Subclasses that are created in large numbers (entities, log records, ...) declare __slots__ for their attributes,
+    # so that they do not carry a per-instance __dict__. Other subclasses keep a regular __dict__.
+    __slots__ = ("_http_client", "_headers", "_raw_element", "__weakref__")
+
+    # Subclasses can declare attributes here instead of assigning them in _create_from_raw_data.
+    # Declared attributes are decoded on first access, objects that are only partially read stay cheap.
+    _lazy_fields: Dict[str, LazyField] = {}
+
+    def __init_subclass__(cls, **kwargs):
+        super().__init_subclass__(**kwargs)
+        for name, field in cls.__dict__.get("_lazy_fields", {}).items():
+            slot = cls.__dict__.get(name)
+            if isinstance(slot, types.MemberDescriptorType):
+                setattr(cls, name, _LazySlotAttribute(name, field, slot))
+            else:
+                setattr(cls, name, _LazyAttribute(name, field))
+
     def __init__(self,
                  http_client: Optional[HttpClient] = None,
                  headers: Optional[Dict[str, str]] = None,
@@ -34,6 +166,26 @@ class DynatraceObject:
         self._raw_element = raw_element
         self._create_from_raw_data(raw_element)
 
+    def _release_raw_element(self):
+        """Drops the reference to the raw element, json() returns None afterwards.
+
+        Only the raw values of the lazy fields that were not read yet are kept, they are still decoded on first access.
+        Members no field is declared for, and the ones already decoded, can be garbage collected.
+        """
+        raw_element = self._raw_element
+        released = _ReleasedElement()
+        for cls in type(self).__mro__:
+            for name, field in cls.__dict__.get("_lazy_fields", {}).items():
+                if field.key in raw_element and not self.__is_decoded(name):
+                    released[field.key] = raw_element[field.key]
+        self._raw_element = released
+
+    def __is_decoded(self, name: str) -> bool:
+        attribute = getattr(type(self), name)
+        if isinstance(attribute, (_LazyAttribute, _LazySlotAttribute)):
+            return attribute.stored(self) is not _MISSING
+        return name in getattr(self, "__dict__", {})
+
     def _create_from_raw_data(self, raw_element: Dict[str, Any]):
         pass
 
@@ -49,4 +201,18 @@ class DynatraceObject:
         return self._http_client.make_request(path, params, headers, method, data)
 
     def json(self):
+        if type(self._raw_element) is _ReleasedElement:
+            return None
         return self._raw_element
+
+
+def from_response(target_class: Callable, http_client: Optional[HttpClient], headers: Optional[Dict[str, str]], raw_element: Any) -> Any:
+    """Creates target_class from an element of an API response, releasing its raw element if the client does not keep them.
+
+    Only objects decoded from responses are released: objects created locally (e.g. custom device messages) send their
+    raw element as the request body.
+    """
+    element = target_class(http_client, headers, raw_element)
+    if isinstance(element, DynatraceObject) and not getattr(http_client, "keep_raw_elements", True):
+        element._release_raw_element()
+    return element
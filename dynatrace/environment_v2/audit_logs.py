@@ -79,6 +79,21 @@ class UserType(Enum):
 
 
 class AuditLogEntry(DynatraceObject):
+    __slots__ = (
+        "category",
+        "environment_id",
+        "event_type",
+        "log_id",
+        "success",
+        "timestamp",
+        "user",
+        "user_type",
+        "entity_id",
+        "user_origin",
+        "message",
+        "patch",
+    )
+
     def _create_from_raw_data(self, raw_element: Dict[str, Any]):
         self.category: Category = Category(raw_element.get("category"))
         self.environment_id: str = raw_element.get("environmentId")
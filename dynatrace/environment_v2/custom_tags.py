@@ -16,12 +16,18 @@ limitations under the License.
 
 from enum import Enum
 from datetime import datetime
-from typing import List, Optional, Union, Dict, Any
+from typing import List, Optional, Union, Dict, Any, Iterable, Mapping, Set, Tuple, TYPE_CHECKING
 
 from dynatrace.dynatrace_object import DynatraceObject
 from dynatrace.http_client import HttpClient
 from dynatrace.pagination import PaginatedList
-from dynatrace.utils import timestamp_to_string
+from dynatrace.utils import entity_id_selectors, timestamp_to_string
+
+if TYPE_CHECKING:
+    from dynatrace.environment_v2.tag_index import TagIndex
+
+# A custom tag: "key", "key:value", AddEntityTags("key", "value") or ("key", "value")
+TagLike = Union[str, "AddEntityTags", Tuple[str, Optional[str]]]
 
 
 class CustomTagService:
@@ -95,6 +101,85 @@ class CustomTagService:
         response = self.__http_client.make_request(self.ENDPOINT, params=params, method="DELETE")
         return DeletedEntityTags(raw_element=response.json())
 
+    def bulk_apply(
+        self,
+        desired: Mapping[str, Iterable[TagLike]],
+        current: Optional["TagIndex"] = None,
+        remove_others: bool = False,
+        time_from: Optional[Union[datetime, str]] = None,
+        time_to: Optional[Union[datetime, str]] = None,
+    ) -> "BulkTagResult":
+        """
+        Sets the custom tags of many entities, with as few requests as possible
+        :param desired: The custom tags wanted on each entity, by entity ID
+        :param current: The tags the entities have now. Only the missing tags are added, and the index is updated once all
+            the requests succeeded. If not set all the desired tags are posted (adding a tag an entity has does nothing).
+        :param remove_others: Also delete the custom tags of the entities that are not desired, requires current
+        :param time_from: The start of the timeframe the entities must have been seen in.
+        :param time_to: The end of the timeframe the entities must have been seen in.
+
+        :return: BulkTagResult
+        """
+        if remove_others and current is None:
+            raise ValueError("remove_others requires the current tags of the entities")
+        additions: Dict[str, Set[Tuple[str, Optional[str]]]] = {}
+        removals: Dict[str, Set[Tuple[str, Optional[str]]]] = {}
+        for entity_id, tags in desired.items():
+            wanted = {_tag_pair(tag) for tag in tags}
+            existing = _custom_tags(current, entity_id)
+            if wanted - existing:
+                additions[entity_id] = wanted - existing
+            if remove_others and existing - wanted:
+                removals[entity_id] = existing - wanted
+        return self.__bulk(additions, removals, current, time_from, time_to)
+
+    def bulk_remove(
+        self,
+        tags: Mapping[str, Iterable[TagLike]],
+        current: Optional["TagIndex"] = None,
+        time_from: Optional[Union[datetime, str]] = None,
+        time_to: Optional[Union[datetime, str]] = None,
+    ) -> "BulkTagResult":
+        """
+        Deletes custom tags from many entities, with as few requests as possible
+        :param tags: The custom tags to delete from each entity, by entity ID. A tag without value only deletes the tag
+            without value, not the tags of the key with a value.
+        :param current: The tags the entities have now. Only the tags the entities have are deleted, and the index is
+            updated once all the requests succeeded.
+        :param time_from: The start of the timeframe the entities must have been seen in.
+        :param time_to: The end of the timeframe the entities must have been seen in.
+
+        :return: BulkTagResult
+        """
+        removals: Dict[str, Set[Tuple[str, Optional[str]]]] = {}
+        for entity_id, entity_tags in tags.items():
+            unwanted = {_tag_pair(tag) for tag in entity_tags}
+            if current is not None:
+                unwanted &= _custom_tags(current, entity_id)
+            if unwanted:
+                removals[entity_id] = unwanted
+        return self.__bulk({}, removals, current, time_from, time_to)
+
+    def __bulk(self, additions, removals, current, time_from, time_to) -> "BulkTagResult":
+        result = BulkTagResult(additions, removals)
+        for selector, tags in _plan_posts(additions):
+            added = self.post(selector, [AddEntityTags(key, value) for key, value in tags], time_from=time_from, time_to=time_to)
+            result.posts += 1
+            result.matched_entities += added.matched_entities_count
+        for selector, key, value, delete_all_with_key in _plan_deletes(removals, current):
+            deleted = self.delete(key, selector, value=value, delete_all_with_key=delete_all_with_key, time_from=time_from, time_to=time_to)
+            result.deletes += 1
+            result.matched_entities += deleted.matched_entities_count
+
+        if current is not None:
+            for entity_id, tags in additions.items():
+                for key, value in tags:
+                    current.add_tag(entity_id, key, value)
+            for entity_id, tags in removals.items():
+                for key, value in tags:
+                    current.remove_tag(entity_id, key, value)
+        return result
+
 
 class AddedEntityTags(DynatraceObject):
     def _create_from_raw_data(self, raw_element: Dict[str, Any]):
@@ -140,3 +225,90 @@ class TagContext(Enum):
 
     def __str__(self) -> str:
         return self.value
+
+
+class BulkTagResult:
+    """The requests made by a bulk tag operation, and the tags added and removed per entity ID"""
+
+    __slots__ = ("added", "removed", "posts", "deletes", "matched_entities")
+
+    def __init__(self, added: Dict[str, Set[Tuple[str, Optional[str]]]], removed: Dict[str, Set[Tuple[str, Optional[str]]]]):
+        self.added = added
+        self.removed = removed
+        self.posts = 0
+        self.deletes = 0
+        self.matched_entities = 0
+
+    @property
+    def requests(self) -> int:
+        return self.posts + self.deletes
+
+    def __repr__(self):
+        return f"BulkTagResult(added={len(self.added)}, removed={len(self.removed)}, posts={self.posts}, deletes={self.deletes})"
+
+
+def _tag_pair(tag: TagLike) -> Tuple[str, Optional[str]]:
+    if isinstance(tag, AddEntityTags):
+        return tag.key, tag.value
+    if isinstance(tag, tuple):
+        return tag
+    # Like the string representation of the tags, the key ends at the first colon
+    key, separator, value = tag.partition(":")
+    return key, value if separator else None
+
+
+def _custom_tags(index: Optional["TagIndex"], entity_id: str) -> Set[Tuple[str, Optional[str]]]:
+    if index is None:
+        return set()
+    return {(key, value) for _, key, value in index.tags_of(entity_id, str(TagContext.CONTEXTLESS))}
+
+
+def _group(entity_tags: Mapping[str, Iterable[Any]]) -> Dict[Any, List[str]]:
+    groups: Dict[Any, List[str]] = {}
+    for entity_id, values in entity_tags.items():
+        for value in values:
+            groups.setdefault(value, []).append(entity_id)
+    return groups
+
+
+def _plan_posts(additions: Mapping[str, Set[Tuple[str, Optional[str]]]]) -> List[Tuple[str, List[Tuple[str, Optional[str]]]]]:
+    """(selector, tags) of the POST requests adding the tags, a request adds all its tags to all its entities"""
+    # Either one request per distinct set of tags, or one per tag, whichever needs fewer requests
+    by_set = [
+        (selector, sorted(tags, key=_sort_key))
+        for tags, ids in _group({entity_id: [frozenset(tags)] for entity_id, tags in additions.items()}).items()
+        for selector in entity_id_selectors(ids)
+    ]
+    by_tag = [(selector, [tag]) for tag, ids in _group(additions).items() for selector in entity_id_selectors(ids)]
+    return by_set if len(by_set) <= len(by_tag) else by_tag
+
+
+def _plan_deletes(
+    removals: Mapping[str, Set[Tuple[str, Optional[str]]]], current: Optional["TagIndex"]
+) -> List[Tuple[str, str, Optional[str], Optional[bool]]]:
+    """(selector, key, value, delete_all_with_key) of the DELETE requests removing the tags, one key and value per request"""
+    requests = []
+    by_key = _group({entity_id: {key for key, _ in tags} for entity_id, tags in removals.items()})
+    for key, entity_ids in sorted(by_key.items()):
+        key_removals = {entity_id: {tag for tag in removals[entity_id] if tag[0] == key} for entity_id in entity_ids}
+        plan = _delete_values(key, key_removals)
+
+        # The entities losing all their values of the key can be selected together, with deleteAllWithKey
+        whole = [entity_id for entity_id, tags in key_removals.items() if current is not None and tags == {tag for tag in _custom_tags(current, entity_id) if tag[0] == key}]
+        if whole:
+            whole_plan = [(selector, key, None, True) for selector in entity_id_selectors(whole)]
+            whole_ids = set(whole)
+            whole_plan += _delete_values(key, {entity_id: tags for entity_id, tags in key_removals.items() if entity_id not in whole_ids})
+            if len(whole_plan) < len(plan):
+                plan = whole_plan
+        requests.extend(plan)
+    return requests
+
+
+def _delete_values(key: str, key_removals: Mapping[str, Set[Tuple[str, Optional[str]]]]) -> List[Tuple[str, str, Optional[str], Optional[bool]]]:
+    groups = sorted(_group(key_removals).items(), key=lambda item: _sort_key(item[0]))
+    return [(selector, key, value, None) for (_, value), entity_ids in groups for selector in entity_id_selectors(entity_ids)]
+
+
+def _sort_key(tag: Tuple[str, Optional[str]]) -> Tuple[str, str]:
+    return tag[0], tag[1] or ""
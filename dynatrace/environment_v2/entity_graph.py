@@ -0,0 +1,240 @@
+"""
+Copyright 2021 Dynatrace LLC
+
+Licensed under the Apache License, Version 2.0 (the "License");
+you may not use this file except in compliance with the License.
+You may obtain a copy of the License at
+
+    http://www.apache.org/licenses/LICENSE-2.0
+
+Unless required by applicable law or agreed to in writing, software
+distributed under the License is distributed on an "AS IS" BASIS,
+WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+See the License for the specific language governing permissions and
+limitations under the License.
+"""
+
+from array import array
+from collections import deque
+from typing import Dict, Iterable, Iterator, List, Optional, Set, Tuple, Union
+
+from dynatrace.environment_v2.monitored_entities import Entity, entity_type_of
+
+DIRECTION_OUT = "out"
+DIRECTION_IN = "in"
+DIRECTION_BOTH = "both"
+
+# The fields to request from entities.list for a graph, e.g. entities.list('type("SERVICE")', fields=GRAPH_FIELDS)
+GRAPH_FIELDS = "+fromRelationships,+toRelationships"
+
+Labels = Union[None, str, Iterable[str]]
+
+
+class EntityGraph:
+    """The topology of monitored entities, built from the relationships of listed entities.
+
+    An edge goes from the entity in the FROM position of a relationship to the one in the TO position, and is labelled
+    with the relationship type: a service calling a database service is the edge service -calls-> database.
+    Relationships are read from both sides, entities only known as the target of a relationship are part of the graph
+    with the type of their ID and no name.
+
+    The graph is immutable. Entities are numbered, edges are stored as compressed adjacency arrays (CSR) in both
+    directions, so queries do not make API calls nor create objects per edge.
+
+    :param entities: One or more entity lists (e.g. the PaginatedLists of several entities.list sweeps), requested with
+        fields="+fromRelationships,+toRelationships"
+    """
+
+    def __init__(self, *entities: Iterable[Entity]):
+        self.__index: Dict[str, int] = {}
+        self.__ids: List[str] = []
+        self.__types: List[Optional[str]] = []
+        self.__names: List[Optional[str]] = []
+        self.__label_index: Dict[str, int] = {}
+        self.__labels: List[str] = []
+
+        edges: Set[Tuple[int, int, int]] = set()
+        for entity_list in entities:
+            for entity in entity_list:
+                node = self.__add_node(entity.entity_id, entity_type_of(entity), entity.display_name)
+                from_relationships, to_relationships = _relationships(entity)
+                for label, targets in from_relationships.items():
+                    code = self.__label(label)
+                    for target_id, target_type in targets:
+                        edges.add((node, self.__add_node(target_id, target_type), code))
+                for label, sources in to_relationships.items():
+                    code = self.__label(label)
+                    for source_id, source_type in sources:
+                        edges.add((self.__add_node(source_id, source_type), node, code))
+
+        self.__edge_count = len(edges)
+        ordered = sorted(edges)
+        self.__out_offsets, self.__out_targets, self.__out_labels = self.__csr(ordered)
+        self.__in_offsets, self.__in_targets, self.__in_labels = self.__csr(sorted((dst, src, code) for src, dst, code in ordered))
+
+    def __add_node(self, entity_id: str, entity_type: Optional[str], name: Optional[str] = None) -> int:
+        node = self.__index.get(entity_id)
+        if node is None:
+            node = self.__index[entity_id] = len(self.__ids)
+            self.__ids.append(entity_id)
+            self.__types.append(entity_type)
+            self.__names.append(name)
+        elif name is not None:
+            # Seen as a relationship target first, now listed itself
+            self.__types[node] = entity_type
+            self.__names[node] = name
+        return node
+
+    def __label(self, label: str) -> int:
+        code = self.__label_index.get(label)
+        if code is None:
+            code = self.__label_index[label] = len(self.__labels)
+            self.__labels.append(label)
+        return code
+
+    def __csr(self, edges: Iterable[Tuple[int, int, int]]) -> Tuple[array, array, array]:
+        """Offsets, targets and labels of edges sorted by source: the edges of node n are at offsets[n]:offsets[n + 1]"""
+        offsets = array("l", [0]) * (len(self.__ids) + 1)
+        targets, labels = array("l"), array("l")
+        for source, target, code in edges:
+            offsets[source + 1] += 1
+            targets.append(target)
+            labels.append(code)
+        for node in range(len(self.__ids)):
+            offsets[node + 1] += offsets[node]
+        return offsets, targets, labels
+
+    def __len__(self) -> int:
+        return len(self.__ids)
+
+    def __contains__(self, entity_id: str) -> bool:
+        return entity_id in self.__index
+
+    def __repr__(self):
+        return f"EntityGraph(entities={len(self.__ids)}, edges={self.__edge_count}, labels={self.__labels})"
+
+    @property
+    def edge_count(self) -> int:
+        return self.__edge_count
+
+    @property
+    def labels(self) -> List[str]:
+        """The relationship types of the edges, e.g. calls, runsOn, isProcessOf"""
+        return list(self.__labels)
+
+    @property
+    def entity_ids(self) -> List[str]:
+        return list(self.__ids)
+
+    def type_of(self, entity_id: str) -> Optional[str]:
+        return self.__types[self.__node(entity_id)]
+
+    def name_of(self, entity_id: str) -> Optional[str]:
+        """The display name, None for entities that were only seen in relationships"""
+        return self.__names[self.__node(entity_id)]
+
+    def __node(self, entity_id: str) -> int:
+        node = self.__index.get(entity_id)
+        if node is None:
+            raise KeyError(f"Unknown entity '{entity_id}'")
+        return node
+
+    def __label_codes(self, labels: Labels) -> Optional[Set[int]]:
+        if labels is None:
+            return None
+        if isinstance(labels, str):
+            labels = [labels]
+        return {self.__label_index[label] for label in labels if label in self.__label_index}
+
+    def __adjacent(self, node: int, direction: str, codes: Optional[Set[int]]) -> Iterator[Tuple[int, int]]:
+        """(neighbour, label code) pairs of a node"""
+        if direction not in (DIRECTION_OUT, DIRECTION_IN, DIRECTION_BOTH):
+            raise ValueError(f"Unknown direction '{direction}', use '{DIRECTION_OUT}', '{DIRECTION_IN}' or '{DIRECTION_BOTH}'")
+        sides = []
+        if direction != DIRECTION_IN:
+            sides.append((self.__out_offsets, self.__out_targets, self.__out_labels))
+        if direction != DIRECTION_OUT:
+            sides.append((self.__in_offsets, self.__in_targets, self.__in_labels))
+        for offsets, targets, labels in sides:
+            for i in range(offsets[node], offsets[node + 1]):
+                if codes is None or labels[i] in codes:
+                    yield targets[i], labels[i]
+
+    def edges(self, entity_id: str, direction: str = DIRECTION_OUT, labels: Labels = None) -> List[Tuple[str, str]]:
+        """The (relationship type, entity ID) pairs of the edges of an entity"""
+        codes = self.__label_codes(labels)
+        return [(self.__labels[code], self.__ids[other]) for other, code in self.__adjacent(self.__node(entity_id), direction, codes)]
+
+    def neighbours(self, entity_id: str, direction: str = DIRECTION_BOTH, labels: Labels = None, types: Labels = None) -> List[str]:
+        """The entities directly related to an entity, each listed once
+
+        :param direction: "out" for the targets of its relationships, "in" for their sources, "both" for all
+        :param labels: Only follow these relationship types
+        :param types: Only return entities of these types
+        """
+        codes = self.__label_codes(labels)
+        wanted = {types} if isinstance(types, str) else set(types) if types is not None else None
+        seen: Dict[int, None] = {}
+        for other, _ in self.__adjacent(self.__node(entity_id), direction, codes):
+            if wanted is None or self.__types[other] in wanted:
+                seen[other] = None
+        return [self.__ids[other] for other in seen]
+
+    def bfs(self, entity_id: str, depth: int, direction: str = DIRECTION_BOTH, labels: Labels = None) -> Dict[str, int]:
+        """The entities reachable from an entity in at most depth hops, with their distance (0 for the entity itself)"""
+        codes = self.__label_codes(labels)
+        start = self.__node(entity_id)
+        distances = {start: 0}
+        queue = deque([start])
+        while queue:
+            node = queue.popleft()
+            distance = distances[node]
+            if distance >= depth:
+                continue
+            for other, _ in self.__adjacent(node, direction, codes):
+                if other not in distances:
+                    distances[other] = distance + 1
+                    queue.append(other)
+        return {self.__ids[node]: distance for node, distance in distances.items()}
+
+    def callers(self, entity_id: str, types: Labels = "SERVICE", depth: int = 1, label: str = "calls") -> List[str]:
+        """The entities calling an entity (e.g. all services calling a database service), transitively up to depth"""
+        reachable = self.bfs(entity_id, depth, DIRECTION_IN, label)
+        wanted = {types} if isinstance(types, str) else set(types) if types is not None else None
+        return [other for other, distance in reachable.items() if distance > 0 and (wanted is None or self.__types[self.__index[other]] in wanted)]
+
+    def connected_components(self, labels: Labels = None) -> List[List[str]]:
+        """Groups of entities related to each other (ignoring the direction of relationships), largest first"""
+        codes = self.__label_codes(labels)
+        visited = bytearray(len(self.__ids))
+        components = []
+        for start in range(len(self.__ids)):
+            if visited[start]:
+                continue
+            visited[start] = 1
+            component = [start]
+            queue = deque([start])
+            while queue:
+                node = queue.popleft()
+                for other, _ in self.__adjacent(node, DIRECTION_BOTH, codes):
+                    if not visited[other]:
+                        visited[other] = 1
+                        component.append(other)
+                        queue.append(other)
+            components.append([self.__ids[node] for node in component])
+        components.sort(key=len, reverse=True)
+        return components
+
+
+def _relationships(entity: Entity) -> Tuple[Dict[str, Iterable[Tuple[str, str]]], Dict[str, Iterable[Tuple[str, str]]]]:
+    """(id, type) pairs of the from and to relationships, read from the raw element when the entity still has it"""
+    raw = entity.json()
+    if raw is not None:
+        return tuple(
+            {label: [(other["id"], other["type"]) for other in others] for label, others in raw.get(key, {}).items()}
+            for key in ("fromRelationships", "toRelationships")
+        )
+    return tuple(
+        {label: [(other.id, other.type) for other in others] for label, others in relationships.items()}
+        for relationships in (entity.from_relationships, entity.to_relationships)
+    )
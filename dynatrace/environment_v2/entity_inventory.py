@@ -0,0 +1,231 @@
+"""
+Copyright 2021 Dynatrace LLC
+
+Licensed under the Apache License, Version 2.0 (the "License");
+you may not use this file except in compliance with the License.
+You may obtain a copy of the License at
+
+    http://www.apache.org/licenses/LICENSE-2.0
+
+Unless required by applicable law or agreed to in writing, software
+distributed under the License is distributed on an "AS IS" BASIS,
+WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+See the License for the specific language governing permissions and
+limitations under the License.
+"""
+
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime
+from queue import Empty, Full, Queue
+from typing import Callable, Dict, Iterable, Iterator, List, Optional, Set, Union, TYPE_CHECKING
+
+from dynatrace.utils import selector_value, type_selector
+
+if TYPE_CHECKING:
+    from dynatrace.environment_v2.monitored_entities import Entity, EntityService
+
+# Types with more entities than this are split in one shard per name prefix
+LARGE_TYPE_THRESHOLD = 10000
+
+# The name prefixes of the shards of large types, entityName.startsWith is case-insensitive
+NAME_PREFIXES = tuple("0123456789abcdefghijklmnopqrstuvwxyz")
+
+_PROBE = "probe"
+_ENTITIES = "entities"
+_DONE = "done"
+_ERROR = "error"
+
+
+class TypeStats:
+    """The progress of the enumeration of one entity type"""
+
+    __slots__ = ("entity_type", "total_count", "entities", "shards", "fallback", "started", "seconds", "done")
+
+    def __init__(self, entity_type: str):
+        self.entity_type = entity_type
+        # The totalCount reported by the first page
+        self.total_count: Optional[int] = None
+        self.entities = 0
+        self.shards = 0
+        # Whether the name prefix shards missed entities, and the whole type was listed again
+        self.fallback = False
+        self.started = time.perf_counter()
+        self.seconds = 0.0
+        self.done = False
+
+    def __repr__(self):
+        return (
+            f"TypeStats({self.entity_type}, entities={self.entities}, total_count={self.total_count}, shards={self.shards}, "
+            f"fallback={self.fallback}, seconds={self.seconds:.2f})"
+        )
+
+
+class EntityInventory:
+    """All the monitored entities of a tenant, listed concurrently, one shard (entity selector) at a time per worker.
+
+    Each type is a shard. The first page of a type gives its totalCount: types with more than large_type_threshold
+    entities are split in one shard per name prefix (type("HOST"),entityName.startsWith("a")), so they are not listed
+    by a single worker page after page. When the prefix shards do not add up to the totalCount (names starting with
+    other characters, e.g. "[" or non-ASCII letters), the whole type is listed once more and only the missing entities
+    are returned.
+
+    Entities are returned as their pages arrive, in no particular order, and each once. All the requests go through the
+    HttpClient of the service, so its rate limiter (and retry policy) applies to all the workers together.
+    Iterating again lists everything again.
+
+    :param on_progress: Called with the TypeStats of each type once all its entities were returned
+    """
+
+    def __init__(
+        self,
+        service: "EntityService",
+        types: Optional[Iterable[str]] = None,
+        time_from: Optional[Union[datetime, str]] = None,
+        time_to: Optional[Union[datetime, str]] = None,
+        fields: Optional[str] = None,
+        page_size: int = 500,
+        concurrency: int = 4,
+        large_type_threshold: int = LARGE_TYPE_THRESHOLD,
+        name_prefixes: Iterable[str] = NAME_PREFIXES,
+        on_progress: Optional[Callable[[TypeStats], None]] = None,
+    ):
+        self.__service = service
+        self.__types = list(types) if types is not None else None
+        self.__time_from = time_from
+        self.__time_to = time_to
+        self.__fields = fields
+        self.__page_size = page_size
+        self.__concurrency = concurrency
+        self.__large_type_threshold = large_type_threshold
+        self.__name_prefixes = list(name_prefixes)
+        self.__on_progress = on_progress
+        self.stats: Dict[str, TypeStats] = {}
+        self.entities = 0
+        self.seconds = 0.0
+
+    @property
+    def types_done(self) -> int:
+        return sum(1 for stats in self.stats.values() if stats.done)
+
+    def __iter__(self) -> Iterator["Entity"]:
+        started = time.perf_counter()
+        types = self.__types if self.__types is not None else [entity_type.type for entity_type in self.__service.list_types(page_size=500)]
+        self.stats = {entity_type: TypeStats(entity_type) for entity_type in types}
+        self.entities = 0
+
+        # Bounded, so workers wait for a slow consumer instead of piling up pages in memory
+        queue: Queue = Queue(maxsize=self.__concurrency * 4)
+        cancelled = threading.Event()
+        executor = ThreadPoolExecutor(max_workers=self.__concurrency)
+        open_shards: Dict[str, int] = {}
+        seen: Dict[str, Set[str]] = {}
+        pending = 0
+
+        def put(message):
+            while not cancelled.is_set():
+                try:
+                    queue.put(message, timeout=0.1)
+                    return True
+                except Full:
+                    continue
+            return False
+
+        def submit(task, *args):
+            def run():
+                if cancelled.is_set():
+                    return
+                try:
+                    task(put, *args)
+                except BaseException as e:
+                    put((_ERROR, args[0], e))
+
+            executor.submit(run)
+
+        try:
+            for entity_type in types:
+                submit(self.__probe, entity_type)
+                pending += 1
+
+            while pending:
+                try:
+                    kind, entity_type, payload = queue.get(timeout=0.1)
+                except Empty:
+                    continue
+                stats = self.stats[entity_type]
+
+                if kind == _ERROR:
+                    raise payload
+
+                if kind == _ENTITIES:
+                    type_seen = seen.get(entity_type)
+                    for entity in payload:
+                        if type_seen is not None:
+                            if entity.entity_id in type_seen:
+                                continue
+                            type_seen.add(entity.entity_id)
+                        stats.entities += 1
+                        self.entities += 1
+                        yield entity
+                    continue
+
+                pending -= 1
+                if kind == _PROBE:
+                    stats.total_count = len(payload)
+                    selector = type_selector(entity_type)
+                    if stats.total_count > self.__large_type_threshold and self.__name_prefixes:
+                        seen[entity_type] = set()
+                        shards = [(f'{selector},entityName.startsWith({selector_value(prefix)})', None) for prefix in self.__name_prefixes]
+                    else:
+                        # The probe is the only shard, its first page is not requested again
+                        shards = [(selector, payload)]
+                    for shard_selector, entities in shards:
+                        submit(self.__list_shard, entity_type, shard_selector, entities)
+                    stats.shards = open_shards[entity_type] = len(shards)
+                    pending += len(shards)
+                    continue
+
+                # _DONE
+                open_shards[entity_type] -= 1
+                if open_shards[entity_type]:
+                    continue
+                if entity_type in seen and not stats.fallback and len(seen[entity_type]) < stats.total_count:
+                    stats.fallback = True
+                    stats.shards += 1
+                    open_shards[entity_type] = 1
+                    submit(self.__list_shard, entity_type, type_selector(entity_type), None)
+                    pending += 1
+                    continue
+                seen.pop(entity_type, None)
+                stats.done = True
+                stats.seconds = time.perf_counter() - stats.started
+                if self.__on_progress is not None:
+                    self.__on_progress(stats)
+        finally:
+            cancelled.set()
+            executor.shutdown(wait=False)
+            self.seconds = time.perf_counter() - started
+
+    def __list(self, selector: str):
+        return self.__service.list(
+            selector, time_from=self.__time_from, time_to=self.__time_to, fields=self.__fields, page_size=self.__page_size
+        )
+
+    def __probe(self, put, entity_type: str):
+        self.stats[entity_type].started = time.perf_counter()
+        put((_PROBE, entity_type, self.__list(type_selector(entity_type)).prefetch()))
+
+    def __list_shard(self, put, entity_type: str, selector: str, entities=None):
+        if entities is None:
+            entities = self.__list(selector)
+        batch: List["Entity"] = []
+        for entity in entities:
+            batch.append(entity)
+            if len(batch) >= self.__page_size:
+                if not put((_ENTITIES, entity_type, batch)):
+                    return
+                batch = []
+        if batch and not put((_ENTITIES, entity_type, batch)):
+            return
+        put((_DONE, entity_type, None))
@@ -0,0 +1,338 @@
+"""
+Copyright 2021 Dynatrace LLC
+
+Licensed under the Apache License, Version 2.0 (the "License");
+you may not use this file except in compliance with the License.
+You may obtain a copy of the License at
+
+    http://www.apache.org/licenses/LICENSE-2.0
+
+Unless required by applicable law or agreed to in writing, software
+distributed under the License is distributed on an "AS IS" BASIS,
+WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+See the License for the specific language governing permissions and
+limitations under the License.
+"""
+
+import hashlib
+import json
+import sqlite3
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from datetime import timedelta
+from typing import Any, Callable, Dict, Iterable, List, Optional, Sequence, Tuple
+
+from dynatrace.environment_v2.monitored_entities import Entity, EntityService, entity_type_of
+from dynatrace.utils import type_selector
+
+# The fields requested by EntitySync, relationships are left out by default as they make the responses much larger
+DEFAULT_SYNC_FIELDS = "+firstSeenTms,+lastSeenTms,+tags,+managementZones,+properties"
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS entities (
+    entity_id TEXT PRIMARY KEY,
+    type TEXT NOT NULL,
+    display_name TEXT,
+    first_seen INTEGER,
+    last_seen INTEGER,
+    content_hash TEXT NOT NULL,
+    raw TEXT NOT NULL
+);
+CREATE INDEX IF NOT EXISTS entities_type ON entities (type, last_seen);
+CREATE INDEX IF NOT EXISTS entities_last_seen ON entities (last_seen);
+CREATE TABLE IF NOT EXISTS entity_tags (
+    entity_id TEXT NOT NULL,
+    context TEXT,
+    key TEXT NOT NULL,
+    value TEXT,
+    tag TEXT NOT NULL
+);
+CREATE INDEX IF NOT EXISTS entity_tags_tag ON entity_tags (tag);
+CREATE INDEX IF NOT EXISTS entity_tags_key ON entity_tags (key);
+CREATE INDEX IF NOT EXISTS entity_tags_entity ON entity_tags (entity_id);
+CREATE TABLE IF NOT EXISTS entity_management_zones (
+    entity_id TEXT NOT NULL,
+    zone_id TEXT NOT NULL,
+    zone_name TEXT
+);
+CREATE INDEX IF NOT EXISTS entity_management_zones_id ON entity_management_zones (zone_id);
+CREATE INDEX IF NOT EXISTS entity_management_zones_name ON entity_management_zones (zone_name);
+CREATE INDEX IF NOT EXISTS entity_management_zones_entity ON entity_management_zones (entity_id);
+CREATE TABLE IF NOT EXISTS sync_state (
+    type TEXT PRIMARY KEY,
+    checkpoint INTEGER,
+    vanish_check INTEGER
+);
+"""
+
+
+class EntityStore:
+    """A local copy of monitored entities in SQLite, indexed by type, tag, management zone and lastSeenTms.
+
+    Entities are stored as their raw JSON, queries return Entity objects without calling the API. The store can be
+    used from several threads, writes are serialized.
+
+    :param path: The database file, ":memory:" keeps the store in memory
+    """
+
+    def __init__(self, path: str = ":memory:"):
+        self.path = path
+        self.__lock = threading.RLock()
+        self.__db = sqlite3.connect(path, check_same_thread=False)
+        if path != ":memory:":
+            self.__db.execute("PRAGMA journal_mode=WAL")
+        self.__db.executescript(_SCHEMA)
+
+    def close(self):
+        with self.__lock:
+            self.__db.close()
+
+    def __enter__(self) -> "EntityStore":
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        self.close()
+
+    def __len__(self) -> int:
+        return self.count()
+
+    def upsert(self, entities: Iterable[Entity], entity_type: Optional[str] = None) -> Tuple[int, int, int]:
+        """Adds or updates entities. Entities whose content did not change only get their lastSeenTms updated, their
+        tags and management zones are not rewritten
+
+        :param entity_type: The type the entities were listed with, if not set the type of each entity, or the prefix of
+        its ID when it was not requested
+        :return: The amount of added, updated and unchanged entities
+        """
+        rows = []
+        for entity in entities:
+            raw = entity.json()
+            if raw is None:
+                raise ValueError("EntityStore needs the raw JSON of the entities, do not create the client with keep_raw_elements=False")
+            rows.append((entity, raw))
+
+        added = updated = unchanged = 0
+        with self.__lock, self.__db:
+            for entity, raw in rows:
+                entity_id = raw["entityId"]
+                content_hash = _content_hash(raw)
+                existing = self.__db.execute("SELECT content_hash FROM entities WHERE entity_id = ?", (entity_id,)).fetchone()
+                if existing is not None and existing[0] == content_hash:
+                    self.__db.execute("UPDATE entities SET last_seen = ?, raw = ? WHERE entity_id = ?", (raw.get("lastSeenTms"), json.dumps(raw), entity_id))
+                    unchanged += 1
+                    continue
+                if existing is None:
+                    added += 1
+                else:
+                    updated += 1
+                    self.__delete_children([entity_id])
+                self.__db.execute(
+                    "INSERT OR REPLACE INTO entities (entity_id, type, display_name, first_seen, last_seen, content_hash, raw) VALUES (?, ?, ?, ?, ?, ?, ?)",
+                    (entity_id, entity_type or entity_type_of(entity), raw.get("displayName"), raw.get("firstSeenTms"), raw.get("lastSeenTms"), content_hash, json.dumps(raw)),
+                )
+                self.__db.executemany(
+                    "INSERT INTO entity_tags (entity_id, context, key, value, tag) VALUES (?, ?, ?, ?, ?)",
+                    [(entity_id, t.get("context"), t["key"], t.get("value"), t.get("stringRepresentation") or _tag_string(t)) for t in raw.get("tags", [])],
+                )
+                self.__db.executemany(
+                    "INSERT INTO entity_management_zones (entity_id, zone_id, zone_name) VALUES (?, ?, ?)",
+                    [(entity_id, zone["id"], zone.get("name")) for zone in raw.get("managementZones", [])],
+                )
+        return added, updated, unchanged
+
+    def delete(self, entity_ids: Sequence[str]) -> int:
+        with self.__lock, self.__db:
+            self.__delete_children(entity_ids)
+            return sum(self.__db.execute("DELETE FROM entities WHERE entity_id = ?", (entity_id,)).rowcount for entity_id in entity_ids)
+
+    def __delete_children(self, entity_ids: Sequence[str]):
+        for table in ("entity_tags", "entity_management_zones"):
+            self.__db.executemany(f"DELETE FROM {table} WHERE entity_id = ?", [(entity_id,) for entity_id in entity_ids])
+
+    def get(self, entity_id: str) -> Optional[Entity]:
+        with self.__lock:
+            row = self.__db.execute("SELECT raw FROM entities WHERE entity_id = ?", (entity_id,)).fetchone()
+        return Entity(raw_element=json.loads(row[0])) if row is not None else None
+
+    def query(
+        self,
+        entity_type: Optional[str] = None,
+        tag: Optional[str] = None,
+        management_zone: Optional[str] = None,
+        seen_since: Optional[int] = None,
+        seen_before: Optional[int] = None,
+        name_prefix: Optional[str] = None,
+        limit: Optional[int] = None,
+    ) -> List[Entity]:
+        """The stored entities matching all the given criteria, ordered by ID
+
+        :param tag: A tag as displayed ("[Environment]env:prod", "env:prod") or just its key ("env")
+        :param management_zone: The ID or the name of a management zone
+        :param seen_since: Only entities whose lastSeenTms is at or after this timestamp (UTC milliseconds)
+        :param seen_before: Only entities whose lastSeenTms is before this timestamp (UTC milliseconds)
+        """
+        sql, params = self.__where(entity_type, tag, management_zone, seen_since, seen_before, name_prefix)
+        sql = f"SELECT raw FROM entities e{sql} ORDER BY entity_id"
+        if limit is not None:
+            sql += " LIMIT ?"
+            params.append(limit)
+        with self.__lock:
+            rows = self.__db.execute(sql, params).fetchall()
+        return [Entity(raw_element=json.loads(raw)) for raw, in rows]
+
+    def count(self, entity_type: Optional[str] = None, tag: Optional[str] = None, management_zone: Optional[str] = None) -> int:
+        sql, params = self.__where(entity_type, tag, management_zone)
+        with self.__lock:
+            return self.__db.execute(f"SELECT COUNT(*) FROM entities e{sql}", params).fetchone()[0]
+
+    def types(self) -> Dict[str, int]:
+        """The amount of stored entities per type"""
+        with self.__lock:
+            return dict(self.__db.execute("SELECT type, COUNT(*) FROM entities GROUP BY type ORDER BY type").fetchall())
+
+    @staticmethod
+    def __where(entity_type=None, tag=None, management_zone=None, seen_since=None, seen_before=None, name_prefix=None) -> Tuple[str, List[Any]]:
+        clauses, params = [], []
+        if entity_type is not None:
+            clauses.append("e.type = ?")
+            params.append(entity_type)
+        if tag is not None:
+            clauses.append("EXISTS (SELECT 1 FROM entity_tags t WHERE t.entity_id = e.entity_id AND (t.tag = ? OR t.key = ?))")
+            params += [tag, tag]
+        if management_zone is not None:
+            clauses.append("EXISTS (SELECT 1 FROM entity_management_zones z WHERE z.entity_id = e.entity_id AND (z.zone_id = ? OR z.zone_name = ?))")
+            params += [management_zone, management_zone]
+        if seen_since is not None:
+            clauses.append("e.last_seen >= ?")
+            params.append(seen_since)
+        if seen_before is not None:
+            clauses.append("e.last_seen < ?")
+            params.append(seen_before)
+        if name_prefix is not None:
+            clauses.append("e.display_name LIKE ? ESCAPE '\\'")
+            params.append(name_prefix.replace("\\", "\\\\").replace("%", "\\%").replace("_", "\\_") + "%")
+        return (" WHERE " + " AND ".join(clauses) if clauses else ""), params
+
+    def checkpoint(self, entity_type: str) -> Tuple[Optional[int], Optional[int]]:
+        """The time of the last sync of a type and of its last check for vanished entities (UTC milliseconds)"""
+        with self.__lock:
+            row = self.__db.execute("SELECT checkpoint, vanish_check FROM sync_state WHERE type = ?", (entity_type,)).fetchone()
+        return (row[0], row[1]) if row is not None else (None, None)
+
+    def set_checkpoint(self, entity_type: str, checkpoint: Optional[int], vanish_check: Optional[int] = None):
+        with self.__lock, self.__db:
+            updated = self.__db.execute(
+                "UPDATE sync_state SET checkpoint = ?, vanish_check = COALESCE(?, vanish_check) WHERE type = ?", (checkpoint, vanish_check, entity_type)
+            ).rowcount
+            if not updated:
+                self.__db.execute("INSERT INTO sync_state (type, checkpoint, vanish_check) VALUES (?, ?, ?)", (entity_type, checkpoint, vanish_check))
+
+
+class SyncResult:
+    """What one EntitySync.sync() changed in the store, per entity type"""
+
+    __slots__ = ("entity_type", "full", "added", "updated", "unchanged", "vanished", "seconds")
+
+    def __init__(self, entity_type: str, full: bool):
+        self.entity_type = entity_type
+        self.full = full
+        self.added = 0
+        self.updated = 0
+        self.unchanged = 0
+        self.vanished: List[str] = []
+        self.seconds = 0.0
+
+    def __repr__(self):
+        return (
+            f"SyncResult({self.entity_type}, full={self.full}, added={self.added}, updated={self.updated}, "
+            f"unchanged={self.unchanged}, vanished={len(self.vanished)}, seconds={self.seconds:.2f})"
+        )
+
+
+class EntitySync:
+    """Keeps an EntityStore up to date with a tenant, requesting only the entities seen since the previous sync.
+
+    The first sync of a type lists its entities of the initial timeframe. The following ones use the `from` timeframe
+    to list the entities seen since the last checkpoint (minus `overlap`, for clock skew and ingestion delays). Stored
+    entities whose content did not change only get their lastSeenTms updated.
+    Entities that are not seen anymore are not listed by the API, every vanish_check_interval the entities last seen
+    more than vanished_after ago are removed from the store and reported in SyncResult.vanished.
+    With the default timeframes the store holds the entities seen in the last 3 days, like entities.list without
+    timeframe.
+
+    :param entity_types: The entity types to sync, e.g. ["HOST", "SERVICE"]
+    :param fields: The fields requested, stored and returned by the store queries
+    :param max_workers: The amount of entity types synced concurrently
+    """
+
+    def __init__(
+        self,
+        entities: EntityService,
+        store: EntityStore,
+        entity_types: Iterable[str],
+        fields: str = DEFAULT_SYNC_FIELDS,
+        initial_timeframe: timedelta = timedelta(days=3),
+        overlap: timedelta = timedelta(minutes=5),
+        vanished_after: timedelta = timedelta(days=3),
+        vanish_check_interval: timedelta = timedelta(minutes=30),
+        page_size: int = 500,
+        max_workers: int = 4,
+        clock: Callable[[], float] = time.time,
+    ):
+        self.entities = entities
+        self.store = store
+        self.entity_types = list(entity_types)
+        self.fields = fields
+        self.initial_timeframe = initial_timeframe
+        self.overlap = overlap
+        self.vanished_after = vanished_after
+        self.vanish_check_interval = vanish_check_interval
+        self.page_size = page_size
+        self.max_workers = max_workers
+        self.__clock = clock
+
+    def sync(self) -> List[SyncResult]:
+        """Syncs every entity type, the results are in the order of entity_types"""
+        now = int(self.__clock() * 1000)
+        with ThreadPoolExecutor(max_workers=self.max_workers) as executor:
+            return list(executor.map(lambda entity_type: self.sync_type(entity_type, now), self.entity_types))
+
+    def sync_type(self, entity_type: str, now: Optional[int] = None) -> SyncResult:
+        started = time.perf_counter()
+        now = int(self.__clock() * 1000) if now is None else now
+        checkpoint, vanish_check = self.store.checkpoint(entity_type)
+        result = SyncResult(entity_type, full=checkpoint is None)
+        if checkpoint is None:
+            time_from = now - _ms(self.initial_timeframe)
+        else:
+            time_from = checkpoint - _ms(self.overlap)
+
+        entities = self.entities.list(type_selector(entity_type), time_from=str(time_from), time_to=str(now), fields=self.fields, page_size=self.page_size)
+        result.added, result.updated, result.unchanged = self.store.upsert(entities, entity_type)
+
+        if vanish_check is None or now - vanish_check >= _ms(self.vanish_check_interval):
+            stale = self.store.query(entity_type=entity_type, seen_before=now - _ms(self.vanished_after))
+            result.vanished = [entity.entity_id for entity in stale]
+            self.store.delete(result.vanished)
+            vanish_check = now
+        self.store.set_checkpoint(entity_type, now, vanish_check)
+        result.seconds = time.perf_counter() - started
+        return result
+
+
+def _ms(delta: timedelta) -> int:
+    return int(delta.total_seconds() * 1000)
+
+
+def _content_hash(raw: Dict[str, Any]) -> str:
+    # lastSeenTms changes all the time for live entities, it is not part of the content
+    content = {key: value for key, value in raw.items() if key != "lastSeenTms"}
+    return hashlib.sha1(json.dumps(content, sort_keys=True).encode("utf-8")).hexdigest()
+
+
+def _tag_string(tag: Dict[str, Any]) -> str:
+    context = tag.get("context")
+    prefix = f"[{context}]" if context and context != "CONTEXTLESS" else ""
+    value = tag.get("value")
+    return f"{prefix}{tag['key']}:{value}" if value is not None else f"{prefix}{tag['key']}"
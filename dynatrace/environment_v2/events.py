@@ -24,6 +24,7 @@ from datetime import datetime
 
 from dynatrace.dynatrace_object import DynatraceObject
 from dynatrace.http_client import HttpClient
+from dynatrace.metadata_cache import KIND_EVENT_TYPE, cached, warm_up
 from dynatrace.pagination import PaginatedList
 from dynatrace.utils import int64_to_datetime, datetime_to_int64, timestamp_to_string
 from dynatrace.environment_v2.custom_tags import METag
@@ -101,9 +102,19 @@ class EventServiceV2:
 
         :returns EventType: the event type requested
         """
+        return cached(self.__http_client, KIND_EVENT_TYPE, event_type, lambda: self.__get_type(event_type))
+
+    def __get_type(self, event_type: str) -> "EventType":
         response = self.__http_client.make_request(path=f"{self.ENDPOINT_TYPES}/{event_type}")
         return EventType(raw_element=response.json(), http_client=self.__http_client)
 
+    def warm_up_cache(self) -> int:
+        """Loads every event type in the metadata cache of the client
+
+        :return: The amount of event types loaded
+        """
+        return warm_up(self.__http_client, KIND_EVENT_TYPE, self.list_types(page_size=500), lambda event_type: event_type.type)
+
     def ingest(
         self,
         event_type: str,
@@ -140,6 +151,24 @@ class EventServiceV2:
 
 
 class Event(DynatraceObject):
+    __slots__ = (
+        "event_id",
+        "event_type",
+        "start_time",
+        "entity_tags",
+        "suppress_alert",
+        "frequent_event",
+        "suppress_problem",
+        "under_maintenance",
+        "entity_id",
+        "management_zones",
+        "properties",
+        "status",
+        "title",
+        "correlation_id",
+        "end_time",
+    )
+
     def _create_from_raw_data(self, raw_element: Dict[str, Any]):
         # Mandatory
         self.event_id: str = raw_element["eventId"]
@@ -19,6 +19,7 @@ from typing import Any, Dict, List, Optional, Union
 
 from dynatrace.dynatrace_object import DynatraceObject
 from dynatrace.http_client import HttpClient
+from dynatrace.metadata_cache import KIND_EXTENSION_SCHEMA, cached
 from dynatrace.pagination import PaginatedList
 
 
@@ -157,7 +158,13 @@ class ExtensionsServiceV2:
         return SchemaFiles(raw_element=response.json())
 
     def get_schema_file(self, schema_version: str, file_name: str) -> Dict[str, Any]:
-        return self.__http_client.make_request(f"{self.SCHEMA_ENDPOINT}/{schema_version}/{file_name}").json()
+        """Gets a file of an extension schema, from the metadata cache when the client has one (the result must not be modified)"""
+        return cached(
+            self.__http_client,
+            KIND_EXTENSION_SCHEMA,
+            (schema_version, file_name),
+            lambda: self.__http_client.make_request(f"{self.SCHEMA_ENDPOINT}/{schema_version}/{file_name}").json(),
+        )
 
     def post_monitoring_configurations(self,
                                        extension_name: str,
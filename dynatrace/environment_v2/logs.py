@@ -40,6 +40,7 @@ class LogService:
         time_to: Optional[Union[datetime, str]] = None,
         sort: Optional[str] = None,
         page_size: Optional[int] = None,
+        stream: bool = False,
     ) -> PaginatedList["LogRecord"]:
         """
         Gets the log records matching the provided criteria. Retrieves all records using pagination.
@@ -48,6 +49,7 @@ class LogService:
         :param time_from: Start of the requested timeframe
         :param time_to: End of the requested timefram
         :param sort: Defines the ordering of log records
+        :param stream: Decode the records one by one as each page is received, instead of loading whole pages in memory
         :return A list of log records
         """
         params = {
@@ -57,7 +59,7 @@ class LogService:
             "to": timestamp_to_string(time_to),
             "sort": sort,
         }
-        return PaginatedList(LogRecord, self.__http_client, "/api/v2/logs/export", params, list_item="results")
+        return PaginatedList(LogRecord, self.__http_client, "/api/v2/logs/export", params, list_item="results", stream=stream)
 
     def ingest(self, payload: Union[Dict[str, Any], List[Dict[str, Any]]]) -> Response:
         """
@@ -69,6 +71,8 @@ class LogService:
         return self.__http_client.make_request(f"{self.ENDPOINT}/ingest", params=payload, method="POST", headers=headers)
     
 class LogRecord(DynatraceObject):
+    __slots__ = ("additional_columns", "event_type", "timestamp", "content", "status")
+
     def _create_from_raw_data(self, raw_element: Dict[str, Any]):
         self.additional_columns: dict = raw_element.get("additionalColumns")
         self.event_type: EventType = EventType(raw_element.get("eventType"))
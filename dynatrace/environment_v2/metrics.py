@@ -14,16 +14,59 @@ See the License for the specific language governing permissions and
 limitations under the License.
 """
 
-from datetime import datetime
+import math
+import re
+import threading
+import time
+from array import array
+from concurrent.futures import Future, ThreadPoolExecutor
+from datetime import datetime, timedelta, timezone
 from enum import Enum
-from typing import List, Optional, Union, Dict, Any
+from typing import Callable, List, Optional, Union, Dict, Any, Sequence, Tuple
 
 from requests import Response
 
-from dynatrace.dynatrace_object import DynatraceObject
-from dynatrace.http_client import HttpClient
+try:
+    import numpy as np
+except ImportError:  # pragma: no cover - optional dependency
+    np = None
+
+from dynatrace.compression import gzip_body
+from dynatrace.dynatrace_object import DynatraceObject, LazyField, from_response
+from dynatrace.http_client import HttpClient, DynatraceHttpError
+from dynatrace.metadata_cache import KIND_METRIC, cached, warm_up
 from dynatrace.pagination import PaginatedList
-from dynatrace.utils import timestamp_to_string, int64_to_datetime
+from dynatrace.utils import entity_id_selectors, timestamp_to_string, int64_to_datetime
+
+
+# Data points per series requested by each shard of query_sharded, well below the API limits
+SHARD_MAX_DATA_POINTS = 1000
+
+# Every property of a metric descriptor, by default list() only returns the id, name, description and unit
+METRIC_DESCRIPTOR_FIELDS = (
+    "+displayName,+description,+unit,+aggregationTypes,+transformations,+defaultAggregation,+dimensionDefinitions,+entityType,"
+    "+minimumValue,+maximumValue,+tags,+created,+lastWritten,+dduBillable,+metricValueType,+latency,+scalar,+rootCauseRelevant,+impactRelevant"
+)
+
+# The metrics ingest endpoint accepts payloads of up to 1 MB (uncompressed) per request
+INGEST_MAX_PAYLOAD_BYTES = 1000 * 1000
+INGEST_ENDPOINT = "/api/v2/metrics/ingest"
+
+_RESOLUTION_UNITS_MS = {"s": 1000, "m": 60 * 1000, "h": 60 * 60 * 1000, "d": 24 * 60 * 60 * 1000, "w": 7 * 24 * 60 * 60 * 1000}
+
+
+def _resolution_ms(resolution: Optional[str]) -> Optional[int]:
+    """The interval of a time-based resolution (e.g. 5m) in milliseconds, None for other resolutions"""
+    match = re.fullmatch(r"(\d+)([smhdw])", resolution or "")
+    if match is None:
+        return None
+    return int(match.group(1)) * _RESOLUTION_UNITS_MS[match.group(2)]
+
+
+def _epoch_ms(timestamp: datetime) -> int:
+    if timestamp.tzinfo is None:
+        timestamp = timestamp.replace(tzinfo=timezone.utc)
+    return int(timestamp.timestamp() * 1000)
 
 
 class MetricService:
@@ -38,8 +81,14 @@ class MetricService:
         time_to: Optional[Union[datetime, str]] = None,
         entity_selector: Optional[str] = None,
         mz_selector: Optional[str] = None,
-    ) -> PaginatedList["MetricSeriesCollection"]:
-
+        columnar: bool = False,
+    ) -> Union[PaginatedList["MetricSeriesCollection"], PaginatedList["ColumnarMetricSeriesCollection"]]:
+        """Gets data points of the specified metrics.
+
+        :param columnar: Return ColumnarMetricSeriesCollection objects, where the timestamps and values of each series are
+            int64 (epoch milliseconds) and float64 arrays, instead of lists of datetimes and floats.
+            NumPy arrays are used when NumPy is installed, array.array otherwise.
+        """
         params = {
             "metricSelector": metric_selector,
             "resolution": resolution,
@@ -48,7 +97,114 @@ class MetricService:
             "entitySelector": entity_selector,
             "mzSelector": mz_selector
         }
-        return PaginatedList(MetricSeriesCollection, self.__http_client, "/api/v2/metrics/query", params, list_item="result")
+        target_class = ColumnarMetricSeriesCollection if columnar else MetricSeriesCollection
+        return PaginatedList(target_class, self.__http_client, "/api/v2/metrics/query", params, list_item="result")
+
+    def query_sharded(
+        self,
+        metric_selector: str,
+        resolution: str,
+        time_from: datetime,
+        time_to: datetime,
+        entity_selector: Optional[str] = None,
+        mz_selector: Optional[str] = None,
+        entity_ids: Optional[List[str]] = None,
+        entities_per_shard: int = 100,
+        shard_duration: Optional[timedelta] = None,
+        max_workers: int = 4,
+        columnar: bool = False,
+    ) -> Union[List["MetricSeriesCollection"], List["ColumnarMetricSeriesCollection"]]:
+        """Gets data points of the specified metrics, splitting the request in smaller queries that run concurrently.
+
+        The timeframe is split in shards of shard_duration, aligned to the resolution. By default a shard holds
+        SHARD_MAX_DATA_POINTS data points per series. When entity_ids is given, each shard also queries at most
+        entities_per_shard of these entities, fewer when their selector would exceed the 10,000 characters limit. The results are merged by metric and dimensions, when shards
+        return the same timestamp for a series the first value is kept.
+
+        :param resolution: A time-based resolution, such as 1m or 1h. Other resolutions (Inf, amount of data points) change
+            their meaning when the timeframe is split, they require an explicit shard_duration.
+        :param time_from: The start of the requested timeframe, relative timeframes (now-2h) can not be split
+        :param time_to: The end of the requested timeframe
+        :param entity_ids: Entities to query, used instead of entity_selector
+        :param max_workers: The amount of shards requested concurrently
+
+        :return: one collection per metric, in the order the API returned them
+        """
+        if not isinstance(time_from, datetime) or not isinstance(time_to, datetime):
+            raise ValueError("query_sharded requires time_from and time_to as datetime objects")
+        if entity_ids is not None and entity_selector is not None:
+            raise ValueError("Use either entity_selector or entity_ids, not both")
+
+        start, end = _epoch_ms(time_from), _epoch_ms(time_to)
+        resolution_ms = _resolution_ms(resolution)
+        if shard_duration is not None:
+            shard_ms = int(shard_duration.total_seconds() * 1000)
+        elif resolution_ms is not None:
+            shard_ms = resolution_ms * SHARD_MAX_DATA_POINTS
+        else:
+            raise ValueError(f"Can not derive the shard duration from the resolution '{resolution}', set shard_duration")
+        if resolution_ms is not None:
+            # Shard boundaries fall on data point boundaries, so no data point is split between two shards
+            shard_ms = max(resolution_ms, shard_ms // resolution_ms * resolution_ms)
+
+        windows = []
+        shard_start = start
+        while shard_start < end:
+            shard_end = (shard_start // shard_ms + 1) * shard_ms if resolution_ms is not None else shard_start + shard_ms
+            windows.append((shard_start, min(shard_end, end)))
+            shard_start = shard_end
+
+        entity_selectors = [entity_selector]
+        if entity_ids is not None:
+            entity_selectors = entity_id_selectors(entity_ids, max_ids=entities_per_shard)
+
+        def run_shard(shard):
+            (shard_from, shard_to), shard_entity_selector = shard
+            params = {
+                "metricSelector": metric_selector,
+                "resolution": resolution,
+                "from": str(shard_from),
+                "to": str(shard_to),
+                "entitySelector": shard_entity_selector,
+                "mzSelector": mz_selector,
+            }
+            # The raw collections are merged, they are not decoded into objects (which may not keep their raw element)
+            return list(PaginatedList(_raw_element, self.__http_client, "/api/v2/metrics/query", params, list_item="result"))
+
+        shards = [(window, selector) for selector in entity_selectors for window in windows]
+        with ThreadPoolExecutor(max_workers=max_workers) as executor:
+            results = list(executor.map(run_shard, shards))
+
+        merged: Dict[str, Dict[str, Any]] = {}
+        for collections in results:
+            for raw in collections:
+                target = merged.setdefault(raw.get("metricId"), {"metricId": raw.get("metricId"), "series": {}, "warnings": []})
+                for warning in raw.get("warnings") or []:
+                    if warning not in target["warnings"]:
+                        target["warnings"].append(warning)
+                for series in raw.get("data", []):
+                    key = tuple(series.get("dimensions", []))
+                    points = target["series"].setdefault(key, {"dimensions": series.get("dimensions", []), "dimensionMap": series.get("dimensionMap", {}), "points": {}})
+                    for timestamp, value in zip(series.get("timestamps", []), series.get("values", [])):
+                        points["points"].setdefault(timestamp, value)
+
+        target_class = ColumnarMetricSeriesCollection if columnar else MetricSeriesCollection
+        stitched = []
+        for metric in merged.values():
+            data = []
+            for series in metric["series"].values():
+                timestamps = sorted(series["points"])
+                data.append(
+                    {
+                        "dimensions": series["dimensions"],
+                        "dimensionMap": series["dimensionMap"],
+                        "timestamps": timestamps,
+                        "values": [series["points"][timestamp] for timestamp in timestamps],
+                    }
+                )
+            raw_collection = {"metricId": metric["metricId"], "data": data, "warnings": metric["warnings"] or None}
+            stitched.append(from_response(target_class, self.__http_client, None, raw_collection))
+        return stitched
 
     def list(
         self,
@@ -70,20 +226,230 @@ class MetricService:
         return PaginatedList(MetricDescriptor, self.__http_client, "/api/v2/metrics", params, list_item="metrics")
 
     def get(self, metric_id: str) -> "MetricDescriptor":
+        """Gets the descriptor of a metric, from the metadata cache when the client has one"""
+        return cached(self.__http_client, KIND_METRIC, metric_id, lambda: self.__get(metric_id))
+
+    def __get(self, metric_id: str) -> "MetricDescriptor":
         response = self.__http_client.make_request(f"/api/v2/metrics/{metric_id}").json()
         return MetricDescriptor(http_client=self.__http_client, raw_element=response)
 
+    def warm_up_cache(self, metric_selector: Optional[str] = None) -> int:
+        """Loads the descriptors of the metrics matching metric_selector (all metrics by default) in the metadata cache
+
+        :return: The amount of descriptors loaded
+        """
+        descriptors = self.list(metric_selector=metric_selector, fields=METRIC_DESCRIPTOR_FIELDS, page_size=500)
+        return warm_up(self.__http_client, KIND_METRIC, descriptors, lambda descriptor: descriptor.metric_id)
+
     def delete(self, metric_id) -> Response:
         return self.__http_client.make_request(f"/api/v2/metrics/{metric_id}", method="DELETE")
 
     def ingest(self, lines: List[str]):
         lines = "\n".join(lines).encode("utf-8")
         return self.__http_client.make_request(
-            f"/api/v2/metrics/ingest", method="POST", data=lines, headers={"Content-Type": "text/plain; charset=utf-8"}
+            INGEST_ENDPOINT, method="POST", data=lines, headers={"Content-Type": "text/plain; charset=utf-8"}
         ).json()
 
+    def ingest_batcher(self, **kwargs) -> "MetricIngestBatcher":
+        """Creates a MetricIngestBatcher sending its batches through this service's http client
+
+        :param kwargs: The options of MetricIngestBatcher (max_lines, max_bytes, max_age_seconds, compress, max_workers,
+            max_pending_batches, on_result)
+        """
+        return MetricIngestBatcher(self.__http_client, **kwargs)
+
+
+class MetricIngestResult:
+    """The outcome of one batch sent by a MetricIngestBatcher"""
+
+    __slots__ = ("lines", "payload_bytes", "lines_ok", "lines_invalid", "error", "exception")
+
+    def __init__(self, lines: int, payload_bytes: int, response: Optional[Dict[str, Any]] = None, exception: Optional[BaseException] = None):
+        self.lines: int = lines
+        self.payload_bytes: int = payload_bytes
+        response = response or {}
+        self.lines_ok: int = response.get("linesOk") or 0
+        self.lines_invalid: int = response.get("linesInvalid") or 0
+        self.error: Optional[Dict[str, Any]] = response.get("error")
+        self.exception: Optional[BaseException] = exception
+
+    @property
+    def failed(self) -> bool:
+        """True when the batch was not accepted at all, as opposed to some of its lines being invalid"""
+        return self.exception is not None and not self.lines_ok and not self.lines_invalid
+
+    def __repr__(self):
+        return f"MetricIngestResult(lines={self.lines}, lines_ok={self.lines_ok}, lines_invalid={self.lines_invalid}, failed={self.failed})"
+
+
+class MetricIngestBatcher:
+    """Accumulates metric lines (line protocol) and sends them to the ingest endpoint in batches.
+
+    A batch is sent when it reaches max_lines lines, when adding a line would make it larger than max_bytes, or when its
+    oldest line is older than max_age_seconds. Batches are gzip compressed and sent concurrently by max_workers threads.
+    When max_pending_batches batches are waiting to be sent, add() blocks until one of them is done.
+
+    The batcher is thread safe, and can be used as a context manager, leaving the block flushes and waits for all batches.
+
+    :param on_result: Called with a MetricIngestResult for every batch, from the thread that sent it
+    """
+
+    def __init__(
+        self,
+        http_client: HttpClient,
+        max_lines: int = 1000,
+        max_bytes: int = INGEST_MAX_PAYLOAD_BYTES,
+        max_age_seconds: Optional[float] = 5.0,
+        compress: bool = True,
+        max_workers: int = 4,
+        max_pending_batches: Optional[int] = None,
+        on_result: Optional[Callable[[MetricIngestResult], Any]] = None,
+    ):
+        if max_lines < 1 or max_bytes < 1:
+            raise ValueError("max_lines and max_bytes must be positive")
+        self.__http_client = http_client
+        self.max_lines = max_lines
+        self.max_bytes = max_bytes
+        self.max_age_seconds = max_age_seconds
+        self.compress = compress
+        self.on_result = on_result
+
+        self.batches_sent = 0
+        self.batches_failed = 0
+        self.lines_ok = 0
+        self.lines_invalid = 0
+
+        self.__lock = threading.Lock()
+        # Separate from __lock: a producer holding __lock can be blocked until a worker finishes its batch
+        self.__stats_lock = threading.Lock()
+        self.__lines: List[bytes] = []
+        self.__size = 0
+        self.__oldest: Optional[float] = None
+        self.__pending: List[Future] = []
+        self.__closed = False
+        self.__executor = ThreadPoolExecutor(max_workers=max_workers)
+        self.__slots = threading.BoundedSemaphore(max_pending_batches or max_workers * 2)
+
+        self.__stop = threading.Event()
+        self.__flusher = None
+        if max_age_seconds:
+            self.__flusher = threading.Thread(target=self.__flush_old_batches, name="MetricIngestBatcher", daemon=True)
+            self.__flusher.start()
+
+    def add(self, line: str):
+        """Adds one line to the current batch, sending the batch if it is full"""
+        encoded = line.encode("utf-8")
+        if len(encoded) + 1 > self.max_bytes:
+            raise ValueError(f"The line is larger than max_bytes ({self.max_bytes} bytes): {line[:100]}")
+        with self.__lock:
+            if self.__closed:
+                raise RuntimeError("The batcher is closed")
+            # Lines are joined with a newline, count it with the line
+            if self.__size + len(encoded) + 1 > self.max_bytes:
+                self.__send_locked()
+            if not self.__lines:
+                self.__oldest = time.monotonic()
+            self.__lines.append(encoded)
+            self.__size += len(encoded) + 1
+            if len(self.__lines) >= self.max_lines:
+                self.__send_locked()
+
+    def add_lines(self, lines: Sequence[str]):
+        for line in lines:
+            self.add(line)
+
+    def flush(self) -> Optional[Future]:
+        """Sends the current batch, without waiting for it to complete
+
+        :return: A future resolving to the MetricIngestResult of the batch, None if there were no lines to send
+        """
+        with self.__lock:
+            return self.__send_locked()
+
+    def wait(self, timeout: Optional[float] = None) -> List[MetricIngestResult]:
+        """Flushes the current batch and waits until all batches are sent
+
+        :return: The results of the batches that were pending
+        """
+        self.flush()
+        with self.__lock:
+            pending, self.__pending = self.__pending, []
+        return [future.result(timeout) for future in pending]
+
+    def close(self):
+        """Sends the remaining lines, waits for all batches and stops the worker threads"""
+        self.__stop.set()
+        if self.__flusher is not None:
+            self.__flusher.join()
+        try:
+            self.wait()
+        finally:
+            with self.__lock:
+                self.__closed = True
+            self.__executor.shutdown()
+
+    def __enter__(self) -> "MetricIngestBatcher":
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        self.close()
+
+    def __send_locked(self) -> Optional[Future]:
+        if not self.__lines:
+            return None
+        payload = b"\n".join(self.__lines)
+        line_count = len(self.__lines)
+        self.__lines = []
+        self.__size = 0
+        self.__oldest = None
+
+        # Backpressure: wait for a free slot, this blocks the producers calling add()
+        self.__slots.acquire()
+        future = self.__executor.submit(self.__send, payload, line_count)
+        future.add_done_callback(lambda _: self.__slots.release())
+        self.__pending = [pending for pending in self.__pending if not pending.done()]
+        self.__pending.append(future)
+        return future
+
+    def __send(self, payload: bytes, line_count: int) -> MetricIngestResult:
+        headers = {"Content-Type": "text/plain; charset=utf-8"}
+        data = payload
+        if self.compress:
+            headers["Content-Encoding"] = "gzip"
+            data = gzip_body(payload)
+        try:
+            response = self.__http_client.make_request(INGEST_ENDPOINT, method="POST", data=data, headers=headers)
+            result = MetricIngestResult(line_count, len(data), response.json())
+        except DynatraceHttpError as e:
+            # A 400 still carries the counts when only part of the lines are invalid
+            try:
+                body = e.response.json()
+            except ValueError:
+                body = None
+            result = MetricIngestResult(line_count, len(data), body if isinstance(body, dict) else None, e)
+        except Exception as e:
+            result = MetricIngestResult(line_count, len(data), None, e)
+
+        with self.__stats_lock:
+            self.batches_sent += 1
+            self.batches_failed += 1 if result.failed else 0
+            self.lines_ok += result.lines_ok
+            self.lines_invalid += result.lines_invalid
+        if self.on_result is not None:
+            self.on_result(result)
+        return result
+
+    def __flush_old_batches(self):
+        interval = min(self.max_age_seconds, 1.0) / 2
+        while not self.__stop.wait(interval):
+            with self.__lock:
+                if self.__oldest is not None and time.monotonic() - self.__oldest >= self.max_age_seconds:
+                    self.__send_locked()
+
 
 class MetricSeries(DynatraceObject):
+    __slots__ = ("timestamps", "dimensions", "values", "dimension_map")
+
     def _create_from_raw_data(self, raw_element):
         self.timestamps: List[datetime] = [int64_to_datetime(timestamp) for timestamp in raw_element.get("timestamps", [])]
         self.dimensions: List[str] = raw_element.get("dimensions", [])
@@ -98,6 +464,152 @@ class MetricSeriesCollection(DynatraceObject):
         self.warnings: Optional[List[str]] = raw_element.get("warnings")
 
 
+def _raw_element(http_client, headers, raw_element: Dict[str, Any]) -> Dict[str, Any]:
+    return raw_element
+
+
+def _int64_array(values: Sequence[int]):
+    if np is not None:
+        return np.asarray(values, dtype=np.int64)
+    return array("q", values)
+
+
+def _float64_array(values: Sequence[Optional[float]]):
+    # The API reports missing data points as null, they become NaN
+    values = [math.nan if value is None else value for value in values]
+    if np is not None:
+        return np.asarray(values, dtype=np.float64)
+    return array("d", values)
+
+
+_AGGREGATIONS = ("sum", "avg", "min", "max", "count")
+
+
+def _aggregate(buckets: Sequence[int], values: Sequence[float], aggregation: str) -> Tuple[Any, Any]:
+    """Aggregates the values sharing the same bucket, ignoring NaN. Returns the sorted buckets and the aggregated values"""
+    if aggregation not in _AGGREGATIONS:
+        raise ValueError(f"Unsupported aggregation '{aggregation}', use one of {_AGGREGATIONS}")
+
+    if np is not None:
+        buckets = np.asarray(buckets, dtype=np.int64)
+        values = np.asarray(values, dtype=np.float64)
+        keys, index = np.unique(buckets, return_inverse=True)
+        present = ~np.isnan(values)
+        counts = np.bincount(index[present], minlength=len(keys)).astype(np.float64)
+        if aggregation == "count":
+            return keys, counts
+        if aggregation in ("sum", "avg"):
+            result = np.bincount(index[present], weights=values[present], minlength=len(keys))
+            if aggregation == "avg":
+                with np.errstate(invalid="ignore", divide="ignore"):
+                    result = result / counts
+        else:
+            result = np.full(len(keys), np.inf if aggregation == "min" else -np.inf)
+            (np.minimum if aggregation == "min" else np.maximum).at(result, index[present], values[present])
+        result[counts == 0] = np.nan
+        return keys, result
+
+    grouped: Dict[int, List[float]] = {}
+    for bucket, value in zip(buckets, values):
+        group = grouped.setdefault(bucket, [])
+        if not math.isnan(value):
+            group.append(value)
+    keys = sorted(grouped)
+    functions = {"sum": sum, "avg": lambda v: sum(v) / len(v), "min": min, "max": max}
+    result = []
+    for key in keys:
+        group = grouped[key]
+        if aggregation == "count":
+            result.append(float(len(group)))
+        else:
+            result.append(functions[aggregation](group) if group else math.nan)
+    return array("q", keys), array("d", result)
+
+
+class ColumnarMetricSeries(DynatraceObject):
+    """A metric series with its timestamps (epoch milliseconds) and values stored in int64 and float64 arrays"""
+
+    __slots__ = ("timestamps_ms", "values", "dimensions", "dimension_map")
+
+    def _create_from_raw_data(self, raw_element):
+        self.timestamps_ms = _int64_array(raw_element.get("timestamps", []))
+        self.values = _float64_array(raw_element.get("values", []))
+        self.dimensions: List[str] = raw_element.get("dimensions", [])
+        self.dimension_map: Optional[Dict[str, Any]] = raw_element.get("dimensionMap", {})
+
+    @property
+    def timestamps(self) -> List[datetime]:
+        """The timestamps as datetimes, created on every access"""
+        return [int64_to_datetime(int(timestamp)) for timestamp in self.timestamps_ms]
+
+    def resample(self, interval_ms: int, aggregation: str = "avg") -> "ColumnarMetricSeries":
+        """Aggregates the data points in buckets of interval_ms milliseconds, ignoring missing values.
+
+        :param aggregation: one of sum, avg, min, max, count
+        """
+        if np is not None:
+            buckets = self.timestamps_ms // interval_ms * interval_ms
+        else:
+            buckets = [timestamp // interval_ms * interval_ms for timestamp in self.timestamps_ms]
+        timestamps, values = _aggregate(buckets, self.values, aggregation)
+        return _columnar_series(timestamps, values, self.dimensions, self.dimension_map)
+
+
+def _columnar_series(timestamps_ms, values, dimensions: List[str], dimension_map: Dict[str, Any]) -> ColumnarMetricSeries:
+    series = ColumnarMetricSeries(raw_element={"dimensions": dimensions, "dimensionMap": dimension_map})
+    series.timestamps_ms = timestamps_ms
+    series.values = values
+    return series
+
+
+class ColumnarMetricSeriesCollection(DynatraceObject):
+    __slots__ = ("metric_id", "data", "warnings")
+
+    def _create_from_raw_data(self, raw_element: dict):
+        self.metric_id: str = raw_element.get("metricId")
+        self.data: List[ColumnarMetricSeries] = [ColumnarMetricSeries(self._http_client, self._headers, series) for series in raw_element.get("data", [])]
+        self.warnings: Optional[List[str]] = raw_element.get("warnings")
+
+    def _combine(self, aggregation: str) -> ColumnarMetricSeries:
+        if np is not None:
+            timestamps = np.concatenate([series.timestamps_ms for series in self.data]) if self.data else np.empty(0, dtype=np.int64)
+            values = np.concatenate([series.values for series in self.data]) if self.data else np.empty(0)
+        else:
+            timestamps = [timestamp for series in self.data for timestamp in series.timestamps_ms]
+            values = [value for series in self.data for value in series.values]
+        timestamps, values = _aggregate(timestamps, values, aggregation)
+        return _columnar_series(timestamps, values, [], {})
+
+    def sum(self) -> ColumnarMetricSeries:
+        """The sum of all series at each timestamp, ignoring missing values"""
+        return self._combine("sum")
+
+    def avg(self) -> ColumnarMetricSeries:
+        """The average of all series at each timestamp, ignoring missing values"""
+        return self._combine("avg")
+
+    def resample(self, interval_ms: int, aggregation: str = "avg") -> "ColumnarMetricSeriesCollection":
+        """Resamples every series, see ColumnarMetricSeries.resample"""
+        collection = ColumnarMetricSeriesCollection(raw_element={"metricId": self.metric_id, "warnings": self.warnings})
+        collection.data = [series.resample(interval_ms, aggregation) for series in self.data]
+        return collection
+
+    def to_pandas(self):
+        """Returns a pandas DataFrame with one row per data point: timestamp, value and one column per dimension"""
+        import pandas as pd
+
+        frames = []
+        for series in self.data:
+            # pandas depends on NumPy, so the series hold NumPy arrays here
+            frame = pd.DataFrame({"timestamp": pd.to_datetime(series.timestamps_ms, unit="ms", utc=True), "value": series.values})
+            for key, value in series.dimension_map.items():
+                frame[key] = value
+            frames.append(frame)
+        if not frames:
+            return pd.DataFrame(columns=["timestamp", "value"])
+        return pd.concat(frames, ignore_index=True)
+
+
 class MetricDefaultAggregation(DynatraceObject):
     def _create_from_raw_data(self, raw_element):
         self.parameter: float = raw_element.get("parameter")
@@ -201,34 +713,52 @@ class Unit(Enum):
 
 
 class MetricDescriptor(DynatraceObject):
-    def _create_from_raw_data(self, raw_element):
-
-        # required
-        self.metric_id: str = raw_element.get("metricId")
-
-        # optional
-        self.aggregation_types: Optional[List[AggregationType]] = [AggregationType(element) for element in raw_element.get("aggregationTypes", [])]
-        self.created: Optional[datetime] = int64_to_datetime(raw_element.get("created"))
-        self.ddu_billable: Optional[bool] = raw_element.get("dduBillable")
-        self.default_aggregation: Optional[MetricDefaultAggregation] = MetricDefaultAggregation(raw_element=raw_element.get("defaultAggregation"))
-        self.description: Optional[str] = raw_element.get("description")
-        self.dimension_definitions: Optional[List[MetricDimensionDefinition]] = [
-            MetricDimensionDefinition(raw_element=element) for element in raw_element.get("dimensionDefinitions", [])
-        ]
-        self.display_name: Optional[str] = raw_element.get("displayName")
-        self.entity_type: Optional[List[str]] = raw_element.get("entityType", [])
-        self.impact_relevant: Optional[bool] = raw_element.get("impactRelevant")
-        self.last_written: Optional[datetime] = int64_to_datetime(raw_element.get("lastWritten"))
-        self.maximum_value: Optional[float] = raw_element.get("maximumValue")
-        self.metric_value_type: Optional["MetricValueType"] = (
-            MetricValueType(raw_element=raw_element.get("metricValueType")) if raw_element.get("metricValueType") else None
-        )
-        self.minimum_value: Optional[float] = raw_element.get("minimumValue")
-        self.root_cause_relevant: Optional[bool] = raw_element.get("rootCauseRelevant")
-        self.tags: Optional[List[str]] = raw_element.get("tags")
-        self.transformations: Optional[List[Transformation]] = [Transformation(element) for element in raw_element.get("transformations", [])]
-        self.unit: Optional[Unit] = Unit(raw_element.get("unit"))
-        self.warnings: Optional[List[str]] = raw_element.get("warnings")
+    # required
+    metric_id: str
+
+    # optional
+    aggregation_types: Optional[List[AggregationType]]
+    created: Optional[datetime]
+    ddu_billable: Optional[bool]
+    default_aggregation: Optional[MetricDefaultAggregation]
+    description: Optional[str]
+    dimension_definitions: Optional[List[MetricDimensionDefinition]]
+    display_name: Optional[str]
+    entity_type: Optional[List[str]]
+    impact_relevant: Optional[bool]
+    last_written: Optional[datetime]
+    maximum_value: Optional[float]
+    metric_value_type: Optional["MetricValueType"]
+    minimum_value: Optional[float]
+    root_cause_relevant: Optional[bool]
+    tags: Optional[List[str]]
+    transformations: Optional[List[Transformation]]
+    unit: Optional[Unit]
+    warnings: Optional[List[str]]
+
+    _lazy_fields = {
+        "metric_id": LazyField("metricId"),
+        "aggregation_types": LazyField("aggregationTypes", lambda types: [AggregationType(element) for element in types], default=list),
+        "created": LazyField("created", int64_to_datetime),
+        "ddu_billable": LazyField("dduBillable"),
+        "default_aggregation": LazyField("defaultAggregation", lambda aggregation: MetricDefaultAggregation(raw_element=aggregation)),
+        "description": LazyField("description"),
+        "dimension_definitions": LazyField(
+            "dimensionDefinitions", lambda definitions: [MetricDimensionDefinition(raw_element=element) for element in definitions], default=list
+        ),
+        "display_name": LazyField("displayName"),
+        "entity_type": LazyField("entityType", default=list),
+        "impact_relevant": LazyField("impactRelevant"),
+        "last_written": LazyField("lastWritten", int64_to_datetime),
+        "maximum_value": LazyField("maximumValue"),
+        "metric_value_type": LazyField("metricValueType", lambda value_type: MetricValueType(raw_element=value_type) if value_type else None),
+        "minimum_value": LazyField("minimumValue"),
+        "root_cause_relevant": LazyField("rootCauseRelevant"),
+        "tags": LazyField("tags"),
+        "transformations": LazyField("transformations", lambda transformations: [Transformation(element) for element in transformations], default=list),
+        "unit": LazyField("unit", Unit),
+        "warnings": LazyField("warnings"),
+    }
 
 
 class ValueType(Enum):
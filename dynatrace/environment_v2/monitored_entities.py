@@ -14,18 +14,25 @@ See the License for the specific language governing permissions and
 limitations under the License.
 """
 
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime
 from enum import Enum
-from typing import Any, Dict, List, Optional, Union
+from typing import Any, Callable, Dict, Iterable, List, Optional, Union
 
 from requests import Response
 
-from dynatrace.dynatrace_object import DynatraceObject
+from dynatrace.dynatrace_object import DynatraceObject, LazyField
 from dynatrace.environment_v2.custom_tags import METag
+from dynatrace.environment_v2.entity_inventory import LARGE_TYPE_THRESHOLD, EntityInventory, TypeStats
 from dynatrace.environment_v2.schemas import ManagementZone
 from dynatrace.http_client import HttpClient
+from dynatrace.metadata_cache import KIND_ENTITY_TYPE, cached, warm_up
 from dynatrace.pagination import PaginatedList
-from dynatrace.utils import int64_to_datetime, timestamp_to_string
+from dynatrace.utils import entity_id_selectors, int64_to_datetime, timestamp_to_string
+
+
+# Entities per page requested by get_many, enough for one page per selector
+GET_MANY_PAGE_SIZE = 500
 
 
 class EntityService:
@@ -43,6 +50,7 @@ class EntityService:
             fields: Optional[str] = None,
             sort: Optional[str] = None,
             page_size: Optional[int] = None,
+            stream: bool = False,
     ) -> PaginatedList["Entity"]:
         """Gets the information about monitored entities.
 
@@ -62,6 +70,8 @@ class EntityService:
         :param time_to: The end of the requested timeframe. If not set, the current timestamp is used.
         :param fields: Defines the list of entity properties included in the response. The ID and the name of an entity are always included to the response.
         :param sort: Defines the ordering of the entities returned. Currently ordering is only available for the display name (for example sort=name or sort =+name for ascending, sort=-name for descending)
+        :param stream: Decode the entities one by one as each page is received, instead of loading whole pages in memory.
+                       Useful for large pages, e.g. with fields="+properties,+toRelationships". The list can only be iterated once.
 
         :return: A list of monitored entities along with their properties.
         """
@@ -77,7 +87,8 @@ class EntityService:
                              self.__http_client,
                              self.ENDPOINT_ENTITIES,
                              target_params=params,
-                             list_item="entities")
+                             list_item="entities",
+                             stream=stream)
 
     def get(
             self,
@@ -99,6 +110,80 @@ class EntityService:
         response = self.__http_client.make_request(f"{self.ENDPOINT_ENTITIES}/{entity_id}", params=params).json()
         return Entity(raw_element=response)
 
+    def get_many(
+            self,
+            entity_ids: Iterable[str],
+            time_from: Optional[Union[datetime, str]] = None,
+            time_to: Optional[Union[datetime, str]] = None,
+            fields: Optional[str] = None,
+            page_size: int = GET_MANY_PAGE_SIZE,
+            max_workers: int = 4,
+    ) -> Dict[str, "Entity"]:
+        """Gets the properties of many monitored entities, with as few requests as possible.
+
+        The IDs are packed into entityId("id-1","id-2",...) selectors of at most 10,000 characters (about 400 IDs each),
+        which are listed concurrently.
+
+        :param entity_ids: The IDs of the required entities, duplicates are requested once
+        :param time_from: The start of the requested timeframe. If not set, the relative timeframe of three days is used (now-3d).
+        :param time_to: The end of the requested timeframe. If not set, the current timestamp is used.
+        :param fields: Defines the list of entity properties included in the response. The ID and the name of an entity are always included to the response.
+        :param page_size: The amount of entities per page of each list
+        :param max_workers: The amount of selectors listed concurrently
+
+        :return: The entities by ID. Entities that were not found (e.g. not seen in the timeframe) are missing.
+        """
+        selectors = entity_id_selectors(dict.fromkeys(entity_ids))
+        if not selectors:
+            return {}
+
+        def list_entities(selector: str) -> List[Entity]:
+            return list(self.list(selector, time_from=time_from, time_to=time_to, fields=fields, page_size=page_size))
+
+        with ThreadPoolExecutor(max_workers=max_workers) as executor:
+            results = list(executor.map(list_entities, selectors))
+        return {entity.entity_id: entity for entities in results for entity in entities}
+
+    def list_all(
+            self,
+            types: Optional[Iterable[str]] = None,
+            time_from: Optional[Union[datetime, str]] = None,
+            time_to: Optional[Union[datetime, str]] = None,
+            fields: Optional[str] = None,
+            concurrency: int = 4,
+            page_size: int = GET_MANY_PAGE_SIZE,
+            large_type_threshold: int = LARGE_TYPE_THRESHOLD,
+            on_progress: Optional[Callable[[TypeStats], None]] = None,
+    ) -> EntityInventory:
+        """Lists the monitored entities of all types (or of several types) concurrently.
+
+        Each type is listed by its own worker, types with more than large_type_threshold entities are split by name
+        prefix. Entities are returned as their pages arrive, in no particular order. The requests share the rate limiter
+        of the client.
+
+        :param types: The entity types to list. If not set, all the types of entities.list_types() are listed.
+        :param time_from: The start of the requested timeframe. If not set, the relative timeframe of three days is used (now-3d).
+        :param time_to: The end of the requested timeframe. If not set, the current timestamp is used.
+        :param fields: Defines the list of entity properties included in the response. The ID and the name of an entity are always included to the response.
+        :param concurrency: The amount of entity selectors listed at the same time
+        :param page_size: The amount of entities per page
+        :param large_type_threshold: The amount of entities above which a type is split in one selector per name prefix
+        :param on_progress: Called with the TypeStats of each type once all its entities were returned
+
+        :return: An iterable of entities, its stats attribute holds the count and duration per type
+        """
+        return EntityInventory(
+            self,
+            types=types,
+            time_from=time_from,
+            time_to=time_to,
+            fields=fields,
+            page_size=page_size,
+            concurrency=concurrency,
+            large_type_threshold=large_type_threshold,
+            on_progress=on_progress,
+        )
+
     def post_custom_device(self, device: "CustomDeviceCreation") -> "Response":
         """Creates or updates a custom device.
 
@@ -172,32 +257,72 @@ class EntityService:
 
         :returns EntityType: The properties of the specified entity type.
         """
+        return cached(self.__http_client, KIND_ENTITY_TYPE, entity_type, lambda: self.__get_type(entity_type))
+
+    def __get_type(self, entity_type: str) -> "EntityType":
         response = self.__http_client.make_request(path=f"{self.ENDPOINT_TYPES}/{entity_type}")
         return EntityType(raw_element=response.json())
 
+    def warm_up_cache(self) -> int:
+        """Loads every entity type in the metadata cache of the client
 
-class Entity(DynatraceObject):
-    def _create_from_raw_data(self, raw_element: Dict[str, Any]):
-        self.last_seen: Optional[datetime] = int64_to_datetime(raw_element.get("lastSeenTms", 0))
-        self.first_seen: Optional[datetime] = int64_to_datetime(raw_element.get("firstSeenTms", 0))
+        :return: The amount of entity types loaded
+        """
+        return warm_up(self.__http_client, KIND_ENTITY_TYPE, self.list_types(page_size=500), lambda entity_type: entity_type.type)
 
-        self.from_relationships: Dict[str, List["EntityId"]] = {
-            key: [EntityId(raw_element=entity) for entity in entities] for key, entities in
-            raw_element.get("fromRelationships", {}).items()
-        }
-        self.to_relationships: Dict[str, List["EntityId"]] = {
-            key: [EntityId(raw_element=entity) for entity in entities] for key, entities in
-            raw_element.get("toRelationships", {}).items()
-        }
-        self.management_zones: List[ManagementZone] = [ManagementZone(raw_element=m) for m in
-                                                       raw_element.get("managementZones", [])]
-        self.icon: Optional[
-            EntityIcon] = EntityIcon(raw_element=raw_element.get("icon")) if raw_element.get("icon") else None
-        self.display_name: str = raw_element["displayName"]
-        self.type: str = raw_element['type']
-        self.entity_id: str = raw_element["entityId"]
-        self.properties: Optional[Dict[str, Any]] = raw_element.get("properties", {})
-        self.tags: List[METag] = [METag(raw_element=tag) for tag in raw_element.get("tags", [])]
+
+def _relationships(raw_relationships: Dict[str, List[Dict[str, Any]]]) -> Dict[str, List["EntityId"]]:
+    return {key: [EntityId(raw_element=entity) for entity in entities] for key, entities in raw_relationships.items()}
+
+
+class Entity(DynatraceObject):
+    __slots__ = (
+        "last_seen",
+        "first_seen",
+        "from_relationships",
+        "to_relationships",
+        "management_zones",
+        "icon",
+        "display_name",
+        "type",
+        "entity_id",
+        "properties",
+        "tags",
+    )
+
+    last_seen: Optional[datetime]
+    first_seen: Optional[datetime]
+    from_relationships: Dict[str, List["EntityId"]]
+    to_relationships: Dict[str, List["EntityId"]]
+    management_zones: List[ManagementZone]
+    icon: Optional["EntityIcon"]
+    display_name: str
+    type: str
+    entity_id: str
+    properties: Optional[Dict[str, Any]]
+    tags: List[METag]
+
+    _lazy_fields = {
+        "last_seen": LazyField("lastSeenTms", int64_to_datetime),
+        "first_seen": LazyField("firstSeenTms", int64_to_datetime),
+        "from_relationships": LazyField("fromRelationships", _relationships, default=dict),
+        "to_relationships": LazyField("toRelationships", _relationships, default=dict),
+        "management_zones": LazyField("managementZones", lambda zones: [ManagementZone(raw_element=m) for m in zones], default=list),
+        "icon": LazyField("icon", lambda icon: EntityIcon(raw_element=icon) if icon else None),
+        "display_name": LazyField("displayName", required=True),
+        "type": LazyField("type", required=True),
+        "entity_id": LazyField("entityId", required=True),
+        "properties": LazyField("properties", default=dict),
+        "tags": LazyField("tags", lambda tags: [METag(raw_element=tag) for tag in tags], default=list),
+    }
+
+
+def entity_type_of(entity: Entity) -> str:
+    """The type of an entity, also when it was listed without the type field: entity IDs start with it (HOST-82F576674F19AC16)"""
+    try:
+        return entity.type
+    except KeyError:
+        return entity.entity_id.rsplit("-", 1)[0]
 
 
 class EntityShortRepresentation(DynatraceObject):
@@ -139,6 +139,27 @@ class ProblemService:
 
 
 class Problem(DynatraceObject):
+    __slots__ = (
+        "display_id",
+        "problem_id",
+        "title",
+        "status",
+        "severity_level",
+        "impact_level",
+        "start_time",
+        "end_time",
+        "management_zones",
+        "affected_entities",
+        "recent_comments",
+        "impacted_entities",
+        "linked_problem_info",
+        "root_cause_entity",
+        "problem_filters",
+        "evidence_details",
+        "impact_analysis",
+        "entity_tags",
+    )
+
     def _create_from_raw_data(self, raw_element: Dict[str, Any]):
         # required
         self.display_id: str = raw_element.get("displayId")
@@ -3,6 +3,7 @@ from datetime import datetime
 
 from dynatrace.dynatrace_object import DynatraceObject
 from dynatrace.http_client import HttpClient
+from dynatrace.metadata_cache import KIND_SETTINGS_SCHEMAS, cached
 from dynatrace.pagination import PaginatedList
 from dynatrace.utils import int64_to_datetime
 
@@ -16,8 +17,16 @@ class SettingService:
         
 
     def list_schemas(self) -> PaginatedList["SchemaStub"]:
-        """Lists all settings schemas available in your environment"""
+        """Lists all settings schemas available in your environment
 
+        When the client has a metadata cache, the schemas are requested once and the same list is returned from the
+        cache. The schemas endpoint returns all the schemas in one page, which the list keeps.
+        """
+        if getattr(self.__http_client, "metadata_cache", None) is not None:
+            return cached(self.__http_client, KIND_SETTINGS_SCHEMAS, "*", lambda: self.__list_schemas().prefetch())
+        return self.__list_schemas()
+
+    def __list_schemas(self) -> PaginatedList["SchemaStub"]:
         return PaginatedList(
             SchemaStub,
             self.__http_client,
@@ -0,0 +1,192 @@
+"""
+Copyright 2021 Dynatrace LLC
+
+Licensed under the Apache License, Version 2.0 (the "License");
+you may not use this file except in compliance with the License.
+You may obtain a copy of the License at
+
+    http://www.apache.org/licenses/LICENSE-2.0
+
+Unless required by applicable law or agreed to in writing, software
+distributed under the License is distributed on an "AS IS" BASIS,
+WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+See the License for the specific language governing permissions and
+limitations under the License.
+"""
+
+from collections import Counter
+from typing import Dict, Iterable, List, Optional, Set, Tuple
+
+from dynatrace.environment_v2.custom_tags import TagContext
+from dynatrace.environment_v2.monitored_entities import Entity
+
+# (context, key, value) of a tag, e.g. ("KUBERNETES", "app", "frontend") or ("CONTEXTLESS", "critical", None)
+Tag = Tuple[str, str, Optional[str]]
+
+CONTEXTLESS = str(TagContext.CONTEXTLESS)
+
+
+class TagIndex:
+    """Which entities have which tags, built from the tags of listed entities (requested with fields="+tags").
+
+    Entities are numbered, the entities of each tag are the bits of a Python int: finding the entities of a tag does
+    not make API calls, and tags are combined with integer operations, e.g. the production hosts without owner are
+    index.entity_ids(index.bitmap("env", "prod") & ~index.bitmap("owner")).
+    The bitmaps are built when first requested after a change, updates only change sets of entity numbers: setting
+    bits one entity at a time would copy the whole int each time.
+
+    Entities added again replace their previous tags, so the index can be refreshed with later entity lists.
+
+    :param entities: One or more entity lists, requested with fields="+tags"
+    """
+
+    def __init__(self, *entities: Iterable[Entity]):
+        self.__index: Dict[str, int] = {}
+        self.__ids: List[Optional[str]] = []
+        self.__tags: List[Set[Tag]] = []
+        self.__members: Dict[Tag, Set[int]] = {}
+        self.__bitmaps: Dict[Tag, int] = {}
+        # The tags of each key, so lookups by key do not scan all the tags
+        self.__keys: Dict[str, Set[Tag]] = {}
+        self.__all: Optional[int] = None
+        for entity_list in entities:
+            self.update(entity_list)
+
+    def update(self, entities: Iterable[Entity]):
+        for entity in entities:
+            self.add(entity.entity_id, _entity_tags(entity))
+
+    def add(self, entity_id: str, tags: Iterable[Tag]):
+        """Sets the tags of an entity, replacing the ones it had in the index"""
+        node = self.__node(entity_id)
+        tags = set(tags)
+        for tag in self.__tags[node] - tags:
+            self.__unset(node, tag)
+        for tag in tags - self.__tags[node]:
+            self.__set(node, tag)
+
+    def remove(self, entity_id: str):
+        node = self.__index.pop(entity_id, None)
+        if node is None:
+            return
+        for tag in list(self.__tags[node]):
+            self.__unset(node, tag)
+        # The number is not reused, bitmaps keep a hole for it
+        self.__ids[node] = None
+        self.__all = None
+
+    def add_tag(self, entity_id: str, key: str, value: Optional[str] = None, context: str = CONTEXTLESS):
+        node = self.__node(entity_id)
+        if (context, key, value) not in self.__tags[node]:
+            self.__set(node, (context, key, value))
+
+    def remove_tag(self, entity_id: str, key: str, value: Optional[str] = None, context: str = CONTEXTLESS):
+        node = self.__index.get(entity_id)
+        if node is not None and (context, key, value) in self.__tags[node]:
+            self.__unset(node, (context, key, value))
+
+    def __node(self, entity_id: str) -> int:
+        node = self.__index.get(entity_id)
+        if node is None:
+            node = self.__index[entity_id] = len(self.__ids)
+            self.__ids.append(entity_id)
+            self.__tags.append(set())
+            self.__all = None
+        return node
+
+    def __set(self, node: int, tag: Tag):
+        self.__tags[node].add(tag)
+        self.__members.setdefault(tag, set()).add(node)
+        self.__bitmaps.pop(tag, None)
+        self.__keys.setdefault(tag[1], set()).add(tag)
+
+    def __unset(self, node: int, tag: Tag):
+        self.__tags[node].discard(tag)
+        members = self.__members[tag]
+        members.discard(node)
+        self.__bitmaps.pop(tag, None)
+        if not members:
+            del self.__members[tag]
+            self.__keys[tag[1]].discard(tag)
+            if not self.__keys[tag[1]]:
+                del self.__keys[tag[1]]
+
+    def __len__(self) -> int:
+        return len(self.__index)
+
+    def __contains__(self, entity_id: str) -> bool:
+        return entity_id in self.__index
+
+    def __repr__(self):
+        return f"TagIndex(entities={len(self.__index)}, tags={len(self.__members)})"
+
+    def bitmap(self, key: Optional[str] = None, value: Optional[str] = None, context: Optional[str] = None) -> int:
+        """The entities of a tag as the bits of an int, for entity_ids()
+
+        :param key: The tag key, if not set the bitmap of all the entities of the index
+        :param value: Only the tags with this value, if not set all the values of the key (and tags without value)
+        :param context: Only the tags of this context (e.g. "CONTEXTLESS" for the custom tags), if not set all contexts
+        """
+        if key is None:
+            if self.__all is None:
+                self.__all = _bitmap(self.__index.values())
+            return self.__all
+        bitmap = 0
+        for tag in self.__keys.get(key, ()):
+            if (value is None or tag[2] == value) and (context is None or tag[0] == context):
+                tag_bitmap = self.__bitmaps.get(tag)
+                if tag_bitmap is None:
+                    tag_bitmap = self.__bitmaps[tag] = _bitmap(self.__members[tag])
+                bitmap |= tag_bitmap
+        return bitmap
+
+    def entity_ids(self, bitmap: int) -> List[str]:
+        """The IDs of the entities of a bitmap, in the order they were added to the index"""
+        ids = self.__ids
+        result = []
+        # Scanning the bytes of the int is linear, clearing the lowest bit one at a time would be quadratic
+        for offset, byte in enumerate(bitmap.to_bytes((bitmap.bit_length() + 7) // 8, "little")):
+            while byte:
+                low = byte & -byte
+                entity_id = ids[offset * 8 + low.bit_length() - 1]
+                if entity_id is not None:
+                    result.append(entity_id)
+                byte ^= low
+        return result
+
+    def entities(self, key: str, value: Optional[str] = None, context: Optional[str] = None) -> List[str]:
+        """The IDs of the entities with a tag, see bitmap() for the parameters"""
+        return self.entity_ids(self.bitmap(key, value, context))
+
+    def count(self, key: Optional[str] = None, value: Optional[str] = None, context: Optional[str] = None) -> int:
+        return bin(self.bitmap(key, value, context)).count("1")
+
+    def tags_of(self, entity_id: str, context: Optional[str] = None) -> Set[Tag]:
+        """The (context, key, value) tags of an entity, of all contexts or only of one"""
+        node = self.__index.get(entity_id)
+        if node is None:
+            return set()
+        return {tag for tag in self.__tags[node] if context is None or tag[0] == context}
+
+    def tags(self) -> Dict[Tag, int]:
+        """The amount of entities of each tag, most used first"""
+        counts = Counter({tag: len(members) for tag, members in self.__members.items()})
+        return dict(counts.most_common())
+
+
+def _bitmap(nodes: Iterable[int]) -> int:
+    nodes = list(nodes)
+    if not nodes:
+        return 0
+    bits = bytearray(max(nodes) // 8 + 1)
+    for node in nodes:
+        bits[node >> 3] |= 1 << (node & 7)
+    return int.from_bytes(bits, "little")
+
+
+def _entity_tags(entity: Entity) -> List[Tag]:
+    # Read from the raw element when the entity still has it, instead of creating an METag per tag
+    raw = entity.json()
+    if raw is not None:
+        return [(tag["context"], tag["key"], tag.get("value")) for tag in raw.get("tags", [])]
+    return [(str(tag.context), tag.key, tag.value) for tag in entity.tags]
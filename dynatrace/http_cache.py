@@ -0,0 +1,257 @@
+"""
+Copyright 2021 Dynatrace LLC
+
+Licensed under the Apache License, Version 2.0 (the "License");
+you may not use this file except in compliance with the License.
+You may obtain a copy of the License at
+
+    http://www.apache.org/licenses/LICENSE-2.0
+
+Unless required by applicable law or agreed to in writing, software
+distributed under the License is distributed on an "AS IS" BASIS,
+WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+See the License for the specific language governing permissions and
+limitations under the License.
+"""
+
+import hashlib
+import json
+import os
+import re
+import tempfile
+import threading
+from collections import OrderedDict
+from pathlib import Path
+from typing import Any, Callable, Dict, Iterable, Iterator, Mapping, Optional, Union
+
+from requests.structures import CaseInsensitiveDict
+
+# Configuration endpoints, polled by reconcilers and rarely changing
+DEFAULT_CACHED_PATHS = (r"^/api/config/v1/", r"^/api/v2/settings/")
+
+
+class CacheEntry:
+    """A cached response body and the validators (ETag, Last-Modified) used to revalidate it"""
+
+    __slots__ = ("etag", "last_modified", "headers", "content", "_parsed", "_lock")
+
+    def __init__(self, etag: Optional[str], last_modified: Optional[str], headers: Dict[str, str], content: bytes):
+        self.etag = etag
+        self.last_modified = last_modified
+        self.headers = headers
+        self.content = content
+        self._parsed = None
+        self._lock = threading.Lock()
+
+    def json(self, loads: Callable[[bytes], Any] = json.loads) -> Any:
+        # Parsed once, every response served from this entry returns the same object
+        with self._lock:
+            if self._parsed is None:
+                self._parsed = loads(self.content)
+            return self._parsed
+
+
+class CachedResponse:
+    """A response served from the cache after the tenant answered 304 Not Modified, behaves like a 200 requests.Response"""
+
+    status_code = 200
+    ok = True
+    reason = "OK"
+    from_cache = True
+
+    def __init__(self, url: str, entry: CacheEntry, headers: Mapping[str, str], loads: Callable[[bytes], Any] = json.loads):
+        self.url = url
+        self.entry = entry
+        self.loads = loads
+        # The headers of the 304 are fresher (rate limits, dates...), the cached ones still describe the body
+        self.headers = CaseInsensitiveDict(entry.headers)
+        self.headers.update(headers)
+
+    @property
+    def content(self) -> bytes:
+        return self.entry.content
+
+    @property
+    def text(self) -> str:
+        return self.entry.content.decode("utf-8")
+
+    def json(self) -> Any:
+        """The parsed body, shared by all the responses served from the same cache entry, it must not be modified"""
+        return self.entry.json(self.loads)
+
+    def iter_content(self, chunk_size: Optional[int] = None) -> Iterator[bytes]:
+        content = self.entry.content
+        chunk_size = chunk_size or len(content) or 1
+        for start in range(0, len(content), chunk_size):
+            yield content[start : start + chunk_size]
+
+    def close(self):
+        pass
+
+    def __repr__(self):
+        return "<Response [200 (cached)]>"
+
+
+class MemoryCacheBackend:
+    """A thread safe LRU of at most max_entries entries"""
+
+    def __init__(self, max_entries: int = 256):
+        self.max_entries = max_entries
+        self.__entries: "OrderedDict[str, CacheEntry]" = OrderedDict()
+        self.__lock = threading.Lock()
+
+    def get(self, key: str) -> Optional[CacheEntry]:
+        with self.__lock:
+            entry = self.__entries.get(key)
+            if entry is not None:
+                self.__entries.move_to_end(key)
+            return entry
+
+    def set(self, key: str, entry: CacheEntry):
+        with self.__lock:
+            self.__entries[key] = entry
+            self.__entries.move_to_end(key)
+            while len(self.__entries) > self.max_entries:
+                self.__entries.popitem(last=False)
+
+    def delete(self, key: str):
+        with self.__lock:
+            self.__entries.pop(key, None)
+
+    def clear(self):
+        with self.__lock:
+            self.__entries.clear()
+
+    def __len__(self):
+        return len(self.__entries)
+
+
+class DiskCacheBackend:
+    """Stores each entry in a file of directory, so that the cache survives restarts and can be shared by processes
+
+    A file holds one line of JSON metadata (validators and headers) followed by the body.
+    """
+
+    def __init__(self, directory: Union[str, Path]):
+        self.directory = Path(directory)
+        self.directory.mkdir(parents=True, exist_ok=True)
+
+    def __path(self, key: str) -> Path:
+        return self.directory / f"{key}.cache"
+
+    def get(self, key: str) -> Optional[CacheEntry]:
+        try:
+            with open(self.__path(key), "rb") as f:
+                metadata = json.loads(f.readline())
+                content = f.read()
+        except (OSError, ValueError):
+            return None
+        return CacheEntry(metadata.get("etag"), metadata.get("last_modified"), metadata.get("headers", {}), content)
+
+    def set(self, key: str, entry: CacheEntry):
+        metadata = json.dumps({"etag": entry.etag, "last_modified": entry.last_modified, "headers": entry.headers}).encode("utf-8")
+        # Written to a temporary file and renamed, readers never see a partial entry
+        fd, tmp = tempfile.mkstemp(dir=self.directory, suffix=".tmp")
+        try:
+            with os.fdopen(fd, "wb") as f:
+                f.write(metadata + b"\n")
+                f.write(entry.content)
+            os.replace(tmp, self.__path(key))
+        except OSError:
+            if os.path.exists(tmp):
+                os.remove(tmp)
+
+    def delete(self, key: str):
+        try:
+            os.remove(self.__path(key))
+        except OSError:
+            pass
+
+    def clear(self):
+        for path in self.directory.glob("*.cache"):
+            try:
+                os.remove(path)
+            except OSError:
+                pass
+
+
+class HttpCache:
+    """A conditional-GET cache for HttpClient.
+
+    GET responses of the paths matching one of `paths` (regular expressions) that carry an ETag or Last-Modified
+    header are stored, by url, query parameters and token. The next request for the same resource is sent with
+    If-None-Match / If-Modified-Since, a 304 Not Modified answer is then served from the cache, without downloading nor
+    parsing the body again.
+
+    Entries are kept in a memory LRU of max_entries entries. With a directory, they are also written to disk and read
+    from there when they are not in memory.
+    """
+
+    def __init__(self, max_entries: int = 256, directory: Optional[Union[str, Path]] = None, paths: Iterable[str] = DEFAULT_CACHED_PATHS):
+        self.memory = MemoryCacheBackend(max_entries)
+        self.disk = DiskCacheBackend(directory) if directory is not None else None
+        self.paths = [re.compile(pattern) for pattern in paths]
+        self.hits = 0
+        self.misses = 0
+        self.__lock = threading.Lock()
+
+    def is_cacheable(self, method: str, path: str) -> bool:
+        return method.upper() == "GET" and any(pattern.search(path) for pattern in self.paths)
+
+    @staticmethod
+    def key(url: str, params: Optional[Any], headers: Mapping[str, str]) -> str:
+        if isinstance(params, dict):
+            params = sorted((str(k), str(v)) for k, v in params.items() if v is not None)
+        # Responses depend on the permissions of the token, it is part of the key (hashed, it is never stored)
+        raw = json.dumps([url, params, headers.get("Authorization")], default=str)
+        return hashlib.sha256(raw.encode("utf-8")).hexdigest()
+
+    def get(self, key: str) -> Optional[CacheEntry]:
+        entry = self.memory.get(key)
+        if entry is None and self.disk is not None:
+            entry = self.disk.get(key)
+            if entry is not None:
+                self.memory.set(key, entry)
+        return entry
+
+    def conditional_headers(self, entry: CacheEntry) -> Dict[str, str]:
+        headers = {}
+        if entry.etag:
+            headers["If-None-Match"] = entry.etag
+        if entry.last_modified:
+            headers["If-Modified-Since"] = entry.last_modified
+        return headers
+
+    def store(self, key: str, response) -> bool:
+        """Stores a 200 response when it has validators, returns False otherwise"""
+        etag = response.headers.get("ETag")
+        last_modified = response.headers.get("Last-Modified")
+        if response.status_code != 200 or (not etag and not last_modified):
+            self.invalidate(key)
+            return False
+        headers = {name: value for name, value in response.headers.items() if name.lower() in ("content-type", "etag", "last-modified")}
+        entry = CacheEntry(etag, last_modified, headers, response.content)
+        self.memory.set(key, entry)
+        if self.disk is not None:
+            self.disk.set(key, entry)
+        return True
+
+    def invalidate(self, key: str):
+        self.memory.delete(key)
+        if self.disk is not None:
+            self.disk.delete(key)
+
+    def clear(self):
+        self.memory.clear()
+        if self.disk is not None:
+            self.disk.clear()
+
+    def _record(self, hit: bool):
+        with self.__lock:
+            if hit:
+                self.hits += 1
+            else:
+                self.misses += 1
+
+    def __repr__(self):
+        return f"HttpCache(entries={len(self.memory)}, hits={self.hits}, misses={self.misses})"
@@ -13,15 +13,24 @@ WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
 See the License for the specific language governing permissions and
 limitations under the License.
 """
-import json
 import logging
-from typing import Dict, Optional, Any
+from functools import partial
+from typing import Callable, Dict, Optional, Any, Union
 import time
 
 import requests
 import urllib3
 from urllib3.util.retry import Retry
-from requests.adapters import HTTPAdapter
+
+from dynatrace.codec import CODEC_STDLIB, JsonCodec, decode_response, get_codec
+from dynatrace.coalescing import COALESCED_METHODS, RequestCoalescer
+from dynatrace.compression import RequestCompression
+from dynatrace.http_cache import CachedResponse, HttpCache
+from dynatrace.instrumentation import HOOK_REQUEST_START, HOOK_RESPONSE, HOOK_RETRY, HOOK_THROTTLE, RequestEvent, RequestHooks, endpoint_template
+from dynatrace.metadata_cache import MetadataCache
+from dynatrace.rate_limiter import RateLimiter, get_rate_limiter
+from dynatrace.retry import IDEMPOTENT_METHODS, RetryPolicy, parse_retry_after
+from dynatrace.transport import TRANSPORT_HTTP1, TRANSPORT_HTTP2, HttpxResponse, HttpxTransport, RequestsTransport, Transport
 
 urllib3.disable_warnings(urllib3.exceptions.InsecureRequestWarning)
 
@@ -30,11 +39,30 @@ TOO_MANY_REQUESTS_WAIT = "wait"
 
 
 class DynatraceRetry(Retry):
+    """Connection level retries (connection and read errors), statuses are retried by the RetryPolicy of the client"""
+
     def get_backoff_time(self):
         return self.backoff_factor
 
 
+class DynatraceHttpError(Exception):
+    """Raised for responses with a status code of 400 or above, the response is available as the response attribute"""
+
+    def __init__(self, message: str, response: Any):
+        super().__init__(message)
+        self.response = response
+
+
 class HttpClient:
+    """Sends the requests of the services to a tenant.
+
+    Thread safety: one client (and one Dynatrace instance) can be shared by any number of threads, e.g. the workers of a
+    ThreadPoolExecutor, so that they all use a single connection pool. make_request does not modify its arguments,
+    the headers of each request are merged into a new dict. The shared state (connection pool, rate limiter, retry
+    statistics, caches, coalescer and hooks) is synchronized. The client's settings must not be changed while requests
+    are in flight. Hooks are called from the threads making the requests.
+    """
+
     def __init__(
         self,
         base_url: str,
@@ -48,7 +76,20 @@ class HttpClient:
         mc_b925d32c: Optional[str] = None,
         mc_sso_csrf_cookie: Optional[str] = None,
         print_bodies: bool = False,
-        timeout: Optional[int] = None
+        timeout: Optional[int] = None,
+        pool_connections: int = 10,
+        pool_maxsize: int = 10,
+        prefetch_pages: int = 0,
+        keep_raw_elements: bool = True,
+        rate_limiter: Union[bool, RateLimiter, None] = None,
+        retry_policy: Optional[RetryPolicy] = None,
+        transport: Union[str, Transport, None] = None,
+        cache: Union[bool, HttpCache, None] = None,
+        metadata_cache: Union[bool, MetadataCache, None] = None,
+        coalesce_requests: bool = False,
+        compression: Union[bool, RequestCompression, None] = None,
+        codec: Union[str, JsonCodec, None] = None,
+        hooks: Optional[RequestHooks] = None,
     ):
         while base_url.endswith("/"):
             base_url = base_url[:-1]
@@ -71,23 +112,60 @@ class HttpClient:
 
         self.too_many_requests_strategy = too_many_requests_strategy
         self.timeout = timeout
-        retry_delay_s = retry_delay_ms / 1000
+        # Default amount of pages paginated lists request ahead of the consumer, 0 disables prefetching
+        self.prefetch_pages = prefetch_pages
+        # When False, the objects of paginated lists do not keep their raw JSON (their json() method returns None), only the
+        # raw values of the fields not read yet. Objects created to be sent (e.g. custom device messages) always keep it
+        self.keep_raw_elements = keep_raw_elements
+        # True paces requests with the limiter shared by all clients of this tenant, a RateLimiter instance is used as is
+        if rate_limiter is True:
+            rate_limiter = get_rate_limiter(base_url)
+        self.rate_limiter: Optional[RateLimiter] = rate_limiter or None
+        # Conditional GETs for configuration endpoints, True uses an in-memory HttpCache with the default settings
+        if cache is True:
+            cache = HttpCache()
+        self.cache: Optional[HttpCache] = cache or None
+        # Used by the services for metadata lookups (metric descriptors, entity types...), see MetadataCache
+        if metadata_cache is True:
+            metadata_cache = MetadataCache()
+        self.metadata_cache: Optional[MetadataCache] = metadata_cache if isinstance(metadata_cache, MetadataCache) else None
+        # Identical GETs made concurrently share one request, coalescer.deduplicated counts the requests saved
+        self.coalescer: Optional[RequestCoalescer] = RequestCoalescer() if coalesce_requests else None
+        # Gzip request bodies of the ingest endpoints (True) or of the paths configured in a RequestCompression
+        if compression is True:
+            compression = RequestCompression()
+        self.compression: Optional[RequestCompression] = compression or None
+        # Encodes request bodies and decodes responses, orjson when it is installed
+        self.codec: JsonCodec = get_codec(codec)
+        # Callbacks observing every request (start, retries, throttling, response), see RequestHooks
+        self.hooks: RequestHooks = hooks if hooks is not None else RequestHooks(self.log)
+        # Groups the requests of the hooks events per endpoint, can be replaced with a function of the path
+        self.endpoint_template: Callable[[str], str] = endpoint_template
+        # retries and retry_delay_ms are the shorthand for a RetryPolicy, their delay is now the base of a jittered backoff
+        if retry_policy is None:
+            retry_policy = RetryPolicy(max_retries=retries, base_delay_ms=retry_delay_ms)
+        self.retry_policy = retry_policy
+        retry_delay_s = retry_policy.base_delay_ms / 1000
 
+        # Requests that could not be sent, or whose response could not be read. Read errors are not retried for POST,
+        # the request may have been processed already
         try:
             self.retries = DynatraceRetry(
-                total=retries,
+                total=retry_policy.max_retries,
                 backoff_factor=retry_delay_s,
-                status_forcelist=[400, 401, 403, 404, 413, 429, 500, 502, 503, 504],
-                allowed_methods=["TRACE", "PUT", "DELETE", "OPTIONS", "HEAD", "GET", "POST"],
+                status_forcelist=None,
+                allowed_methods=IDEMPOTENT_METHODS,
                 raise_on_status=False,
+                respect_retry_after_header=False,
             )
         except TypeError:  # Older version of urllib3?
             self.retries = DynatraceRetry(
-                total=retries,
+                total=retry_policy.max_retries,
                 backoff_factor=retry_delay_s,
-                status_forcelist=[400, 401, 403, 404, 413, 429, 500, 502, 503, 504],
-                method_whitelist=["TRACE", "PUT", "DELETE", "OPTIONS", "HEAD", "GET", "POST"],
+                status_forcelist=None,
+                method_whitelist=IDEMPOTENT_METHODS,
                 raise_on_status=False,
+                respect_retry_after_header=False,
             )
 
         # This is for internal dynatrace usage
@@ -95,8 +173,31 @@ class HttpClient:
         self.mc_b925d32c = mc_b925d32c
         self.mc_sso_csrf_cookie = mc_sso_csrf_cookie
 
+        # "http1" (the default) is a pool of keep-alive HTTP/1.1 connections, "http2" multiplexes all requests over one connection
+        if transport is None or transport == TRANSPORT_HTTP1:
+            transport = RequestsTransport(pool_connections, pool_maxsize, self.retries, self.proxies)
+        elif transport == TRANSPORT_HTTP2:
+            transport = HttpxTransport(http2=True, max_connections=pool_maxsize, retries=retry_policy.max_retries, proxies=self.proxies)
+        elif not isinstance(transport, Transport):
+            raise ValueError(f"Unknown transport '{transport}', use '{TRANSPORT_HTTP1}', '{TRANSPORT_HTTP2}' or a Transport instance")
+        self.transport: Transport = transport
+        # The requests.Session of the default transport, None for other transports
+        self.session: Optional[requests.Session] = getattr(transport, "session", None)
+
+    def close(self):
+        """Closes the underlying transport, releasing all pooled connections."""
+        self.transport.close()
+
     def make_request(
-        self, path: str, params: Optional[Any] = None, headers: Optional[Dict] = None, method="GET", data=None, files=None, query_params=None
+        self,
+        path: str,
+        params: Optional[Any] = None,
+        headers: Optional[Dict] = None,
+        method="GET",
+        data=None,
+        files=None,
+        query_params=None,
+        stream: bool = False,
     ) -> requests.Response:
         url = f"{self.base_url}{path}"
 
@@ -105,10 +206,10 @@ class HttpClient:
             body = params
             params = query_params
 
-        if headers is None:
-            headers = {}
+        # A new dict for every request, the caller's headers may be shared with other requests and threads
+        headers = dict(headers) if headers else {}
         if files is None and "content-type" not in [key.lower() for key in headers.keys()]:
-            headers.update({"content-type": "application/json"})
+            headers["content-type"] = "application/json"
         headers.update(self.auth_header)
 
         cookies = None
@@ -116,24 +217,154 @@ class HttpClient:
             headers.update({"Cookie": f"JSESSIONID={self.mc_jsession_id}; ssoCSRFCookie={self.mc_sso_csrf_cookie}; b925d32c={self.mc_b925d32c}"})
             cookies = {"JSESSIONID": self.mc_jsession_id, "ssoCSRFCookie": self.mc_sso_csrf_cookie, "b925d32c": self.mc_b925d32c}
 
-        s = requests.Session()
-        s.mount("https://", HTTPAdapter(max_retries=self.retries))
+        if self.coalescer is not None and method.upper() in COALESCED_METHODS and data is None and files is None and not stream:
+            key = self.coalescer.key(method, url, params, headers)
+            return self.coalescer.do(key, lambda: self._send(method, path, url, params, headers, body, data, files, cookies, stream))
+        return self._send(method, path, url, params, headers, body, data, files, cookies, stream)
+
+    def _send(self, method: str, path: str, url: str, params, headers: Dict, body, data, files, cookies, stream: bool):
+        cache_key = cache_entry = None
+        if self.cache is not None and files is None and not stream and self.cache.is_cacheable(method, path):
+            # Callers sending their own validators (e.g. get_gateway_installer) handle the 304 themselves
+            if not any(key.lower() in ("if-none-match", "if-modified-since") for key in headers):
+                cache_key = self.cache.key(url, params, headers)
+                cache_entry = self.cache.get(cache_key)
+                if cache_entry is not None:
+                    headers.update(self.cache.conditional_headers(cache_entry))
 
-        self.log.debug(f"Making {method} request to '{url}' with params {params} and body: {body}")
+        self.log.debug("Making %s request to '%s' with params %s and body: %s", method, url, params, body)
         if self.print_bodies:
             print(method, url)
             if body:
-                print(json.dumps(body, indent=2))
-        r = s.request(method, url, headers=headers, params=params, json=body, verify=False, proxies=self.proxies, data=data, cookies=cookies, files=files, timeout=self.timeout)
-        self.log.debug(f"Received response '{r}'")
+                print(self.codec.dumps_pretty(body))
+        if body is not None and files is None:
+            # Encoded here rather than by the transport (json=), so that the codec is used
+            body, data = None, self.codec.dumps(body)
+        if self.compression is not None:
+            body, data = self._compress(method, path, headers, body, data, files)
+
+        event = None
+        if self.hooks.active:
+            event = RequestEvent(method, url, path, self.endpoint_template(path), len(data) if isinstance(data, (bytes, str)) else None)
+            self.hooks.emit(HOOK_REQUEST_START, event)
 
-        while r.status_code == 429 and self.too_many_requests_strategy == TOO_MANY_REQUESTS_WAIT:
-            sleep_amount = int(r.headers.get("retry-after", 5))
-            self.log.warning(f"Sleeping for {sleep_amount}s because we have received an HTTP 429")
+        retry = self.retry_policy.start(method, path)
+        while True:
+            self._wait_for_rate_limit(event)
+            try:
+                r = self.transport.request(
+                    method, url, headers=headers, params=params, json=body, data=data, cookies=cookies, files=files, timeout=self.timeout, stream=stream
+                )
+            except Exception as e:
+                if event is not None:
+                    event.error = e
+                    self._finish_event(event, None, stream)
+                raise
+            self.log.debug("Received response '%s'", r)
+            self._update_rate_limit(r)
+            if event is not None:
+                event.status = r.status_code
+
+            if r.status_code < 400:
+                retry.finish()
+                break
+            if r.status_code == 429 and self.too_many_requests_strategy == TOO_MANY_REQUESTS_WAIT:
+                sleep_amount = parse_retry_after(r.headers.get("retry-after"))
+                sleep_amount = 5 if sleep_amount is None else sleep_amount
+                self.log.warning(f"Sleeping for {sleep_amount}s because we have received an HTTP 429")
+                self._emit_delay(HOOK_THROTTLE, event, sleep_amount)
+            else:
+                sleep_amount = retry.next_delay(r.status_code, r.headers)
+                if sleep_amount is None:
+                    break
+                self.log.warning(f"Retrying {method} {url} in {sleep_amount:.2f}s after an HTTP {r.status_code} (retry {retry.retries})")
+                self._emit_delay(HOOK_RETRY, event, sleep_amount)
+            if event is not None:
+                event.retries += 1
+            r.close()
             time.sleep(sleep_amount)
-            r = requests.request(method, url, headers=headers, params=params, json=body, verify=False, proxies=self.proxies, timeout=self.timeout)
 
+        if cache_key is not None:
+            if r.status_code == 304 and cache_entry is not None:
+                self.cache._record(hit=True)
+                if event is not None:
+                    event.from_cache = True
+                    self._finish_event(event, r, stream)
+                return CachedResponse(url, cache_entry, r.headers, self.codec.loads)
+            if r.status_code < 400:
+                self.cache._record(hit=False)
+                self.cache.store(cache_key, r)
+
+        if not stream:
+            self._attach_codec(r)
+        if event is not None:
+            self._finish_event(event, r, stream)
         if r.status_code >= 400:
-            raise Exception(f"Error making request to {url}: {r}. Response: {r.text}")
+            raise DynatraceHttpError(f"Error making request to {url}: {r}. Response: {r.text}", r)
 
         return r
+
+    def _compress(self, method: str, path: str, headers: Dict, body, data, files):
+        compression = self.compression
+        header_names = [key.lower() for key in headers]
+        if compression.accept_encoding and "accept-encoding" not in header_names:
+            headers["Accept-Encoding"] = compression.accept_encoding
+        if files is not None or "content-encoding" in header_names or not compression.applies(method, path):
+            return body, data
+        raw = self.codec.dumps(body) if body is not None else data
+        if not isinstance(raw, (bytes, str)):
+            return body, data
+        compressed = compression.compress(raw)
+        if compressed is None:
+            return body, data
+        headers["Content-Encoding"] = "gzip"
+        return None, compressed
+
+    def _attach_codec(self, response):
+        # response.json() of requests and httpx use the json module, responses of other transports are left alone
+        if self.codec.name != CODEC_STDLIB and isinstance(response, (requests.Response, HttpxResponse)):
+            response.json = partial(decode_response, self.codec, response)
+
+    def _emit_delay(self, hook: str, event: Optional[RequestEvent], delay: float):
+        if event is not None:
+            event.delay = delay
+            if hook == HOOK_THROTTLE:
+                event.throttled_seconds += delay
+            self.hooks.emit(hook, event)
+
+    def _finish_event(self, event: RequestEvent, response, stream: bool):
+        event.total_seconds = time.perf_counter() - event.started
+        if response is not None:
+            event.ttfb_seconds = _elapsed_seconds(response)
+            event.bytes_received = _response_size(response, stream)
+        self.hooks.emit(HOOK_RESPONSE, event)
+
+    def _wait_for_rate_limit(self, event: Optional[RequestEvent] = None):
+        if self.rate_limiter is not None:
+            wait = self.rate_limiter.reserve()
+            if wait > 0:
+                self.log.debug("Waiting %.3fs for the rate limit of %s", wait, self.base_url)
+                self._emit_delay(HOOK_THROTTLE, event, wait)
+                time.sleep(wait)
+
+    def _update_rate_limit(self, response: requests.Response):
+        if self.rate_limiter is not None:
+            self.rate_limiter.update_from_headers(response.headers)
+
+
+def _elapsed_seconds(response) -> Optional[float]:
+    # Time from sending the request to parsing the response headers, for requests and httpx responses
+    try:
+        return response.elapsed.total_seconds()
+    except (AttributeError, RuntimeError):
+        return None
+
+
+def _response_size(response, stream: bool) -> Optional[int]:
+    length = response.headers.get("content-length")
+    if length is not None and length.isdigit():
+        return int(length)
+    if stream:
+        return None
+    content = getattr(response, "content", None)
+    return len(content) if content is not None else None
@@ -0,0 +1,322 @@
+"""
+Copyright 2021 Dynatrace LLC
+
+Licensed under the Apache License, Version 2.0 (the "License");
+you may not use this file except in compliance with the License.
+You may obtain a copy of the License at
+
+    http://www.apache.org/licenses/LICENSE-2.0
+
+Unless required by applicable law or agreed to in writing, software
+distributed under the License is distributed on an "AS IS" BASIS,
+WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+See the License for the specific language governing permissions and
+limitations under the License.
+"""
+
+import bisect
+import logging
+import re
+import threading
+import time
+from typing import Any, Callable, Dict, Iterable, List, Mapping, Optional, Tuple
+
+HOOK_REQUEST_START = "on_request_start"
+HOOK_RESPONSE = "on_response"
+HOOK_RETRY = "on_retry"
+HOOK_THROTTLE = "on_throttle"
+HOOKS = (HOOK_REQUEST_START, HOOK_RESPONSE, HOOK_RETRY, HOOK_THROTTLE)
+
+# Upper bounds (milliseconds) of the latency histogram buckets, the last bucket holds everything above
+DEFAULT_BUCKETS_MS = (5, 10, 25, 50, 100, 250, 500, 1000, 2500, 5000, 10000, 30000, 60000)
+
+_VERSION_SEGMENT = re.compile(r"^v\d+$")
+_ENTITY_TYPE_SEGMENT = re.compile(r"^[A-Z][A-Z0-9_]*$")
+
+
+def endpoint_template(path: str) -> str:
+    """The path with its identifiers replaced by {id}, e.g. /api/v2/entities/{id}, so that requests to the same endpoint
+    are grouped together.
+
+    This is a heuristic, a segment is considered an identifier when it contains a digit (API versions excepted) or a
+    colon (metric keys, schema ids), or when it is all uppercase (entity and event types).
+    """
+    path = path.split("?", 1)[0]
+    segments = path.split("/")
+    for i, segment in enumerate(segments):
+        if not segment or _VERSION_SEGMENT.match(segment):
+            continue
+        if ":" in segment or any(c.isdigit() for c in segment) or _ENTITY_TYPE_SEGMENT.match(segment):
+            segments[i] = "{id}"
+    return "/".join(segments)
+
+
+class RequestEvent:
+    """The state of one call to HttpClient.make_request, passed to the hooks.
+
+    The same object is passed to every hook of a request, its attributes are filled in as the request progresses:
+    `status` is the status of the last attempt, `retries` the amount of attempts after the first one,
+    `throttled_seconds` the time spent waiting for the rate limiter or after HTTP 429 responses, `delay` the duration
+    of the pause that triggered the current on_retry/on_throttle call.
+    Timings are in seconds: `ttfb_seconds` is the time to the response headers of the last attempt,
+    `total_seconds` the whole call, retries and waits included. DNS resolution and connection times are not available,
+    the transports reuse pooled connections and do not report them.
+    `error` is set when no response was received (e.g. the connection failed).
+    """
+
+    __slots__ = (
+        "method",
+        "url",
+        "path",
+        "endpoint",
+        "status",
+        "bytes_sent",
+        "bytes_received",
+        "retries",
+        "throttled_seconds",
+        "delay",
+        "ttfb_seconds",
+        "total_seconds",
+        "from_cache",
+        "error",
+        "started",
+    )
+
+    def __init__(self, method: str, url: str, path: str, endpoint: str, bytes_sent: Optional[int]):
+        self.method = method
+        self.url = url
+        self.path = path
+        self.endpoint = endpoint
+        self.status: Optional[int] = None
+        self.bytes_sent = bytes_sent
+        self.bytes_received: Optional[int] = None
+        self.retries = 0
+        self.throttled_seconds = 0.0
+        self.delay: Optional[float] = None
+        self.ttfb_seconds: Optional[float] = None
+        self.total_seconds: Optional[float] = None
+        self.from_cache = False
+        self.error: Optional[BaseException] = None
+        self.started = time.perf_counter()
+
+    def __repr__(self):
+        return f"RequestEvent({self.method} {self.endpoint}, status={self.status}, retries={self.retries}, total_seconds={self.total_seconds})"
+
+
+class RequestHooks:
+    """Callbacks of an HttpClient, called with a RequestEvent.
+
+    - on_request_start: before the first attempt of a request
+    - on_retry: before a retry, after a failed attempt (event.status and event.delay are set)
+    - on_throttle: before waiting for the rate limiter or after an HTTP 429 (event.delay is set)
+    - on_response: once the request is complete, or failed without response (event.error is set)
+
+    Hooks run in the thread making the request and should return quickly. An exception raised by a hook is logged and
+    does not affect the request.
+    """
+
+    def __init__(self, log: Optional[logging.Logger] = None, **callbacks: Callable[[RequestEvent], Any]):
+        self.log = log or logging.getLogger(__name__)
+        self.__callbacks: Dict[str, Tuple[Callable[[RequestEvent], Any], ...]] = {hook: () for hook in HOOKS}
+        self.__lock = threading.Lock()
+        for hook, callback in callbacks.items():
+            self.register(hook, callback)
+
+    def register(self, hook: str, callback: Callable[[RequestEvent], Any]):
+        if hook not in HOOKS:
+            raise ValueError(f"Unknown hook '{hook}', use one of {', '.join(HOOKS)}")
+        # Copy on write, emit() reads the callbacks without locking
+        with self.__lock:
+            self.__callbacks[hook] = self.__callbacks[hook] + (callback,)
+
+    def unregister(self, hook: str, callback: Callable[[RequestEvent], Any]):
+        with self.__lock:
+            self.__callbacks[hook] = tuple(c for c in self.__callbacks[hook] if c != callback)
+
+    @property
+    def active(self) -> bool:
+        return any(self.__callbacks.values())
+
+    def emit(self, hook: str, event: RequestEvent):
+        for callback in self.__callbacks[hook]:
+            try:
+                callback(event)
+            except Exception:
+                self.log.exception("Hook %s failed for %s %s", hook, event.method, event.url)
+
+
+class LatencyHistogram:
+    """Counts of durations per bucket, with their count, sum, min and max. Not thread safe, see RequestStatsCollector"""
+
+    __slots__ = ("bounds", "counts", "count", "sum", "min", "max")
+
+    def __init__(self, bounds: Iterable[float] = DEFAULT_BUCKETS_MS):
+        self.bounds = tuple(bounds)
+        self.counts = [0] * (len(self.bounds) + 1)
+        self.count = 0
+        self.sum = 0.0
+        self.min: Optional[float] = None
+        self.max: Optional[float] = None
+
+    def add(self, value_ms: float):
+        self.counts[bisect.bisect_left(self.bounds, value_ms)] += 1
+        self.count += 1
+        self.sum += value_ms
+        self.min = value_ms if self.min is None else min(self.min, value_ms)
+        self.max = value_ms if self.max is None else max(self.max, value_ms)
+
+    @property
+    def mean(self) -> Optional[float]:
+        return self.sum / self.count if self.count else None
+
+    def percentile(self, p: float) -> Optional[float]:
+        """Estimate of the p-th percentile (0-100): the upper bound of the bucket it falls in, capped by max"""
+        if not self.count:
+            return None
+        rank = p / 100 * self.count
+        seen = 0
+        for i, count in enumerate(self.counts):
+            seen += count
+            if seen >= rank and count:
+                return min(self.bounds[i], self.max) if i < len(self.bounds) else self.max
+        return self.max
+
+
+class EndpointStats:
+    """Requests to one endpoint template with one method, as recorded by a RequestStatsCollector"""
+
+    def __init__(self, method: str, endpoint: str, buckets: Iterable[float] = DEFAULT_BUCKETS_MS):
+        self.method = method
+        self.endpoint = endpoint
+        self.requests = 0
+        self.errors = 0
+        self.statuses: Dict[Optional[int], int] = {}
+        self.retries = 0
+        self.throttled = 0
+        self.throttled_seconds = 0.0
+        self.cache_hits = 0
+        self.bytes_sent = 0
+        self.bytes_received = 0
+        self.latency = LatencyHistogram(buckets)
+        self.ttfb = LatencyHistogram(buckets)
+
+    def __repr__(self):
+        return (
+            f"EndpointStats({self.method} {self.endpoint}, requests={self.requests}, errors={self.errors}, "
+            f"p50={self.latency.percentile(50)}ms, p99={self.latency.percentile(99)}ms)"
+        )
+
+
+class RequestStatsCollector:
+    """In-memory latency histograms and counters per endpoint template and method.
+
+    Register it on the hooks of a client, e.g. `collector.register(dt.hooks)`, then read `stats()` or push the numbers
+    to a tenant with export().
+    """
+
+    def __init__(self, buckets: Iterable[float] = DEFAULT_BUCKETS_MS, clock: Callable[[], float] = time.monotonic):
+        self.buckets = tuple(buckets)
+        self.__clock = clock
+        self.__stats: Dict[Tuple[str, str], EndpointStats] = {}
+        self.__since = clock()
+        self.__lock = threading.Lock()
+
+    def register(self, hooks: RequestHooks):
+        hooks.register(HOOK_RESPONSE, self.record)
+        hooks.register(HOOK_THROTTLE, self.record_throttle)
+
+    def unregister(self, hooks: RequestHooks):
+        hooks.unregister(HOOK_RESPONSE, self.record)
+        hooks.unregister(HOOK_THROTTLE, self.record_throttle)
+
+    def _endpoint(self, event: RequestEvent) -> EndpointStats:
+        key = (event.method, event.endpoint)
+        stats = self.__stats.get(key)
+        if stats is None:
+            stats = self.__stats[key] = EndpointStats(event.method, event.endpoint, self.buckets)
+        return stats
+
+    def record(self, event: RequestEvent):
+        with self.__lock:
+            stats = self._endpoint(event)
+            stats.requests += 1
+            stats.statuses[event.status] = stats.statuses.get(event.status, 0) + 1
+            if event.error is not None or event.status is None or event.status >= 400:
+                stats.errors += 1
+            stats.retries += event.retries
+            stats.cache_hits += event.from_cache
+            stats.bytes_sent += event.bytes_sent or 0
+            stats.bytes_received += event.bytes_received or 0
+            if event.total_seconds is not None:
+                stats.latency.add(event.total_seconds * 1000)
+            if event.ttfb_seconds is not None:
+                stats.ttfb.add(event.ttfb_seconds * 1000)
+
+    def record_throttle(self, event: RequestEvent):
+        with self.__lock:
+            stats = self._endpoint(event)
+            stats.throttled += 1
+            stats.throttled_seconds += event.delay or 0
+
+    def stats(self) -> List[EndpointStats]:
+        with self.__lock:
+            return list(self.__stats.values())
+
+    @property
+    def elapsed_seconds(self) -> float:
+        """Time since the collector was created or last reset"""
+        return self.__clock() - self.__since
+
+    def throughput(self) -> float:
+        """Requests per second since the collector was created or last reset"""
+        elapsed = self.elapsed_seconds
+        return sum(s.requests for s in self.stats()) / elapsed if elapsed > 0 else 0.0
+
+    def reset(self) -> List[EndpointStats]:
+        """Starts over, returns the stats collected until now"""
+        with self.__lock:
+            stats, self.__stats = list(self.__stats.values()), {}
+            self.__since = self.__clock()
+        return stats
+
+    def metric_lines(self, prefix: str = "api.client", dimensions: Optional[Mapping[str, str]] = None, reset: bool = False) -> List[str]:
+        """The stats in the metric ingestion line protocol, one set of lines per endpoint and method:
+
+        - {prefix}.request.duration and {prefix}.request.ttfb: gauges in milliseconds (min, max, sum and count)
+        - {prefix}.requests, .errors, .retries, .throttled, .bytes_sent and .bytes_received: count deltas
+        """
+        stats = self.reset() if reset else self.stats()
+        extra = "".join(f",{key}={_dimension_value(value)}" for key, value in (dimensions or {}).items())
+        lines = []
+        for s in stats:
+            dims = f"endpoint={_dimension_value(s.endpoint)},method={s.method}{extra}"
+            for name, histogram in (("request.duration", s.latency), ("request.ttfb", s.ttfb)):
+                if histogram.count:
+                    lines.append(f"{prefix}.{name},{dims} gauge,min={histogram.min:.3f},max={histogram.max:.3f},sum={histogram.sum:.3f},count={histogram.count}")
+            for name, value in (
+                ("requests", s.requests),
+                ("errors", s.errors),
+                ("retries", s.retries),
+                ("throttled", s.throttled),
+                ("bytes_sent", s.bytes_sent),
+                ("bytes_received", s.bytes_received),
+            ):
+                if value:
+                    lines.append(f"{prefix}.{name},{dims} count,delta={value}")
+        return lines
+
+    def export(self, metric_service, prefix: str = "api.client", dimensions: Optional[Mapping[str, str]] = None, reset: bool = True):
+        """Sends the stats to a tenant with metric_service.ingest (e.g. dt.metrics), and by default starts over.
+
+        The export request itself goes through the instrumented client and is recorded in the next interval.
+        :return: The ingest response, None when there was nothing to send
+        """
+        lines = self.metric_lines(prefix, dimensions, reset)
+        if not lines:
+            return None
+        return metric_service.ingest(lines)
+
+
+def _dimension_value(value: str) -> str:
+    escaped = str(value).replace("\\", "\\\\").replace('"', '\\"')
+    return f'"{escaped}"'
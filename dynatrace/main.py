@@ -15,7 +15,7 @@ limitations under the License.
 """
 
 import logging
-from typing import Dict, Optional
+from typing import Dict, Optional, Union
 
 from dynatrace.configuration_v1.alerting_profiles import AlertingProfileService
 from dynatrace.configuration_v1.anomaly_detection_process_groups import AnomalyDetectionPGService
@@ -58,7 +58,15 @@ from dynatrace.environment_v2.service_level_objectives import SloService
 from dynatrace.environment_v2.logs import LogService
 from dynatrace.environment_v2.settings import SettingService
 
+from dynatrace.codec import JsonCodec
+from dynatrace.compression import RequestCompression
+from dynatrace.http_cache import HttpCache
 from dynatrace.http_client import HttpClient
+from dynatrace.instrumentation import RequestHooks
+from dynatrace.metadata_cache import MetadataCache
+from dynatrace.rate_limiter import RateLimiter
+from dynatrace.retry import RetryPolicy
+from dynatrace.transport import Transport
 
 
 class Dynatrace:
@@ -75,7 +83,20 @@ class Dynatrace:
         mc_b925d32c: Optional[str] = None,
         mc_sso_csrf_cookie: Optional[str] = None,
         print_bodies = False,
-        timeout: Optional[int] = None
+        timeout: Optional[int] = None,
+        pool_connections: int = 10,
+        pool_maxsize: int = 10,
+        prefetch_pages: int = 0,
+        keep_raw_elements: bool = True,
+        rate_limiter: Union[bool, RateLimiter, None] = None,
+        retry_policy: Optional[RetryPolicy] = None,
+        transport: Union[str, Transport, None] = None,
+        cache: Union[bool, HttpCache, None] = None,
+        metadata_cache: Union[bool, MetadataCache, None] = None,
+        coalesce_requests: bool = False,
+        compression: Union[bool, RequestCompression, None] = None,
+        codec: Union[str, JsonCodec, None] = None,
+        hooks: Optional[RequestHooks] = None,
     ):
         self.__http_client = HttpClient(
             base_url,
@@ -89,8 +110,23 @@ class Dynatrace:
             mc_b925d32c,
             mc_sso_csrf_cookie,
             print_bodies,
-            timeout
+            timeout,
+            pool_connections,
+            pool_maxsize,
+            prefetch_pages,
+            keep_raw_elements,
+            rate_limiter,
+            retry_policy,
+            transport,
+            cache,
+            metadata_cache,
+            coalesce_requests,
+            compression,
+            codec,
+            hooks,
         )
+        # Register callbacks observing the requests of this client, e.g. RequestStatsCollector().register(dt.hooks)
+        self.hooks: RequestHooks = self.__http_client.hooks
 
         self.activegates: ActiveGateService = ActiveGateService(self.__http_client)
         self.activegates_autoupdate_configuration: ActiveGateAutoUpdateConfigurationService = ActiveGateAutoUpdateConfigurationService(self.__http_client)
@@ -134,3 +170,13 @@ class Dynatrace:
 
         # New implementations should be done here, above is deprecated
         self.config_v1: ConfigurationV1 = ConfigurationV1(self.__http_client)
+
+    def close(self):
+        """Closes the HTTP connection pool used by this client"""
+        self.__http_client.close()
+
+    def __enter__(self) -> "Dynatrace":
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        self.close()
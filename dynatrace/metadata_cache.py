@@ -0,0 +1,135 @@
+"""
+Copyright 2021 Dynatrace LLC
+
+Licensed under the Apache License, Version 2.0 (the "License");
+you may not use this file except in compliance with the License.
+You may obtain a copy of the License at
+
+    http://www.apache.org/licenses/LICENSE-2.0
+
+Unless required by applicable law or agreed to in writing, software
+distributed under the License is distributed on an "AS IS" BASIS,
+WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+See the License for the specific language governing permissions and
+limitations under the License.
+"""
+
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Callable, Dict, Hashable, Iterable, Optional, Tuple
+
+KIND_METRIC = "metric"
+KIND_ENTITY_TYPE = "entity_type"
+KIND_EVENT_TYPE = "event_type"
+KIND_SETTINGS_SCHEMAS = "settings_schemas"
+KIND_EXTENSION_SCHEMA = "extension_schema"
+
+# Seconds an entry is used before it is requested again
+DEFAULT_TTLS = {
+    KIND_METRIC: 60 * 60,
+    KIND_ENTITY_TYPE: 24 * 60 * 60,
+    KIND_EVENT_TYPE: 24 * 60 * 60,
+    KIND_SETTINGS_SCHEMAS: 60 * 60,
+    KIND_EXTENSION_SCHEMA: 24 * 60 * 60,
+}
+
+
+class MetadataCache:
+    """A thread safe cache for near-static metadata: metric descriptors, entity and event types, schemas...
+
+    Entries are stored by kind and id, expire after the TTL of their kind (ttls, default_ttl for the other kinds) and
+    the least recently used entries are evicted when there are more than max_entries of them.
+    Enable it with Dynatrace(..., metadata_cache=True), the services then use it for their metadata lookups
+    (MetricService.get, EntityService.get_type, EventServiceV2.get_type, SettingService.list_schemas,
+    ExtensionsServiceV2.get_schema_file).
+    """
+
+    def __init__(
+        self,
+        max_entries: int = 10000,
+        ttls: Optional[Dict[str, float]] = None,
+        default_ttl: float = 60 * 60,
+        clock: Callable[[], float] = time.monotonic,
+    ):
+        self.max_entries = max_entries
+        self.ttls = dict(DEFAULT_TTLS)
+        self.ttls.update(ttls or {})
+        self.default_ttl = default_ttl
+        self.hits: Dict[str, int] = {}
+        self.misses: Dict[str, int] = {}
+        self.__clock = clock
+        self.__entries: "OrderedDict[Tuple[str, Hashable], Tuple[float, Any]]" = OrderedDict()
+        self.__lock = threading.Lock()
+
+    def get(self, kind: str, key: Hashable) -> Optional[Any]:
+        """The cached value, None when it is missing or expired"""
+        with self.__lock:
+            entry = self.__entries.get((kind, key))
+            if entry is None:
+                return None
+            expires, value = entry
+            if expires <= self.__clock():
+                del self.__entries[(kind, key)]
+                return None
+            self.__entries.move_to_end((kind, key))
+            return value
+
+    def put(self, kind: str, key: Hashable, value: Any):
+        expires = self.__clock() + self.ttls.get(kind, self.default_ttl)
+        with self.__lock:
+            self.__entries[(kind, key)] = (expires, value)
+            self.__entries.move_to_end((kind, key))
+            while len(self.__entries) > self.max_entries:
+                self.__entries.popitem(last=False)
+
+    def get_or_load(self, kind: str, key: Hashable, loader: Callable[[], Any]) -> Any:
+        """The cached value, or the value returned by loader, which is then cached"""
+        value = self.get(kind, key)
+        with self.__lock:
+            counters = self.hits if value is not None else self.misses
+            counters[kind] = counters.get(kind, 0) + 1
+        if value is None:
+            value = loader()
+            self.put(kind, key, value)
+        return value
+
+    def invalidate(self, kind: Optional[str] = None, key: Optional[Hashable] = None):
+        """Removes one entry, all the entries of a kind (key=None), or everything (kind=None)"""
+        with self.__lock:
+            if kind is None:
+                self.__entries.clear()
+            elif key is not None:
+                self.__entries.pop((kind, key), None)
+            else:
+                for cached in [cached for cached in self.__entries if cached[0] == kind]:
+                    del self.__entries[cached]
+
+    def __len__(self):
+        return len(self.__entries)
+
+    def __repr__(self):
+        return f"MetadataCache(entries={len(self)}, hits={self.hits}, misses={self.misses})"
+
+
+def cached(http_client: Any, kind: str, key: Hashable, loader: Callable[[], Any]) -> Any:
+    """Looks the value up in the metadata cache of http_client, calls loader directly when it has no cache"""
+    cache: Optional[MetadataCache] = getattr(http_client, "metadata_cache", None)
+    if cache is None:
+        return loader()
+    return cache.get_or_load(kind, key, loader)
+
+
+def warm_up(http_client: Any, kind: str, values: Iterable[Any], key: Callable[[Any], Hashable]) -> int:
+    """Stores values in the metadata cache of http_client, by the id returned by key
+
+    :return: The amount of values stored
+    """
+    cache: Optional[MetadataCache] = getattr(http_client, "metadata_cache", None)
+    if cache is None:
+        raise ValueError("The client has no metadata cache, create it with metadata_cache=True")
+    loaded = 0
+    for value in values:
+        cache.put(kind, key(value), value)
+        loaded += 1
+    return loaded
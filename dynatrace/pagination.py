@@ -14,99 +14,235 @@ See the License for the specific language governing permissions and
 limitations under the License.
 """
 
-from typing import Generic, TypeVar, Iterator, TYPE_CHECKING
+import queue
+import threading
+from typing import Any, Callable, Generic, TypeVar, Iterator, List, Optional, Tuple, TYPE_CHECKING
 
-from dynatrace.dynatrace_object import DynatraceObject
+from dynatrace.dynatrace_object import DynatraceObject, from_response
 from dynatrace.http_client import HttpClient
+from dynatrace.streaming import JsonListStream
 
 T = TypeVar("T", bound=DynatraceObject)
 
+STREAM_CHUNK_SIZE = 64 * 1024
+
+_NO_MORE_PAGES = object()
+
+
+def _iterate_pages(fetch_page: Callable[[Any], Tuple[List[T], Any]], params: Any, prefetch_pages: int) -> Iterator[List[T]]:
+    """Yields the pages following the first one, starting with the page requested with params.
+
+    fetch_page returns the elements of a page and the parameters of the next one, None after the last page.
+    When prefetch_pages is positive, pages are requested by a background thread while the consumer processes the
+    previous ones. At most prefetch_pages pages wait in the buffer, the fetching thread blocks when it is full.
+    """
+    if prefetch_pages <= 0:
+        while params is not None:
+            page, params = fetch_page(params)
+            yield page
+        return
+
+    pages = queue.Queue(maxsize=prefetch_pages)
+    stop = threading.Event()
+
+    def put(item):
+        while not stop.is_set():
+            try:
+                pages.put(item, timeout=0.1)
+                return
+            except queue.Full:
+                pass
+
+    def fetch():
+        next_params = params
+        try:
+            while next_params is not None and not stop.is_set():
+                page, next_params = fetch_page(next_params)
+                put(page)
+        except Exception as e:
+            put(e)
+        put(_NO_MORE_PAGES)
+
+    threading.Thread(target=fetch, name="dynatrace-page-prefetch", daemon=True).start()
+    try:
+        while True:
+            page = pages.get()
+            if page is _NO_MORE_PAGES:
+                return
+            if isinstance(page, Exception):
+                raise page
+            yield page
+    finally:
+        # The consumer may stop early, let the fetching thread exit instead of filling the buffer
+        stop.set()
+
 
 class PaginatedList(Generic[T]):
-    def __init__(self, target_class, http_client, target_url, target_params=None, headers=None, list_item="result"):
+    """The elements of a paginated response, the pages after the first one are requested as the list is iterated.
+
+    A list can be iterated several times and by several threads at once: the first page is requested once and kept,
+    every iteration then requests the following pages with its own page key. Streamed lists can only be iterated
+    once, by a single thread.
+    """
+
+    def __init__(
+        self,
+        target_class,
+        http_client,
+        target_url,
+        target_params=None,
+        headers=None,
+        list_item="result",
+        prefetch_pages: Optional[int] = None,
+        stream: bool = False,
+    ):
+        """
+        :param prefetch_pages: Amount of pages requested ahead of the consumer in a background thread. Defaults to the http client setting.
+        :param stream: Decode each page incrementally while iterating, instead of loading the whole page in memory.
+            Elements are not kept, so a streamed list can only be iterated once. Prefetching is not used when streaming.
+        """
         self.__target_class = target_class
         self.__http_client: HttpClient = http_client
         self.__target_url = target_url
         self.__target_params = target_params
-        self.__headers = headers
+        # Copied, the caller may reuse its dict for other requests
+        self.__headers = dict(headers) if headers else None
         self.__list_item = list_item
-        self._has_next_page = True
         self.__total_count = None
         self.__page_size = None
+        if prefetch_pages is None:
+            prefetch_pages = getattr(http_client, "prefetch_pages", 0)
+        self.__prefetch_pages = prefetch_pages if not stream else 0
+        self.__stream = stream
 
-        self.__elements = self._get_next_page()
+        # The first page is only requested when the list is used, once even if several threads use it at the same time
+        self.__elements: Optional[List[T]] = None
+        # The parameters of the second page, None when there is only one page
+        self.__next_params = None
+        self.__lock = threading.Lock()
 
     def __getitem__(self, index):
         pass
 
+    def prefetch(self) -> "PaginatedList[T]":
+        """Requests the first page now, instead of when the list is first iterated or measured"""
+        if self.__elements is None:
+            with self.__lock:
+                if self.__elements is None:
+                    if self.__stream:
+                        self.__elements = self._stream_page(self.__target_params)
+                    else:
+                        self.__elements, self.__next_params = self._get_page(self.__target_params)
+        return self
+
     def __iter__(self) -> Iterator[T]:
+        self.prefetch()
         for element in self.__elements:
             yield element
 
-        while self._has_next_page:
-            new_elements = self._get_next_page()
+        if self.__stream:
+            # The next page key of a streamed page is only known once all its elements have been read
+            while self.__next_params is not None:
+                for element in self._stream_page(self.__next_params):
+                    yield element
+            return
+
+        for new_elements in _iterate_pages(self._get_page, self.__next_params, self.__prefetch_pages):
             for element in new_elements:
                 yield element
 
     def __len__(self):
+        self.prefetch()
+        if self.__total_count is None and self.__stream:
+            raise TypeError("The length of a streamed list is only known if the API reports a totalCount before the elements")
         return self.__total_count or len(self.__elements)
 
-    def _get_next_page(self):
-        response = self.__http_client.make_request(self.__target_url, params=self.__target_params, headers=self.__headers)
+    def _get_page(self, params) -> Tuple[List[T], Optional[dict]]:
+        """The elements of the page requested with params, and the parameters of the next page"""
+        response = self.__http_client.make_request(self.__target_url, params=params, headers=self.__headers)
         json_response = response.json()
         data = []
-        if json_response.get("nextPageKey", None):
-            self._has_next_page = True
-            self.__target_params = {"nextPageKey": json_response["nextPageKey"]}
-        else:
-            self._has_next_page = False
-
         if self.__list_item in json_response:
             elements = json_response[self.__list_item]
             self.__total_count = json_response.get("totalCount") or len(elements)
 
-            data = [self.__target_class(self.__http_client, response.headers, element) for element in elements]
-        return data
+            data = [from_response(self.__target_class, self.__http_client, response.headers, element) for element in elements]
+        return data, self._next_page_params(json_response)
+
+    @staticmethod
+    def _next_page_params(json_response) -> Optional[dict]:
+        if json_response.get("nextPageKey", None):
+            return {"nextPageKey": json_response["nextPageKey"]}
+        return None
+
+    def _stream_page(self, params) -> Iterator[T]:
+        self.__next_params = None
+        response = self.__http_client.make_request(self.__target_url, params=params, headers=self.__headers, stream=True)
+        stream = JsonListStream(response.iter_content(STREAM_CHUNK_SIZE), self.__list_item)
+        # Members that come before the list, such as totalCount, are known before the first element is read
+        stream.read_until_list()
+        self.__total_count = stream.top_level.get("totalCount", self.__total_count)
+        return self._stream_elements(response, stream)
+
+    def _stream_elements(self, response, stream: JsonListStream) -> Iterator[T]:
+        try:
+            for element in stream:
+                yield from_response(self.__target_class, self.__http_client, response.headers, element)
+        finally:
+            response.close()
+        self.__next_params = self._next_page_params(stream.top_level)
 
 
 class HeaderPaginatedList(Generic[T]):
-    def __init__(self, target_class, http_client, target_url, target_params=None, headers=None):
-        self.__elements = list()
+    """A paginated list whose next page key is sent in the response headers, it can be shared like a PaginatedList"""
+
+    def __init__(self, target_class, http_client, target_url, target_params=None, headers=None, prefetch_pages: Optional[int] = None):
+        self.__elements: Optional[List[T]] = None
+        self.__next_params = None
         self.__target_class = target_class
         self.__http_client: HttpClient = http_client
         self.__target_url = target_url
         self.__target_params = target_params
-        self.__headers = headers
-        self._has_next_page = True
+        self.__headers = dict(headers) if headers else None
         self.__total_count = None
         self.__page_size = None
+        if prefetch_pages is None:
+            prefetch_pages = getattr(http_client, "prefetch_pages", 0)
+        self.__prefetch_pages = prefetch_pages
+        self.__lock = threading.Lock()
 
     def __getitem__(self, index):
         pass
 
+    def prefetch(self) -> "HeaderPaginatedList[T]":
+        """Requests the first page now, instead of when the list is first iterated or measured"""
+        if self.__elements is None:
+            with self.__lock:
+                if self.__elements is None:
+                    self.__elements, self.__next_params = self._get_page(self.__target_params)
+        return self
+
     def __iter__(self) -> Iterator[T]:
+        self.prefetch()
         for element in self.__elements:
             yield element
 
-        while self._has_next_page:
-            new_elements = self._get_next_page()
+        for new_elements in _iterate_pages(self._get_page, self.__next_params, self.__prefetch_pages):
             for element in new_elements:
                 yield element
 
     def __len__(self):
+        self.prefetch()
         return self.__total_count or len(self.__elements)
 
-    def _get_next_page(self):
-        response = self.__http_client.make_request(self.__target_url, params=self.__target_params, headers=self.__headers)
+    def _get_page(self, params) -> Tuple[List[T], Optional[dict]]:
+        response = self.__http_client.make_request(self.__target_url, params=params, headers=self.__headers)
         json_response = response.json()
         headers = response.headers
-        if "next-page-key" in headers:
-            self._has_next_page = True
-            self.__target_params = {"nextPageKey": headers["next-page-key"]}
-        else:
-            self._has_next_page = False
+        next_params = {"nextPageKey": headers["next-page-key"]} if "next-page-key" in headers else None
 
         elements = json_response
-        self.__total_count = headers.get("total-count") or len(elements)
-        data = [self.__target_class(self.__http_client, response.headers, element) for element in elements]
-        return data
+        # Header values are strings
+        self.__total_count = int(headers["total-count"]) if "total-count" in headers else len(elements)
+        data = [from_response(self.__target_class, self.__http_client, response.headers, element) for element in elements]
+        return data, next_params
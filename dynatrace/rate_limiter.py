@@ -0,0 +1,198 @@
+"""
+Copyright 2021 Dynatrace LLC
+
+Licensed under the Apache License, Version 2.0 (the "License");
+you may not use this file except in compliance with the License.
+You may obtain a copy of the License at
+
+    http://www.apache.org/licenses/LICENSE-2.0
+
+Unless required by applicable law or agreed to in writing, software
+distributed under the License is distributed on an "AS IS" BASIS,
+WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+See the License for the specific language governing permissions and
+limitations under the License.
+"""
+
+import threading
+import time
+from typing import Callable, Dict, Mapping, Optional
+
+# Dynatrace API rate limits are expressed in requests per minute
+RATE_LIMIT_WINDOW_SECONDS = 60
+
+RATE_LIMIT_LIMIT_HEADER = "X-RateLimit-Limit"
+RATE_LIMIT_REMAINING_HEADER = "X-RateLimit-Remaining"
+RATE_LIMIT_RESET_HEADER = "X-RateLimit-Reset"
+
+
+def _header(headers: Mapping[str, str], name: str) -> Optional[str]:
+    value = headers.get(name)
+    if value is None:
+        # Plain dicts are case sensitive, the requests and httpx header mappings are not
+        value = headers.get(name.lower())
+    return value
+
+
+def _reset_in_seconds(value: str, now: float) -> Optional[float]:
+    """Seconds until the rate limit window resets, Dynatrace sends an epoch timestamp in microseconds"""
+    try:
+        reset = float(value)
+    except ValueError:
+        return None
+    if reset > 1e14:
+        reset /= 1e6
+    elif reset > 1e11:
+        reset /= 1e3
+    elif reset < 1e9:
+        # A delay in seconds rather than a timestamp
+        return max(reset, 0.0)
+    return max(reset - now, 0.0)
+
+
+class RateLimiter:
+    """A token bucket pacing the requests sent to one tenant.
+
+    The bucket refills at requests_per_minute / 60 tokens per second and holds at most `burst` tokens (a whole minute of
+    requests by default). Each request takes one token, when none is left the request waits until one is available.
+    The limiter is primed from the X-RateLimit-* headers of the responses: the limit sets the rate, the remaining
+    requests cap the available tokens and, when nothing is left, no request is sent before the reset time.
+    Until a limit is known (from the constructor or a response) requests are not paced.
+
+    reserve() never sleeps, it returns the time the caller has to wait, so the limiter can be shared by threads and by
+    asyncio tasks. It is thread safe.
+    """
+
+    def __init__(self, requests_per_minute: Optional[float] = None, burst: Optional[float] = None, clock: Callable[[], float] = time.monotonic):
+        self.__lock = threading.Lock()
+        self.__clock = clock
+        self.__burst = burst
+        self.__limit: Optional[float] = None
+        self.__remaining: Optional[int] = None
+        self.__tokens = 0.0
+        self.__updated = clock()
+        self.__blocked_until = 0.0
+        self.throttled_requests = 0
+        self.throttled_seconds = 0.0
+        if requests_per_minute is not None:
+            self.set_limit(requests_per_minute)
+
+    @property
+    def limit(self) -> Optional[float]:
+        """The amount of requests allowed per minute, None while it is not known"""
+        return self.__limit
+
+    @property
+    def remaining(self) -> Optional[int]:
+        """The remaining requests in the current window, as last reported by the tenant"""
+        return self.__remaining
+
+    @property
+    def rate(self) -> Optional[float]:
+        """The sustainable amount of requests per second"""
+        return None if self.__limit is None else self.__limit / RATE_LIMIT_WINDOW_SECONDS
+
+    @property
+    def capacity(self) -> Optional[float]:
+        if self.__limit is None:
+            return None
+        return self.__burst if self.__burst is not None else self.__limit
+
+    def set_limit(self, requests_per_minute: float):
+        if requests_per_minute <= 0:
+            raise ValueError("requests_per_minute must be positive")
+        with self.__lock:
+            self.__refill(self.__clock())
+            first = self.__limit is None
+            self.__limit = float(requests_per_minute)
+            if first:
+                self.__tokens = self.capacity
+            self.__tokens = min(self.__tokens, self.capacity)
+
+    def reserve(self, tokens: float = 1.0) -> float:
+        """Takes tokens from the bucket
+
+        :return: The seconds the caller has to wait before sending its request, 0 if it can be sent right away
+        """
+        with self.__lock:
+            now = self.__clock()
+            if self.__limit is None:
+                return max(self.__blocked_until - now, 0.0)
+            self.__refill(now)
+            # Tokens are taken even when there are not enough of them, waiting callers queue up behind each other
+            self.__tokens -= tokens
+            wait = max(-self.__tokens / self.rate, self.__blocked_until - now, 0.0)
+            if wait > 0:
+                self.throttled_requests += 1
+                self.throttled_seconds += wait
+            return wait
+
+    def acquire(self, tokens: float = 1.0):
+        """Takes tokens from the bucket, sleeping until they are available"""
+        wait = self.reserve(tokens)
+        if wait > 0:
+            time.sleep(wait)
+
+    def update_from_headers(self, headers: Mapping[str, str]):
+        """Primes the limiter from the X-RateLimit-* and Retry-After headers of a response"""
+        limit = _header(headers, RATE_LIMIT_LIMIT_HEADER)
+        remaining = _header(headers, RATE_LIMIT_REMAINING_HEADER)
+        reset = _header(headers, RATE_LIMIT_RESET_HEADER)
+        retry_after = _header(headers, "Retry-After")
+        if limit is None and remaining is None and retry_after is None:
+            return
+
+        if limit is not None:
+            try:
+                limit_value = float(limit)
+            except ValueError:
+                limit_value = 0
+            if limit_value > 0 and limit_value != self.__limit:
+                self.set_limit(limit_value)
+
+        with self.__lock:
+            now = self.__clock()
+            self.__refill(now)
+            reset_in = _reset_in_seconds(reset, time.time()) if reset is not None else None
+            if remaining is not None:
+                try:
+                    self.__remaining = int(remaining)
+                except ValueError:
+                    self.__remaining = None
+            if self.__remaining is not None and self.__limit is not None:
+                self.__tokens = min(self.__tokens, float(self.__remaining))
+                if self.__remaining <= 0 and reset_in is not None:
+                    self.__blocked_until = max(self.__blocked_until, now + reset_in)
+            if retry_after is not None:
+                try:
+                    self.__blocked_until = max(self.__blocked_until, now + float(retry_after))
+                except ValueError:
+                    pass
+
+    def __refill(self, now: float):
+        if self.__limit is not None and now > self.__updated:
+            self.__tokens = min(self.__tokens + (now - self.__updated) * self.rate, self.capacity)
+        self.__updated = max(now, self.__updated)
+
+    def __repr__(self):
+        return f"RateLimiter(limit={self.__limit}, remaining={self.__remaining})"
+
+
+_rate_limiters: Dict[str, RateLimiter] = {}
+_rate_limiters_lock = threading.Lock()
+
+
+def get_rate_limiter(base_url: str) -> RateLimiter:
+    """The process-wide rate limiter of a tenant, shared by all the clients using the same base url"""
+    key = base_url.rstrip("/").lower()
+    with _rate_limiters_lock:
+        limiter = _rate_limiters.get(key)
+        if limiter is None:
+            limiter = _rate_limiters[key] = RateLimiter()
+        return limiter
+
+
+def rate_limits() -> Dict[str, RateLimiter]:
+    """The rate limiters of all tenants, by base url"""
+    with _rate_limiters_lock:
+        return dict(_rate_limiters)
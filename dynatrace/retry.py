@@ -0,0 +1,185 @@
+"""
+Copyright 2021 Dynatrace LLC
+
+Licensed under the Apache License, Version 2.0 (the "License");
+you may not use this file except in compliance with the License.
+You may obtain a copy of the License at
+
+    http://www.apache.org/licenses/LICENSE-2.0
+
+Unless required by applicable law or agreed to in writing, software
+distributed under the License is distributed on an "AS IS" BASIS,
+WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+See the License for the specific language governing permissions and
+limitations under the License.
+"""
+
+import random
+import re
+import threading
+import time
+from datetime import timezone
+from email.utils import parsedate_to_datetime
+from typing import Callable, Dict, Iterable, Mapping, Optional
+
+# Transient failures: throttling and server side errors. Client errors (400, 401, 403, 404, 413...) fail the same way when retried
+RETRYABLE_STATUSES = (429, 500, 502, 503, 504)
+
+# Methods that can be sent twice without changing the outcome
+IDEMPOTENT_METHODS = ("GET", "HEAD", "OPTIONS", "TRACE", "PUT", "DELETE")
+
+# POST endpoints that only validate their body, other POST endpoints are only retried when declared idempotent
+DEFAULT_IDEMPOTENT_POSTS = (r"/validator$",)
+
+
+def parse_retry_after(value: Optional[str], now: Optional[float] = None) -> Optional[float]:
+    """The delay requested by a Retry-After header, in seconds. The header holds either seconds or an HTTP date"""
+    if value is None:
+        return None
+    value = value.strip()
+    try:
+        return max(float(value), 0.0)
+    except ValueError:
+        pass
+    try:
+        date = parsedate_to_datetime(value)
+    except (TypeError, ValueError, IndexError):
+        return None
+    if date is None:
+        return None
+    if date.tzinfo is None:
+        date = date.replace(tzinfo=timezone.utc)
+    now = time.time() if now is None else now
+    return max(date.timestamp() - now, 0.0)
+
+
+class RetryStats:
+    """Counters of a RetryPolicy, shared by all the requests using it"""
+
+    def __init__(self):
+        self.__lock = threading.Lock()
+        self.requests = 0
+        self.retries = 0
+        self.retried_requests = 0
+        self.exhausted = 0
+        self.retry_seconds = 0.0
+        self.retries_by_status: Dict[int, int] = {}
+
+    def _record_request(self, retries: int, exhausted: bool):
+        with self.__lock:
+            self.requests += 1
+            if retries:
+                self.retried_requests += 1
+            if exhausted:
+                self.exhausted += 1
+
+    def _record_retry(self, status: int, delay: float):
+        with self.__lock:
+            self.retries += 1
+            self.retry_seconds += delay
+            self.retries_by_status[status] = self.retries_by_status.get(status, 0) + 1
+
+    def __repr__(self):
+        return f"RetryStats(requests={self.requests}, retries={self.retries}, retried_requests={self.retried_requests}, exhausted={self.exhausted})"
+
+
+class RetryPolicy:
+    """Decides which failed requests are retried, and how long to wait before retrying them.
+
+    Only the statuses in retryable_statuses are retried. GET, PUT, DELETE... requests are always eligible, POST requests
+    only when their path matches one of the idempotent_posts regular expressions.
+    The delay follows the "decorrelated jitter" backoff: a random value between base_delay_ms and three times the previous
+    delay, capped at max_delay_ms, so that clients failing at the same time do not retry in lockstep. A Retry-After header
+    replaces the computed delay. No retry is attempted when it would end after deadline_seconds (counted from the first
+    attempt).
+
+    :param max_retries: The maximum amount of retries of a request, 0 disables retries
+    """
+
+    def __init__(
+        self,
+        max_retries: int = 3,
+        base_delay_ms: int = 500,
+        max_delay_ms: int = 30000,
+        deadline_seconds: Optional[float] = None,
+        retryable_statuses: Iterable[int] = RETRYABLE_STATUSES,
+        idempotent_posts: Iterable[str] = DEFAULT_IDEMPOTENT_POSTS,
+        respect_retry_after: bool = True,
+        random_func: Callable[[], float] = random.random,
+        clock: Callable[[], float] = time.monotonic,
+    ):
+        self.max_retries = max_retries
+        self.base_delay_ms = base_delay_ms
+        self.max_delay_ms = max(max_delay_ms, base_delay_ms)
+        self.deadline_seconds = deadline_seconds
+        self.retryable_statuses = frozenset(retryable_statuses)
+        self.idempotent_posts = [re.compile(pattern) for pattern in idempotent_posts]
+        self.respect_retry_after = respect_retry_after
+        self.stats = RetryStats()
+        self.__random = random_func
+        self.__clock = clock
+
+    def is_retryable(self, method: str, path: str, status: int) -> bool:
+        if status not in self.retryable_statuses:
+            return False
+        method = method.upper()
+        if method in IDEMPOTENT_METHODS:
+            return True
+        if method == "POST":
+            return any(pattern.search(path) for pattern in self.idempotent_posts)
+        return False
+
+    def backoff(self, previous_delay: Optional[float]) -> float:
+        """The next delay in seconds, given the previous one (None for the first retry)"""
+        base = self.base_delay_ms / 1000
+        cap = self.max_delay_ms / 1000
+        if previous_delay is None:
+            previous_delay = base
+        upper = max(previous_delay * 3, base)
+        return min(cap, base + (upper - base) * self.__random())
+
+    def start(self, method: str, path: str) -> "RetryState":
+        """Starts tracking the attempts of one request"""
+        return RetryState(self, method, path, self.__clock)
+
+
+class RetryState:
+    """The attempts of one request, created by RetryPolicy.start"""
+
+    def __init__(self, policy: RetryPolicy, method: str, path: str, clock: Callable[[], float]):
+        self.policy = policy
+        self.method = method
+        self.path = path
+        self.retries = 0
+        self.__clock = clock
+        self.__started = clock()
+        self.__delay: Optional[float] = None
+        self.__done = False
+
+    def next_delay(self, status: int, headers: Optional[Mapping[str, str]] = None) -> Optional[float]:
+        """The seconds to wait before retrying a response with this status, None when the request must not be retried"""
+        policy = self.policy
+        if self.retries >= policy.max_retries or not policy.is_retryable(self.method, self.path, status):
+            self.finish(exhausted=policy.is_retryable(self.method, self.path, status))
+            return None
+
+        delay = policy.backoff(self.__delay)
+        self.__delay = delay
+        if policy.respect_retry_after and headers is not None:
+            retry_after = parse_retry_after(headers.get("Retry-After") or headers.get("retry-after"))
+            if retry_after is not None:
+                delay = retry_after
+
+        if policy.deadline_seconds is not None and self.__clock() - self.__started + delay > policy.deadline_seconds:
+            self.finish(exhausted=True)
+            return None
+
+        self.retries += 1
+        policy.stats._record_retry(status, delay)
+        return delay
+
+    def finish(self, exhausted: bool = False):
+        """Records the outcome of the request in the policy statistics, only the first call counts"""
+        if not self.__done:
+            self.__done = True
+            self.policy.stats._record_request(self.retries, exhausted)
@@ -0,0 +1,214 @@
+"""
+Copyright 2021 Dynatrace LLC
+
+Licensed under the Apache License, Version 2.0 (the "License");
+you may not use this file except in compliance with the License.
+You may obtain a copy of the License at
+
+    http://www.apache.org/licenses/LICENSE-2.0
+
+Unless required by applicable law or agreed to in writing, software
+distributed under the License is distributed on an "AS IS" BASIS,
+WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+See the License for the specific language governing permissions and
+limitations under the License.
+"""
+
+import codecs
+import json
+from typing import Any, Dict, Iterable, Iterator, Optional
+
+try:
+    import ijson
+except ImportError:  # pragma: no cover - optional dependency
+    ijson = None
+
+_WHITESPACE = " \t\n\r"
+_NUMBER_END = ",]}" + _WHITESPACE
+_COMPACT_THRESHOLD = 64 * 1024
+
+
+class JsonListStream:
+    """Incrementally decodes a JSON object of the form {..., "<list_item>": [element, element, ...], ...}
+
+    Elements of the list_item array are decoded one at a time as the chunks arrive, so only one element (plus the
+    unread part of the current chunk) is kept in memory. The other top-level members (nextPageKey, totalCount, ...)
+    are collected in `top_level`, members that come before the list are available once `read_until_list` returned.
+
+    Uses ijson when it is installed, otherwise a pure Python decoder built on json.JSONDecoder.raw_decode.
+    """
+
+    def __init__(self, chunks: Iterable[bytes], list_item: str, use_ijson: Optional[bool] = None):
+        self.list_item = list_item
+        self.top_level: Dict[str, Any] = {}
+        if use_ijson is None:
+            use_ijson = ijson is not None
+        self.__scanner = _IjsonScanner(chunks, list_item, self.top_level) if use_ijson else _PythonScanner(chunks, list_item, self.top_level)
+
+    def read_until_list(self) -> bool:
+        """Consumes the input up to the first element of the list, returns False if there is no such list"""
+        return self.__scanner.read_until_list()
+
+    def __iter__(self) -> Iterator[Any]:
+        return self.__scanner.items()
+
+
+class _PythonScanner:
+    def __init__(self, chunks: Iterable[bytes], list_item: str, top_level: Dict[str, Any]):
+        self.__chunks = iter(chunks)
+        self.__decoder = codecs.getincrementaldecoder("utf-8")()
+        self.__raw_decode = json.JSONDecoder().raw_decode
+        self.__buffer = ""
+        self.__pos = 0
+        self.__eof = False
+        self.__list_item = list_item
+        self.__top_level = top_level
+        self.__started = False
+        self.__in_list = False
+
+    def __fill(self) -> bool:
+        if self.__eof:
+            return False
+        if self.__pos > _COMPACT_THRESHOLD:
+            self.__buffer = self.__buffer[self.__pos :]
+            self.__pos = 0
+        for chunk in self.__chunks:
+            text = self.__decoder.decode(chunk)
+            if text:
+                self.__buffer += text
+                return True
+        self.__buffer += self.__decoder.decode(b"", final=True)
+        self.__eof = True
+        return False
+
+    def __peek(self) -> str:
+        while True:
+            while self.__pos < len(self.__buffer) and self.__buffer[self.__pos] in _WHITESPACE:
+                self.__pos += 1
+            if self.__pos < len(self.__buffer):
+                return self.__buffer[self.__pos]
+            if not self.__fill():
+                return ""
+
+    def __expect(self, chars: str) -> str:
+        char = self.__peek()
+        if not char or char not in chars:
+            raise ValueError(f"Invalid JSON, expected one of '{chars}' at position {self.__pos}, found '{char}'")
+        self.__pos += 1
+        return char
+
+    def __value(self) -> Any:
+        self.__peek()
+        while True:
+            try:
+                value, end = self.__raw_decode(self.__buffer, self.__pos)
+                # A number cut at the end of a chunk ("1." of 1.5, "-12" of -123) decodes too, it is complete once
+                # a delimiter follows it
+                if self.__eof or (end < len(self.__buffer) and (not _is_number(value) or self.__buffer[end] in _NUMBER_END)):
+                    self.__pos = end
+                    return value
+            except json.JSONDecodeError:
+                if self.__eof:
+                    raise
+            self.__fill()
+
+    def __members(self, stop_at_list: bool) -> bool:
+        """Reads top-level members until the list (when stop_at_list) or the end of the object"""
+        while True:
+            if self.__peek() == "}":
+                self.__pos += 1
+                return False
+            key = self.__value()
+            self.__expect(":")
+            if stop_at_list and key == self.__list_item and self.__peek() == "[":
+                self.__pos += 1
+                return True
+            self.__top_level[key] = self.__value()
+            if self.__expect(",}") == "}":
+                return False
+
+    def read_until_list(self) -> bool:
+        if not self.__started:
+            self.__started = True
+            self.__expect("{")
+            self.__in_list = self.__members(stop_at_list=True)
+        return self.__in_list
+
+    def items(self) -> Iterator[Any]:
+        if not self.read_until_list():
+            return
+        if self.__peek() == "]":
+            self.__pos += 1
+        else:
+            while True:
+                yield self.__value()
+                if self.__expect(",]") == "]":
+                    break
+        self.__in_list = False
+        if self.__expect(",}") == ",":
+            self.__members(stop_at_list=False)
+
+
+def _is_number(value: Any) -> bool:
+    return isinstance(value, (int, float)) and not isinstance(value, bool)
+
+
+class _ChunkReader:
+    """File-like adapter over an iterable of byte chunks, as expected by ijson"""
+
+    def __init__(self, chunks: Iterable[bytes]):
+        self.__chunks = iter(chunks)
+
+    def read(self, size: int = -1) -> bytes:
+        if size == 0:
+            return b""
+        return next(self.__chunks, b"")
+
+
+class _IjsonScanner:
+    def __init__(self, chunks: Iterable[bytes], list_item: str, top_level: Dict[str, Any]):
+        self.__events = ijson.parse(_ChunkReader(chunks), use_float=True)
+        self.__list_item = list_item
+        self.__top_level = top_level
+        self.__started = False
+        self.__in_list = False
+
+    def __build(self, prefix: str, event: str, value: Any) -> Any:
+        """Builds the value starting with the given event, consuming the events of nested values"""
+        if event not in ("start_map", "start_array"):
+            return value
+        builder = ijson.ObjectBuilder()
+        end_event = event.replace("start", "end")
+        start_prefix = prefix
+        while (prefix, event) != (start_prefix, end_event):
+            builder.event(event, value)
+            prefix, event, value = next(self.__events)
+        return builder.value
+
+    def __members(self, stop_at_list: bool) -> bool:
+        for prefix, event, value in self.__events:
+            if event in ("start_map", "map_key", "end_map"):
+                # The top-level object itself, member values have a non-empty prefix
+                if not prefix:
+                    continue
+            if stop_at_list and prefix == self.__list_item and event == "start_array":
+                return True
+            self.__top_level[prefix] = self.__build(prefix, event, value)
+        return False
+
+    def read_until_list(self) -> bool:
+        if not self.__started:
+            self.__started = True
+            self.__in_list = self.__members(stop_at_list=True)
+        return self.__in_list
+
+    def items(self) -> Iterator[Any]:
+        if not self.read_until_list():
+            return
+        item_prefix = f"{self.__list_item}.item"
+        for prefix, event, value in self.__events:
+            if prefix == self.__list_item and event == "end_array":
+                break
+            yield self.__build(item_prefix, event, value)
+        self.__in_list = False
+        self.__members(stop_at_list=False)
@@ -0,0 +1,165 @@
+"""
+Copyright 2021 Dynatrace LLC
+
+Licensed under the Apache License, Version 2.0 (the "License");
+you may not use this file except in compliance with the License.
+You may obtain a copy of the License at
+
+    http://www.apache.org/licenses/LICENSE-2.0
+
+Unless required by applicable law or agreed to in writing, software
+distributed under the License is distributed on an "AS IS" BASIS,
+WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+See the License for the specific language governing permissions and
+limitations under the License.
+"""
+
+from typing import Any, Dict, Iterator, Optional
+
+import requests
+from requests.adapters import HTTPAdapter
+
+try:
+    import httpx
+except ImportError:  # pragma: no cover - optional dependency
+    httpx = None
+
+TRANSPORT_HTTP1 = "http1"
+TRANSPORT_HTTP2 = "http2"
+
+
+class Transport:
+    """Sends the requests of an HttpClient.
+
+    Implementations return objects behaving like a requests.Response: status_code, headers, text, json(), close() and,
+    for streamed responses, iter_content(chunk_size).
+    """
+
+    def request(
+        self,
+        method: str,
+        url: str,
+        headers: Dict[str, str],
+        params: Optional[Any] = None,
+        json: Optional[Any] = None,
+        data: Optional[Any] = None,
+        files: Optional[Any] = None,
+        cookies: Optional[Dict[str, str]] = None,
+        timeout: Optional[float] = None,
+        stream: bool = False,
+    ):
+        raise NotImplementedError
+
+    def close(self):
+        pass
+
+
+class RequestsTransport(Transport):
+    """HTTP/1.1 over a pool of keep-alive connections (requests and urllib3), the default transport
+
+    :param max_retries: The urllib3 retries applied to connection errors
+    """
+
+    def __init__(
+        self,
+        pool_connections: int = 10,
+        pool_maxsize: int = 10,
+        max_retries: Optional[Any] = None,
+        proxies: Optional[Dict[str, str]] = None,
+        verify: bool = False,
+    ):
+        self.proxies = proxies or {}
+        self.verify = verify
+        # A single long-lived session, so connections (and TLS sessions) are kept alive and reused across requests.
+        # requests.Session is safe to share between threads as long as its configuration is not changed after creation.
+        self.session = requests.Session()
+        adapter = HTTPAdapter(pool_connections=pool_connections, pool_maxsize=pool_maxsize, max_retries=max_retries or 0)
+        self.session.mount("https://", adapter)
+        self.session.mount("http://", adapter)
+
+    def request(self, method, url, headers, params=None, json=None, data=None, files=None, cookies=None, timeout=None, stream=False):
+        return self.session.request(
+            method, url, headers=headers, params=params, json=json, verify=self.verify, proxies=self.proxies, data=data, cookies=cookies, files=files, timeout=timeout,
+            stream=stream,
+        )
+
+    def close(self):
+        self.session.close()
+
+
+class HttpxResponse:
+    """An httpx.Response with the parts of the requests.Response interface used by the client"""
+
+    __slots__ = ("_response", "json")
+
+    def __init__(self, response: "httpx.Response"):
+        self._response = response
+
+    def __getattr__(self, name):
+        return getattr(self._response, name)
+
+    @property
+    def ok(self) -> bool:
+        return self._response.status_code < 400
+
+    @property
+    def reason(self) -> str:
+        return self._response.reason_phrase
+
+    @property
+    def http_version(self) -> str:
+        return self._response.http_version
+
+    def iter_content(self, chunk_size: Optional[int] = None) -> Iterator[bytes]:
+        return self._response.iter_bytes(chunk_size)
+
+    def close(self):
+        self._response.close()
+
+    def __repr__(self):
+        return f"<Response [{self._response.status_code}]>"
+
+
+class HttpxTransport(Transport):
+    """Requests sent with httpx, over HTTP/2 by default.
+
+    With HTTP/2 all the requests made concurrently (e.g. by the threads of a ThreadPoolExecutor) to a tenant are
+    multiplexed over a single connection, instead of one connection (and TLS handshake) per thread.
+    HTTP/2 is negotiated with TLS (ALPN), use http1=False to force it on plain http:// urls (prior knowledge).
+    Requires the optional dependencies, `pip install dt[http2]`.
+
+    :param retries: The amount of retries of failed connection attempts
+    """
+
+    def __init__(
+        self,
+        http2: bool = True,
+        http1: bool = True,
+        max_connections: int = 10,
+        retries: int = 0,
+        proxies: Optional[Dict[str, str]] = None,
+        verify: bool = False,
+    ):
+        if httpx is None:
+            raise ImportError("The httpx transport requires httpx, install it with 'pip install dt[http2]'")
+        limits = httpx.Limits(max_connections=max_connections, max_keepalive_connections=max_connections)
+        transport = httpx.HTTPTransport(http1=http1, http2=http2, verify=verify, limits=limits, retries=retries)
+        mounts = {
+            f"{scheme}://": httpx.HTTPTransport(proxy=proxy, http1=http1, http2=http2, verify=verify, limits=limits, retries=retries)
+            for scheme, proxy in (proxies or {}).items()
+        }
+        self.client = httpx.Client(transport=transport, mounts=mounts or None, verify=verify)
+
+    def request(self, method, url, headers, params=None, json=None, data=None, files=None, cookies=None, timeout=None, stream=False):
+        if isinstance(params, dict):
+            # requests silently drops None values, httpx would send them as empty strings
+            params = {key: value for key, value in params.items() if value is not None}
+        content = None
+        if isinstance(data, (bytes, str)):
+            content, data = data, None
+        # cookies are ignored, HttpClient also sends them in the Cookie header (httpx deprecates per-request cookies)
+        request = self.client.build_request(method, url, headers=headers, params=params, json=json, content=content, data=data, files=files, timeout=timeout)
+        return HttpxResponse(self.client.send(request, stream=stream))
+
+    def close(self):
+        self.client.close()
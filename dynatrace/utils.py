@@ -17,13 +17,16 @@ limitations under the License.
 import warnings
 import functools
 from datetime import datetime, timezone
-from typing import Union, Optional
+from typing import Iterable, List, Union, Optional
 import unicodedata
 import re
 
 
 ISO_8601 = "%Y-%m-%dT%H:%M:%S.%fZ"
 
+# The documented maximum length of an entitySelector
+ENTITY_SELECTOR_MAX_LENGTH = 10000
+
 
 def slugify(value):
     value = str(value)
@@ -67,3 +70,39 @@ def datetime_to_int64(timestamp: Optional[datetime]) -> Optional[int]:
     if not isinstance(timestamp, datetime):
         return timestamp
     return int(timestamp.replace(tzinfo=timezone.utc).timestamp() * 1000)
+
+
+def selector_value(value: str) -> str:
+    """A quoted selector value, with quotes and tildes escaped by a tilde"""
+    escaped = value.replace("~", "~~").replace('"', '~"')
+    return f'"{escaped}"'
+
+
+def type_selector(entity_type: str) -> str:
+    """The type("TYPE") entity selector of an entity type"""
+    return f"type({selector_value(entity_type)})"
+
+
+def entity_id_selectors(entity_ids: Iterable[str], max_length: int = ENTITY_SELECTOR_MAX_LENGTH, max_ids: Optional[int] = None) -> List[str]:
+    """Packs entity IDs into as few entityId("id-1","id-2",...) selectors as possible
+
+    :param max_length: The maximum length of each selector
+    :param max_ids: The maximum amount of IDs in each selector, no limit by default
+    """
+    prefix, suffix = "entityId(", ")"
+    selectors = []
+    current: List[str] = []
+    length = 0
+    for entity_id in entity_ids:
+        value = selector_value(entity_id)
+        if len(prefix) + len(value) + len(suffix) > max_length:
+            raise ValueError(f"The entity ID '{entity_id}' does not fit in a selector of {max_length} characters")
+        # Each value after the first one adds a comma
+        if current and (len(prefix) + length + 1 + len(value) + len(suffix) > max_length or (max_ids is not None and len(current) >= max_ids)):
+            selectors.append(f"{prefix}{','.join(current)}{suffix}")
+            current, length = [], 0
+        length += len(value) + (1 if current else 0)
+        current.append(value)
+    if current:
+        selectors.append(f"{prefix}{','.join(current)}{suffix}")
+    return selectors
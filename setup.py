@@ -5,6 +5,7 @@ setup(
     version="1.1.65",
     packages=find_packages(),
     install_requires=["requests>=2.22"],
+    extras_require={"async": ["httpx>=0.26"], "http2": ["httpx[http2]>=0.26"], "streaming": ["ijson>=3.1"], "columnar": ["numpy"], "orjson": ["orjson"]},
     tests_require=["pytest", "mock", "tox"],
     python_requires=">=3.6",
     author="David Lopes",
@@ -0,0 +1,129 @@
+import asyncio
+
+import pytest
+
+httpx = pytest.importorskip("httpx")
+
+from dynatrace.aio import AsyncDynatrace, AsyncHttpClient
+from dynatrace.aio.environment_v2.monitored_entities import EntityService
+from dynatrace.aio.pagination import AsyncPaginatedList
+from dynatrace.environment_v2.monitored_entities import Entity
+from dynatrace.environment_v2.metrics import MetricDescriptor
+from dynatrace.http_client import DynatraceHttpError
+from dynatrace.rate_limiter import RateLimiter
+from dynatrace.retry import RetryPolicy
+
+
+def _entity(entity_id):
+    return {"entityId": entity_id, "displayName": entity_id.lower(), "type": "HOST"}
+
+
+def test_list_entities(mock_tenant):
+    mock_tenant.responses = [
+        (200, {}, {"totalCount": 3, "nextPageKey": "page2", "entities": [_entity("HOST-1"), _entity("HOST-2")]}),
+        (200, {}, {"totalCount": 3, "entities": [_entity("HOST-3")]}),
+    ]
+
+    async def run():
+        async with AsyncDynatrace(mock_tenant.url, "mock_token") as dt:
+            entities = dt.entities.list('type("HOST")', fields="+tags")
+            assert isinstance(entities, AsyncPaginatedList)
+            return [e async for e in entities]
+
+    entities = asyncio.run(run())
+    assert all(isinstance(e, Entity) for e in entities)
+    assert [e.entity_id for e in entities] == ["HOST-1", "HOST-2", "HOST-3"]
+
+    first_path, second_path = mock_tenant.requests[0][1], mock_tenant.requests[1][1]
+    assert "entitySelector=type" in first_path and "fields=%2Btags" in first_path
+    assert "time" not in first_path
+    assert second_path.endswith("nextPageKey=page2")
+
+
+def test_get_metric(mock_tenant):
+    mock_tenant.responses = [(200, {}, {"metricId": "builtin:host.cpu.idle", "unit": "Percent", "displayName": "CPU idle"})]
+
+    async def run():
+        async with AsyncDynatrace(mock_tenant.url, "mock_token") as dt:
+            return await dt.metrics.get("builtin:host.cpu.idle")
+
+    metric = asyncio.run(run())
+    assert isinstance(metric, MetricDescriptor)
+    assert metric.display_name == "CPU idle"
+
+
+def test_errors_are_raised(mock_tenant):
+    mock_tenant.responses = [(404, {}, {"error": "not found"})]
+
+    async def run():
+        async with AsyncDynatrace(mock_tenant.url, "mock_token") as dt:
+            await dt.problems.get("missing")
+
+    with pytest.raises(Exception, match="not found"):
+        asyncio.run(run())
+
+
+def test_concurrency_is_bounded():
+    in_flight = 0
+    max_in_flight = 0
+
+    async def handler(request):
+        nonlocal in_flight, max_in_flight
+        in_flight += 1
+        max_in_flight = max(max_in_flight, in_flight)
+        await asyncio.sleep(0.01)
+        in_flight -= 1
+        return httpx.Response(200, json=_entity(request.url.path.split("/")[-1]))
+
+    async def run():
+        client = AsyncHttpClient("http://mock_tenant", "mock_token", max_concurrency=3, transport=httpx.MockTransport(handler))
+        service = EntityService(client)
+        entities = await asyncio.gather(*[service.get(f"HOST-{i}") for i in range(20)])
+        await client.close()
+        return entities
+
+    entities = asyncio.run(run())
+    assert len(entities) == 20
+    assert max_in_flight == 3
+
+
+def test_rate_limiter(mock_tenant):
+    mock_tenant.responses = [(200, {"X-RateLimit-Limit": "6000", "X-RateLimit-Remaining": "0", "X-RateLimit-Reset": "0.2"}, {"items": []})]
+    limiter = RateLimiter()
+
+    async def run():
+        async with AsyncDynatrace(mock_tenant.url, "mock_token", rate_limiter=limiter) as dt:
+            await dt.metrics.get("builtin:host.cpu.idle")
+            start = asyncio.get_running_loop().time()
+            await dt.metrics.get("builtin:host.cpu.idle")
+            return asyncio.get_running_loop().time() - start
+
+    assert asyncio.run(run()) >= 0.15
+    assert limiter.limit == 6000 and limiter.throttled_requests == 1
+
+
+def test_retry_policy(mock_tenant):
+    mock_tenant.responses = [(503, {"Retry-After": "0"}, {}), (404, {}, {"error": "not found"})]
+    policy = RetryPolicy(max_retries=5)
+
+    async def run():
+        async with AsyncDynatrace(mock_tenant.url, "mock_token", retry_policy=policy) as dt:
+            await dt.metrics.get("builtin:host.cpu.idle")
+
+    with pytest.raises(DynatraceHttpError):
+        asyncio.run(run())
+    assert len(mock_tenant.requests) == 2
+    assert policy.stats.retries_by_status == {503: 1}
+
+
+def test_callers_headers_are_not_modified(mock_tenant):
+    shared_headers = {"X-Marker": "shared"}
+
+    async def run():
+        client = AsyncHttpClient(mock_tenant.url, "mock_token")
+        await asyncio.gather(*(client.make_request(f"/api/v2/things/{i}", headers=shared_headers) for i in range(5)))
+        await client.close()
+
+    asyncio.run(run())
+    assert shared_headers == {"X-Marker": "shared"}
+    assert all(headers["X-Marker"] == "shared" and headers["Authorization"] == "Api-Token mock_token" for _, _, headers, _ in mock_tenant.requests)
@@ -1,5 +1,8 @@
 import hashlib
 import os
+import threading
+import socketserver
+from http.server import BaseHTTPRequestHandler, HTTPServer
 from pathlib import Path
 from typing import Optional, Dict
 from unittest import mock
@@ -42,8 +45,61 @@ def local_make_request(
         return MockResponse(json_data)
 
 
-@pytest.fixture(autouse=True)
+@pytest.fixture
 def dt():
     with mock.patch.object(HttpClient, "make_request", new=local_make_request):
         dt = Dynatrace("mock_tenant", "mock_token")
         yield dt
+
+
+class _MockTenantServer(socketserver.ThreadingMixIn, HTTPServer):
+    # http.server.ThreadingHTTPServer is only available from Python 3.7
+    daemon_threads = True
+
+
+class _MockTenantHandler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+
+    def _respond(self):
+        length = int(self.headers.get("content-length", 0))
+        body = self.rfile.read(length) if length else b""
+        server = self.server
+        with server.lock:
+            server.requests.append((self.command, self.path, dict(self.headers), body))
+            server.connections.add(self.client_address)
+            responses = server.responses
+            if server.route is not None:
+                status, headers, payload = server.route(self.command, self.path, dict(self.headers), body)
+            else:
+                status, headers, payload = responses.pop(0) if responses else (200, {}, {"path": self.path})
+        data = json.dumps(payload).encode() if not isinstance(payload, bytes) else payload
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(data)))
+        for key, value in headers.items():
+            self.send_header(key, value)
+        self.end_headers()
+        self.wfile.write(data)
+
+    do_GET = do_POST = do_PUT = do_DELETE = _respond
+
+    def log_message(self, *args):
+        pass
+
+
+@pytest.fixture
+def mock_tenant():
+    """A local HTTP server, records the requests it receives and answers with the queued `responses` (status, headers, body),
+    or with `route(command, path, headers, body)` when it is set"""
+    server = _MockTenantServer(("127.0.0.1", 0), _MockTenantHandler)
+    server.lock = threading.Lock()
+    server.requests = []
+    server.responses = []
+    server.route = None
+    server.connections = set()
+    server.url = f"http://127.0.0.1:{server.server_address[1]}"
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    yield server
+    server.shutdown()
+    server.server_close()
@@ -0,0 +1,17 @@
+import json
+
+from dynatrace import Dynatrace
+
+
+def test_post_without_raw_elements(mock_tenant):
+    mock_tenant.responses = [(200, {}, {"entityId": "CUSTOM_DEVICE-1", "groupId": "CUSTOM_DEVICE_GROUP-1"})]
+    dt = Dynatrace(mock_tenant.url, "mock_token", keep_raw_elements=False)
+
+    device = dt.custom_devices.create("dev1", "Dev 1")
+    device.absolute("k", 1.0)
+    device.post()
+
+    command, path, _, body = mock_tenant.requests[0]
+    assert (command, path) == ("POST", "/api/v1/entity/infrastructure/custom/dev1")
+    series = json.loads(body)["series"]
+    assert [(s["timeseriesId"], s["dataPoints"][0][1]) for s in series] == [("k", 1.0)]
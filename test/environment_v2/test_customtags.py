@@ -46,3 +46,83 @@ def test_post_value(dt: Dynatrace):
 def test_delete(dt: Dynatrace):
     deleted_tags = dt.custom_tags.delete("test-tag-value", "entityId(CUSTOM_DEVICE-3B7788FE910B0F42)", delete_all_with_key=True)
     assert deleted_tags.matched_entities_count == 1
+
+
+class TagsClient:
+    def __init__(self):
+        self.requests = []
+
+    def make_request(self, path, params=None, method="GET", query_params=None, **kwargs):
+        self.requests.append((method, params, query_params))
+        selector = (query_params or params)["entitySelector"]
+        result = {"matchedEntitiesCount": selector.count('"') // 2}
+        return type("Response", (), {"json": lambda self: result, "headers": {}})()
+
+
+def host_id(i):
+    return f"HOST-{i:016X}"
+
+
+def current_tags():
+    from dynatrace.environment_v2.tag_index import TagIndex
+
+    index = TagIndex()
+    for i in range(1000):
+        index.add(host_id(i), [("CONTEXTLESS", "env", "prod" if i % 2 else "dev"), ("AWS", "Name", f"host-{i}")])
+    return index
+
+
+def test_bulk_apply():
+    client = TagsClient()
+    index = current_tags()
+    desired = {host_id(i): ["env:prod", AddEntityTags("critical")] if i < 10 else [("env", "prod")] for i in range(1000)}
+    result = customtags.CustomTagService(client).bulk_apply(desired, current=index, remove_others=True)
+
+    # HOST-0..9 get critical (one request), the 500 dev hosts get env:prod (two selectors, up to 416 IDs fit in one), the
+    # five odd hosts of HOST-0..9 already have it
+    posts = [(body["tags"], query["entitySelector"]) for method, body, query in client.requests if method == "POST"]
+    assert len(posts) == 3
+    assert sorted(len(selector.split(",")) for _, selector in posts) == [10, 84, 416]
+    assert [{"key": "critical", "value": None}] in [tags for tags, _ in posts]
+    assert len(result.added) == 505
+    # The dev hosts lose env:dev, with one DELETE per selector
+    deletes = [params for method, params, _ in client.requests if method == "DELETE"]
+    assert len(deletes) == 2 and all(params["key"] == "env" for params in deletes)
+    assert result.requests == 5 and result.matched_entities == 510 + 500
+
+    # The index follows, the AWS tags are untouched
+    assert index.count("env", "prod") == 1000 and index.count("env", "dev") == 0
+    assert index.count("critical") == 10 and index.count("Name") == 1000
+
+    client.requests.clear()
+    result = customtags.CustomTagService(client).bulk_apply(desired, current=index, remove_others=True)
+    assert result.requests == 0 and client.requests == []
+
+
+def test_bulk_apply_groups_by_tag_set():
+    client = TagsClient()
+    desired = {f"HOST-{i}": ["a", "b", "c"] for i in range(5)}
+    desired.update({f"HOST-{i}": ["a"] for i in range(5, 10)})
+    customtags.CustomTagService(client).bulk_apply(desired)
+    # {a, b, c} and {a} need two requests, one per tag would need three
+    assert [[tag["key"] for tag in body["tags"]] for _, body, _ in client.requests] == [["a", "b", "c"], ["a"]]
+
+
+def test_bulk_remove():
+    client = TagsClient()
+    index = current_tags()
+    index.add_tag(host_id(0), "env", "staging")
+    tags = {host_id(i): ["env:dev", "env:prod", "env:staging"] for i in range(1000)}
+    result = customtags.CustomTagService(client).bulk_remove(tags, current=index)
+
+    # Every host loses all its env tags: deleteAllWithKey, instead of one request per value
+    assert [(params["key"], params["deleteAllWithKey"]) for _, params, _ in client.requests] == [("env", True)] * 3
+    assert result.removed[host_id(0)] == {("env", "dev"), ("env", "staging")}
+    assert index.count("env") == 0
+
+    client.requests.clear()
+    customtags.CustomTagService(client).bulk_remove({"HOST-1": ["critical"], "HOST-2": ["critical", "owner:a"]})
+    assert [(params["key"], params["value"], params["deleteAllWithKey"]) for _, params, _ in client.requests] == [
+        ("critical", None, None),
+        ("owner", "a", None),
+    ]
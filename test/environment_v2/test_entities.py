@@ -1,8 +1,13 @@
+import re
+import threading
 from datetime import datetime
 
+import pytest
+
 from dynatrace import Dynatrace
 from dynatrace.environment_v2.monitored_entities import (
     Entity,
+    EntityService,
     EntityIcon,
     ToPosition,
     FromPosition,
@@ -15,7 +20,7 @@ from dynatrace.environment_v2.schemas import ManagementZone
 from dynatrace.environment_v2.custom_tags import METag
 
 from dynatrace.pagination import PaginatedList
-from dynatrace.utils import int64_to_datetime
+from dynatrace.utils import ENTITY_SELECTOR_MAX_LENGTH, entity_id_selectors, int64_to_datetime, type_selector
 
 
 def test_list(dt: Dynatrace):
@@ -171,3 +176,118 @@ def test_create_custom_device(dt: Dynatrace):
     assert device.dns_names[0] == "testdevice.testnet.net"
     assert device.properties["this"] == "that"
     assert device.message_type == MessageType.CUSTOM_DEVICE
+
+
+def test_entity_id_selectors():
+    assert entity_id_selectors([]) == []
+    assert entity_id_selectors(["HOST-1", "HOST-2", "HOST-3"], max_ids=2) == ['entityId("HOST-1","HOST-2")', 'entityId("HOST-3")']
+    assert entity_id_selectors(['CUSTOM_DEVICE-"a~b"']) == ['entityId("CUSTOM_DEVICE-~"a~~b~"")']
+
+    ids = [f"PROCESS_GROUP_INSTANCE-{i:016X}" for i in range(3000)]
+    selectors = entity_id_selectors(ids)
+    assert all(len(selector) <= ENTITY_SELECTOR_MAX_LENGTH for selector in selectors)
+    # Full selectors, the last one excepted
+    assert all(len(selector) > ENTITY_SELECTOR_MAX_LENGTH - 40 for selector in selectors[:-1])
+    assert [i for selector in selectors for i in re.findall(r'"([^"]+)"', selector)] == ids
+
+    with pytest.raises(ValueError):
+        entity_id_selectors(["HOST-1"], max_length=15)
+
+
+def test_type_selector():
+    assert type_selector("HOST") == 'type("HOST")'
+    assert type_selector('CUSTOM"TYPE') == 'type("CUSTOM~"TYPE")'
+
+
+class EntitiesClient:
+    """Answers entity lists with the hosts of their entityId selector, except the unknown ones"""
+
+    def __init__(self):
+        self.requests = []
+        self.lock = threading.Lock()
+
+    def make_request(self, path, params=None, headers=None, **kwargs):
+        with self.lock:
+            self.requests.append(dict(params))
+        ids = [i for i in re.findall(r'"([^"]+)"', params["entitySelector"]) if not i.endswith("UNKNOWN")]
+        result = {"totalCount": len(ids), "pageSize": params["pageSize"], "entities": [{"entityId": i, "displayName": i.lower(), "type": "HOST"} for i in ids]}
+        return type("Response", (), {"json": lambda self: result, "headers": {}})()
+
+
+def test_get_many():
+    client = EntitiesClient()
+    ids = [f"HOST-{i:016X}" for i in range(1000)]
+    entities = EntityService(client).get_many(ids + ids[:10] + ["HOST-UNKNOWN"], fields="+tags")
+
+    assert list(entities) == ids
+    assert entities["HOST-0000000000000001"].display_name == "host-0000000000000001"
+    assert all(isinstance(entity, Entity) for entity in entities.values())
+    # About 400 IDs per selector, one page each
+    assert len(client.requests) == 3
+    assert all(r["fields"] == "+tags" and r["pageSize"] == 500 and len(r["entitySelector"]) <= 10000 for r in client.requests)
+
+    assert EntityService(client).get_many([]) == {}
+
+
+
+class InventoryClient:
+    """Answers type("...") selectors, optionally with entityName.startsWith("..."), a few entities per page"""
+
+    def __init__(self, names):
+        self.names = names
+        self.requests = []
+        self.lock = threading.Lock()
+
+    def make_request(self, path, params=None, headers=None, **kwargs):
+        with self.lock:
+            self.requests.append(dict(params))
+        if path == EntityService.ENDPOINT_TYPES:
+            result = {"totalCount": len(self.names), "types": [{"type": t, "displayName": t.title()} for t in self.names]}
+        else:
+            selector, offset = params["nextPageKey"].split("|") if "nextPageKey" in params else (params["entitySelector"], 0)
+            entity_type = re.search(r'type\("([^"]+)"\)', selector).group(1)
+            prefix = re.search(r'startsWith\("([^"]+)"\)', selector)
+            names = [name for name in self.names[entity_type] if prefix is None or name.lower().startswith(prefix.group(1))]
+            offset = int(offset)
+            page = names[offset:offset + 4]
+            result = {
+                "totalCount": len(names),
+                "entities": [{"entityId": f"{entity_type}-{name}", "displayName": name, "type": entity_type} for name in page],
+            }
+            if offset + 4 < len(names):
+                result["nextPageKey"] = f"{selector}|{offset + 4}"
+        return type("Response", (), {"json": lambda self: result, "headers": {}})()
+
+
+def test_list_all():
+    hosts = [f"{c}host{i}" for c in "abC" for i in range(5)] + ["_odd", "[bracket]"]
+    client = InventoryClient({"HOST": hosts, "SERVICE": [f"service{i}" for i in range(6)], "QUEUE": []})
+    progress = []
+    inventory = EntityService(client).list_all(concurrency=3, page_size=4, large_type_threshold=10, on_progress=progress.append)
+    entities = list(inventory)
+
+    ids = [entity.entity_id for entity in entities]
+    assert sorted(ids) == sorted([f"HOST-{name}" for name in hosts] + [f"SERVICE-service{i}" for i in range(6)])
+    assert len(ids) == len(set(ids))
+    assert inventory.entities == len(ids)
+
+    assert sorted(stats.entity_type for stats in progress) == ["HOST", "QUEUE", "SERVICE"]
+    host, service = inventory.stats["HOST"], inventory.stats["SERVICE"]
+    assert (host.total_count, host.entities, host.fallback, host.shards) == (17, 17, True, 37)
+    assert (service.total_count, service.entities, service.fallback, service.shards) == (6, 6, False, 1)
+    assert inventory.types_done == 3 and all(stats.seconds > 0 for stats in progress)
+
+    # The first page of a small type is requested once, by its probe
+    service_requests = [r for r in client.requests if r.get("entitySelector") == 'type("SERVICE")' or r.get("nextPageKey", "").startswith('type("SERVICE")')]
+    assert len(service_requests) == 2
+    assert all(r["pageSize"] == 4 for r in client.requests if "entitySelector" in r)
+
+
+def test_list_all_errors_and_early_exit():
+    client = InventoryClient({"HOST": [f"host{i}" for i in range(40)]})
+    inventory = EntityService(client).list_all(types=["HOST"], page_size=4, large_type_threshold=100)
+    assert next(iter(inventory)).entity_id == "HOST-host0"
+
+    # Errors of the workers are raised by the iteration
+    with pytest.raises(KeyError):
+        list(EntityService(client).list_all(types=["UNKNOWN_TYPE"]))
@@ -0,0 +1,98 @@
+import pytest
+
+from dynatrace import Dynatrace
+from dynatrace.environment_v2.entity_graph import DIRECTION_IN, DIRECTION_OUT, EntityGraph
+from dynatrace.environment_v2.monitored_entities import Entity
+
+
+def _entity(entity_id, name, from_relationships=None, to_relationships=None):
+    def relationships(raw):
+        return {label: [{"id": other, "type": other.rsplit("-", 1)[0]} for other in others] for label, others in (raw or {}).items()}
+
+    return Entity(
+        raw_element={
+            "entityId": entity_id,
+            "type": entity_id.rsplit("-", 1)[0],
+            "displayName": name,
+            "fromRelationships": relationships(from_relationships),
+            "toRelationships": relationships(to_relationships),
+        }
+    )
+
+
+@pytest.fixture
+def graph():
+    # frontend -> checkout -> payments -> DB, checkout -> DB, all on HOST-1, an isolated host
+    services = [
+        _entity("SERVICE-FRONTEND", "frontend", {"calls": ["SERVICE-CHECKOUT"], "runsOnHost": ["HOST-1"]}),
+        _entity("SERVICE-CHECKOUT", "checkout", {"calls": ["SERVICE-PAYMENTS", "SERVICE-DB"], "runsOnHost": ["HOST-1"]}, {"calls": ["SERVICE-FRONTEND"]}),
+        _entity("SERVICE-PAYMENTS", "payments", {"calls": ["SERVICE-DB"]}, {"calls": ["SERVICE-CHECKOUT"]}),
+    ]
+    # A second sweep, the database service reports the calls from its side too
+    databases = [_entity("SERVICE-DB", "orders-db", None, {"calls": ["SERVICE-CHECKOUT", "SERVICE-PAYMENTS"]})]
+    hosts = [_entity("HOST-1", "host-1", None, {"runsOnHost": ["SERVICE-FRONTEND", "SERVICE-CHECKOUT"]}), _entity("HOST-2", "host-2")]
+    return EntityGraph(services, databases, hosts)
+
+
+def test_nodes_and_edges(graph):
+    assert len(graph) == 6
+    assert graph.edge_count == 6
+    assert sorted(graph.labels) == ["calls", "runsOnHost"]
+    assert "SERVICE-DB" in graph and "SERVICE-UNKNOWN" not in graph
+    assert graph.type_of("SERVICE-DB") == "SERVICE"
+    assert graph.name_of("SERVICE-DB") == "orders-db"
+    assert sorted(graph.edges("SERVICE-CHECKOUT")) == [("calls", "SERVICE-DB"), ("calls", "SERVICE-PAYMENTS"), ("runsOnHost", "HOST-1")]
+    assert graph.edges("SERVICE-CHECKOUT", DIRECTION_IN) == [("calls", "SERVICE-FRONTEND")]
+    with pytest.raises(KeyError):
+        graph.neighbours("SERVICE-UNKNOWN")
+
+
+def test_neighbours(graph):
+    assert sorted(graph.neighbours("SERVICE-CHECKOUT", DIRECTION_OUT, labels="calls")) == ["SERVICE-DB", "SERVICE-PAYMENTS"]
+    assert graph.neighbours("SERVICE-CHECKOUT", DIRECTION_IN) == ["SERVICE-FRONTEND"]
+    assert sorted(graph.neighbours("SERVICE-CHECKOUT")) == ["HOST-1", "SERVICE-DB", "SERVICE-FRONTEND", "SERVICE-PAYMENTS"]
+    assert graph.neighbours("SERVICE-CHECKOUT", types="HOST") == ["HOST-1"]
+    assert graph.neighbours("SERVICE-CHECKOUT", labels="unknown") == []
+    with pytest.raises(ValueError):
+        graph.neighbours("SERVICE-CHECKOUT", "sideways")
+
+
+def test_bfs_and_callers(graph):
+    assert graph.bfs("SERVICE-FRONTEND", 0) == {"SERVICE-FRONTEND": 0}
+    assert graph.bfs("SERVICE-FRONTEND", 2, DIRECTION_OUT, labels="calls") == {
+        "SERVICE-FRONTEND": 0,
+        "SERVICE-CHECKOUT": 1,
+        "SERVICE-PAYMENTS": 2,
+        "SERVICE-DB": 2,
+    }
+    assert sorted(graph.callers("SERVICE-DB")) == ["SERVICE-CHECKOUT", "SERVICE-PAYMENTS"]
+    assert sorted(graph.callers("SERVICE-DB", depth=3)) == ["SERVICE-CHECKOUT", "SERVICE-FRONTEND", "SERVICE-PAYMENTS"]
+    assert graph.callers("SERVICE-DB", types="HOST") == []
+
+
+def test_connected_components(graph):
+    assert [sorted(component) for component in graph.connected_components()] == [
+        ["HOST-1", "SERVICE-CHECKOUT", "SERVICE-DB", "SERVICE-FRONTEND", "SERVICE-PAYMENTS"],
+        ["HOST-2"],
+    ]
+    # Without the host relationships, the hosts are on their own
+    assert sorted(map(len, graph.connected_components(labels="calls"))) == [1, 1, 4]
+
+
+def test_graph_from_entities_list(dt: Dynatrace):
+    entities = dt.entities.list('type("HOST")', fields="+fromRelationships,+toRelationships,+icon,+properties,+tags,+managementZones,+firstSeenTms,+lastSeenTms")
+    graph = EntityGraph(entities)
+    host = "HOST-82F576674F19AC16"
+    assert graph.type_of(host) == "HOST"
+    assert len(graph.neighbours(host, DIRECTION_IN, labels="isProcessOf")) == 27
+    assert graph.neighbours(host, DIRECTION_OUT, labels="isNetworkClientOfHost") == [host]
+    assert graph.type_of("DISK-31FEE393BCB443EB") == "DISK" and graph.name_of("DISK-31FEE393BCB443EB") is None
+    assert len(graph.connected_components()) == 1
+
+
+def test_entities_without_raw_elements():
+    entities = [_entity("SERVICE-A", "a", {"calls": ["SERVICE-B"]}), _entity("SERVICE-B", "b")]
+    for entity in entities:
+        entity._release_raw_element()
+    graph = EntityGraph(entities)
+    assert graph.edges("SERVICE-A") == [("calls", "SERVICE-B")]
@@ -0,0 +1,166 @@
+import re
+import threading
+
+import pytest
+
+from dynatrace.environment_v2.entity_store import EntityStore, EntitySync
+from dynatrace.environment_v2.monitored_entities import Entity, EntityService
+
+MINUTE = 60 * 1000
+NOW = 1_700_000_000_000
+
+
+def _raw(entity_id, name, last_seen, tags=(), zones=()):
+    return {
+        "entityId": entity_id,
+        "type": entity_id.rsplit("-", 1)[0],
+        "displayName": name,
+        "firstSeenTms": NOW - 24 * 60 * MINUTE,
+        "lastSeenTms": last_seen,
+        "tags": [{"context": "CONTEXTLESS", "key": k, "value": v, "stringRepresentation": f"{k}:{v}"} for k, v in tags],
+        "managementZones": [{"id": str(i), "name": zone} for i, zone in enumerate(zones)],
+    }
+
+
+class Tenant:
+    """Lists its entities of the requested type that were seen in the requested timeframe"""
+
+    def __init__(self, entities, with_type=True):
+        self.entities = {raw["entityId"]: raw for raw in entities}
+        self.with_type = with_type
+        self.requests = []
+        self.lock = threading.Lock()
+
+    def make_request(self, path, params=None, headers=None, **kwargs):
+        with self.lock:
+            self.requests.append(dict(params))
+        entity_type = re.match(r'type\("([^"]+)"\)', params["entitySelector"]).group(1)
+        time_from, time_to = int(params["from"]), int(params["to"])
+        entities = [
+            dict(raw) for raw in self.entities.values() if raw["type"] == entity_type and time_from <= raw["lastSeenTms"] and raw["firstSeenTms"] <= time_to
+        ]
+        if not self.with_type:
+            for raw in entities:
+                del raw["type"]
+        result = {"totalCount": len(entities), "entities": entities}
+        return type("Response", (), {"json": lambda self: result, "headers": {}})()
+
+
+def test_store_queries():
+    with EntityStore() as store:
+        entities = [
+            _raw("HOST-1", "web-1", NOW, tags=[("env", "prod")], zones=["Production"]),
+            _raw("HOST-2", "web_2", NOW - 10 * MINUTE, tags=[("env", "dev")]),
+            _raw("SERVICE-1", "checkout", NOW, tags=[("team", "payments")], zones=["Production"]),
+        ]
+        assert store.upsert(Entity(raw_element=raw) for raw in entities) == (3, 0, 0)
+        assert len(store) == 3
+        assert store.types() == {"HOST": 2, "SERVICE": 1}
+
+        def ids(**kwargs):
+            return [e.entity_id for e in store.query(**kwargs)]
+
+        assert ids(entity_type="HOST") == ["HOST-1", "HOST-2"]
+        assert ids(tag="env:prod") == ["HOST-1"]
+        assert ids(tag="env") == ["HOST-1", "HOST-2"]
+        assert ids(management_zone="Production") == ["HOST-1", "SERVICE-1"]
+        assert ids(management_zone="0", entity_type="SERVICE") == ["SERVICE-1"]
+        assert ids(seen_since=NOW - MINUTE) == ["HOST-1", "SERVICE-1"]
+        assert ids(seen_before=NOW - MINUTE) == ["HOST-2"]
+        # _ is not a wildcard
+        assert ids(name_prefix="web_") == ["HOST-2"]
+        assert ids(limit=1) == ["HOST-1"]
+        assert store.count(tag="env") == 2
+
+        host = store.get("HOST-1")
+        assert host.display_name == "web-1" and [t.key for t in host.tags] == ["env"]
+        assert store.get("HOST-3") is None
+
+        # Only seen again: unchanged, a renamed entity is updated and its tags replaced
+        entities[0]["lastSeenTms"] = NOW + MINUTE
+        renamed = _raw("HOST-2", "web-2", NOW, tags=[("env", "test")])
+        assert store.upsert([Entity(raw_element=entities[0]), Entity(raw_element=renamed)]) == (0, 1, 1)
+        assert store.get("HOST-1").json()["lastSeenTms"] == NOW + MINUTE
+        assert ids(tag="env:dev") == [] and ids(tag="env:test") == ["HOST-2"]
+
+        assert store.delete(["HOST-2", "HOST-3"]) == 1
+        assert ids(tag="env") == ["HOST-1"]
+
+
+def test_store_is_persistent(tmp_path):
+    path = str(tmp_path / "entities.db")
+    with EntityStore(path) as store:
+        store.upsert([Entity(raw_element=_raw("HOST-1", "web-1", NOW))])
+        store.set_checkpoint("HOST", NOW, NOW)
+    with EntityStore(path) as store:
+        assert [e.entity_id for e in store.query()] == ["HOST-1"]
+        assert store.checkpoint("HOST") == (NOW, NOW)
+        store.set_checkpoint("HOST", NOW + 1)
+        assert store.checkpoint("HOST") == (NOW + 1, NOW)
+
+
+def test_incremental_sync():
+    tenant = Tenant(
+        [
+            _raw("HOST-1", "web-1", NOW - MINUTE),
+            _raw("HOST-2", "web-2", NOW - 2 * 24 * 60 * MINUTE),
+            _raw("SERVICE-1", "checkout", NOW - MINUTE),
+        ]
+    )
+    clock = [NOW / 1000]
+    store = EntityStore()
+    sync = EntitySync(EntityService(tenant), store, ["HOST", "SERVICE"], clock=lambda: clock[0])
+
+    host, service = sync.sync()
+    assert (host.full, host.added, service.added, host.vanished) == (True, 2, 1, [])
+    assert int(tenant.requests[0]["from"]) == NOW - 3 * 24 * 60 * MINUTE
+    assert tenant.requests[0]["fields"] == "+firstSeenTms,+lastSeenTms,+tags,+managementZones,+properties"
+
+    # 10 minutes later, HOST-1 was seen again and renamed, a new host appeared
+    clock[0] += 600
+    tenant.entities["HOST-1"]["lastSeenTms"] = NOW + 9 * MINUTE
+    tenant.entities["HOST-1"]["displayName"] = "web-1a"
+    tenant.entities["HOST-3"] = _raw("HOST-3", "web-3", NOW + 9 * MINUTE)
+    tenant.requests.clear()
+    host, service = sync.sync()
+    assert not host.full
+    assert (host.added, host.updated, host.unchanged) == (1, 1, 0)
+    assert (service.added, service.updated, service.unchanged) == (0, 0, 1)
+    # Only the entities seen since the previous sync (minus the overlap) are listed
+    assert int(tenant.requests[0]["from"]) == NOW - 5 * MINUTE
+    assert store.get("HOST-1").display_name == "web-1a"
+    assert host.vanished == []
+
+    # A day and a half later, HOST-2 (last seen 2 days before the first sync) has vanished
+    clock[0] += 36 * 3600
+    for raw in tenant.entities.values():
+        if raw["entityId"] != "HOST-2":
+            raw["lastSeenTms"] = int(clock[0] * 1000)
+    host, service = sync.sync()
+    assert host.vanished == ["HOST-2"]
+    assert (host.unchanged, service.unchanged) == (2, 1)
+    assert sorted(store.types().items()) == [("HOST", 2), ("SERVICE", 1)]
+
+
+def test_sync_stores_the_listed_type():
+    # Listed entities have no type field unless it is requested, and the IDs of some types do not start with the type
+    tenant = Tenant([dict(_raw("OS_SERVICE-1", "sshd", NOW - MINUTE), type="os:service")], with_type=False)
+    clock = [NOW / 1000]
+    store = EntityStore()
+    sync = EntitySync(EntityService(tenant), store, ["os:service"], clock=lambda: clock[0])
+
+    (result,) = sync.sync()
+    assert result.added == 1
+    assert store.types() == {"os:service": 1}
+
+    clock[0] += 4 * 24 * 3600
+    (result,) = sync.sync()
+    assert result.vanished == ["OS_SERVICE-1"]
+    assert len(store) == 0
+
+
+def test_entities_without_raw_json():
+    entity = Entity(raw_element=_raw("HOST-1", "web-1", NOW))
+    entity._release_raw_element()
+    with pytest.raises(ValueError):
+        EntityStore().upsert([entity])
@@ -1,5 +1,19 @@
+import gzip
+import json
+import math
+import re
+import threading
+import time
+from datetime import timedelta
+from pathlib import Path
+
+import pytest
+
 from dynatrace import Dynatrace
 
+from dynatrace.environment_v2 import metrics
+from dynatrace.http_client import DynatraceHttpError
+from dynatrace.environment_v2.metrics import ColumnarMetricSeries, ColumnarMetricSeriesCollection
 from dynatrace.environment_v2.metrics import MetricDescriptor, Unit, AggregationType, Transformation, ValueType, MetricSeriesCollection
 from dynatrace.pagination import PaginatedList
 from dynatrace.utils import int64_to_datetime
@@ -114,3 +128,244 @@ def test_ingest(dt: Dynatrace):
     assert ingest["linesOk"] == 1
     assert ingest["linesInvalid"] == 0
     assert ingest["error"] is None
+
+
+@pytest.fixture(params=["numpy", "array"])
+def array_backend(request, monkeypatch):
+    if request.param == "numpy":
+        pytest.importorskip("numpy")
+    else:
+        monkeypatch.setattr(metrics, "np", None)
+    return request.param
+
+
+def _columnar_collection(data):
+    return ColumnarMetricSeriesCollection(raw_element={"metricId": "builtin:host.cpu.idle", "data": data})
+
+
+def test_query_columnar(array_backend):
+    with open(Path(__file__).parent.parent / "mock_data" / "GET_api_v2_metrics_query_3b31d1b7859b9a7.json") as f:
+        raw_collection = json.load(f)["result"][0]
+    raw_series = raw_collection["data"][0]
+
+    collection = ColumnarMetricSeriesCollection(raw_element=raw_collection)
+    series = collection.data[0]
+    assert isinstance(series, ColumnarMetricSeries)
+    assert series.dimension_map == {"dt.entity.host": "HOST-82F576674F19AC16"}
+    assert list(series.timestamps_ms) == raw_series["timestamps"]
+    assert series.timestamps[0] == int64_to_datetime(raw_series["timestamps"][0])
+    assert all(math.isnan(v) if r is None else v == r for v, r in zip(series.values, raw_series["values"]))
+    if array_backend == "numpy":
+        assert series.timestamps_ms.dtype.name == "int64"
+        assert series.values.dtype.name == "float64"
+
+
+def test_columnar_aggregations(array_backend):
+    collection = _columnar_collection(
+        [
+            {"dimensions": ["HOST-1"], "timestamps": [0, 60000, 120000, 180000], "values": [1.0, 2.0, None, 4.0]},
+            {"dimensions": ["HOST-2"], "timestamps": [0, 60000, 120000, 180000], "values": [3.0, None, None, 8.0]},
+        ]
+    )
+
+    total = collection.sum()
+    assert list(total.timestamps_ms) == [0, 60000, 120000, 180000]
+    assert list(total.values)[:2] == [4.0, 2.0] and math.isnan(total.values[2]) and total.values[3] == 12.0
+    average = collection.avg()
+    assert list(average.values)[:2] == [2.0, 2.0] and average.values[3] == 6.0
+
+    resampled = collection.resample(120000, "max")
+    assert list(resampled.data[0].timestamps_ms) == [0, 120000]
+    assert list(resampled.data[0].values) == [2.0, 4.0]
+    assert list(resampled.data[1].values) == [3.0, 8.0]
+    assert list(collection.data[0].resample(120000, "count").values) == [2.0, 1.0]
+    assert list(collection.data[0].resample(120000, "sum").values) == [3.0, 4.0]
+    with pytest.raises(ValueError):
+        collection.resample(120000, "median")
+
+
+def test_columnar_to_pandas():
+    pytest.importorskip("pandas")
+    collection = _columnar_collection([{"dimensionMap": {"dt.entity.host": "HOST-1"}, "timestamps": [0, 60000], "values": [1.0, None]}])
+    frame = collection.to_pandas()
+    assert list(frame.columns) == ["timestamp", "value", "dt.entity.host"]
+    assert len(frame) == 2
+    assert frame["dt.entity.host"][0] == "HOST-1"
+
+
+class ShardedQueryClient:
+    """Answers metric queries with one series per requested entity, one data point per minute (both ends included)"""
+
+    def __init__(self):
+        self.requests = []
+        self.lock = threading.Lock()
+
+    def make_request(self, path, params=None, headers=None, **kwargs):
+        with self.lock:
+            self.requests.append(dict(params))
+        start, end = int(params["from"]), int(params["to"])
+        timestamps = list(range(start, end + 1, 60000))
+        entities = re.findall(r'"([^"]+)"', params["entitySelector"] or '"HOST-1"')
+        data = [{"dimensions": [e], "dimensionMap": {"dt.entity.host": e}, "timestamps": timestamps, "values": [t / 60000 for t in timestamps]} for e in entities]
+        result = {"totalCount": 1, "nextPageKey": None, "result": [{"metricId": params["metricSelector"], "data": data}]}
+        return type("Response", (), {"json": lambda self: result, "headers": {}})()
+
+
+def test_query_sharded():
+    client = ShardedQueryClient()
+    service = metrics.MetricService(client)
+
+    base = 1000 * 86400000
+    time_from = int64_to_datetime(base)
+    time_to = int64_to_datetime(base + 10 * 60000)
+    results = service.query_sharded(
+        "builtin:host.cpu.idle", "1m", time_from, time_to, entity_ids=["HOST-1", "HOST-2", "HOST-3"], entities_per_shard=2, shard_duration=timedelta(minutes=4)
+    )
+
+    windows = sorted({(int(r["from"]) - base, int(r["to"]) - base) for r in client.requests})
+    assert windows == [(0, 240000), (240000, 480000), (480000, 600000)]
+    assert sorted({r["entitySelector"] for r in client.requests}) == ['entityId("HOST-1","HOST-2")', 'entityId("HOST-3")']
+    assert len(client.requests) == 6
+
+    assert len(results) == 1
+    collection = results[0]
+    assert isinstance(collection, MetricSeriesCollection)
+    assert [series.dimensions for series in collection.data] == [["HOST-1"], ["HOST-2"], ["HOST-3"]]
+    minutes = range(base // 60000, base // 60000 + 11)
+    for series in collection.data:
+        # Shards overlap on their boundaries, every timestamp is only kept once
+        assert series.timestamps == [int64_to_datetime(minute * 60000) for minute in minutes]
+        assert series.values == [float(minute) for minute in minutes]
+
+
+def test_query_sharded_without_raw_elements():
+    client = ShardedQueryClient()
+    client.keep_raw_elements = False
+    base = 1000 * 86400000
+    time_from = int64_to_datetime(base)
+    time_to = int64_to_datetime(base + 10 * 60000)
+
+    results = metrics.MetricService(client).query_sharded("builtin:host.cpu.idle", "1m", time_from, time_to, shard_duration=timedelta(minutes=4))
+
+    assert len(client.requests) == 3
+    series = results[0].data[0]
+    assert results[0].json() is None
+    assert series.values == [float(minute) for minute in range(base // 60000, base // 60000 + 11)]
+
+
+def test_query_sharded_by_resolution(array_backend):
+    client = ShardedQueryClient()
+    service = metrics.MetricService(client)
+    time_from = int64_to_datetime(metrics.SHARD_MAX_DATA_POINTS * 60000 + 90000)
+    time_to = int64_to_datetime(metrics.SHARD_MAX_DATA_POINTS * 60000 * 3 + 90000)
+
+    results = service.query_sharded("builtin:host.cpu.idle", "1m", time_from, time_to, columnar=True)
+
+    assert len(client.requests) == 3
+    assert sorted(int(r["from"]) for r in client.requests)[1] == metrics.SHARD_MAX_DATA_POINTS * 60000 * 2
+    assert isinstance(results[0], ColumnarMetricSeriesCollection)
+    assert len(results[0].data[0].timestamps_ms) == 2 * metrics.SHARD_MAX_DATA_POINTS + 1
+
+
+def test_query_sharded_invalid_arguments():
+    service = metrics.MetricService(ShardedQueryClient())
+    with pytest.raises(ValueError):
+        service.query_sharded("builtin:host.cpu.idle", "1m", "now-2h", int64_to_datetime(60000))
+    with pytest.raises(ValueError):
+        service.query_sharded("builtin:host.cpu.idle", "Inf", int64_to_datetime(60000), int64_to_datetime(120000))
+
+
+class IngestClient:
+    """Accepts every line, except the lines containing 'invalid' which make the request fail with a 400"""
+
+    def __init__(self):
+        self.batches = []
+        self.headers = []
+        self.lock = threading.Lock()
+
+    def make_request(self, path, params=None, headers=None, method="GET", data=None, **kwargs):
+        assert path == "/api/v2/metrics/ingest" and method == "POST"
+        if headers.get("Content-Encoding") == "gzip":
+            data = gzip.decompress(data)
+        lines = data.decode("utf-8").split("\n")
+        with self.lock:
+            self.batches.append(lines)
+            self.headers.append(headers)
+        invalid = len([line for line in lines if "invalid" in line])
+        body = {"linesOk": len(lines) - invalid, "linesInvalid": invalid, "error": None}
+        response = type("Response", (), {"json": lambda self: body, "headers": {}})()
+        if invalid:
+            raise DynatraceHttpError("Error making request", response)
+        return response
+
+
+def test_ingest_batcher_flushes_on_line_count():
+    client = IngestClient()
+    results = []
+    with metrics.MetricService(client).ingest_batcher(max_lines=3, max_age_seconds=None, on_result=results.append) as batcher:
+        batcher.add_lines([f"my.metric,host=a {i}" for i in range(7)])
+
+    assert [len(batch) for batch in sorted(client.batches, key=lambda b: b[0])] == [3, 3, 1]
+    assert all(headers["Content-Encoding"] == "gzip" for headers in client.headers)
+    assert sum(result.lines for result in results) == 7
+    assert batcher.lines_ok == 7 and batcher.lines_invalid == 0 and batcher.batches_sent == 3
+
+
+def test_ingest_batcher_flushes_on_size():
+    client = IngestClient()
+    line = "my.metric " + "1" * 89
+    with metrics.MetricIngestBatcher(client, max_bytes=250, max_age_seconds=None, compress=False) as batcher:
+        for _ in range(5):
+            batcher.add(line)
+        with pytest.raises(ValueError):
+            batcher.add("x" * 250)
+
+    # Two lines and their separators fit in 250 bytes, three do not
+    assert [len(batch) for batch in client.batches] == [2, 2, 1]
+    assert all("Content-Encoding" not in headers for headers in client.headers)
+
+
+def test_ingest_batcher_flushes_on_age():
+    client = IngestClient()
+    batcher = metrics.MetricIngestBatcher(client, max_age_seconds=0.05)
+    batcher.add("my.metric 1")
+    deadline = time.monotonic() + 5
+    while not client.batches and time.monotonic() < deadline:
+        time.sleep(0.01)
+    assert client.batches == [["my.metric 1"]]
+    batcher.close()
+    with pytest.raises(RuntimeError):
+        batcher.add("my.metric 2")
+
+
+def test_ingest_batcher_reports_invalid_lines():
+    client = IngestClient()
+    batcher = metrics.MetricIngestBatcher(client, max_age_seconds=None)
+    batcher.add_lines(["my.metric 1", "invalid line", "my.metric 2"])
+    [result] = batcher.wait()
+    batcher.close()
+
+    assert (result.lines, result.lines_ok, result.lines_invalid) == (3, 2, 1)
+    assert not result.failed and isinstance(result.exception, DynatraceHttpError)
+    assert batcher.lines_ok == 2 and batcher.lines_invalid == 1 and batcher.batches_failed == 0
+
+
+def test_ingest_batcher_backpressure():
+    release = threading.Event()
+
+    class SlowClient(IngestClient):
+        def make_request(self, *args, **kwargs):
+            release.wait(5)
+            return super().make_request(*args, **kwargs)
+
+    client = SlowClient()
+    batcher = metrics.MetricIngestBatcher(client, max_lines=1, max_workers=1, max_pending_batches=2, max_age_seconds=None)
+    producer = threading.Thread(target=batcher.add_lines, args=([f"my.metric {i}" for i in range(4)],))
+    producer.start()
+    producer.join(0.2)
+    # Two batches are pending and the producer waits for a slot for the third one
+    assert producer.is_alive()
+    release.set()
+    producer.join(5)
+    batcher.close()
+    assert sorted(line for batch in client.batches for line in batch) == [f"my.metric {i}" for i in range(4)]
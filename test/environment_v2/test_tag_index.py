@@ -0,0 +1,58 @@
+from dynatrace.environment_v2.monitored_entities import Entity
+from dynatrace.environment_v2.tag_index import TagIndex
+
+
+def entity(entity_id, *tags):
+    raw_tags = [{"context": context, "key": key, "value": value} for context, key, value in tags]
+    return Entity(raw_element={"entityId": entity_id, "displayName": entity_id.lower(), "type": "HOST", "tags": raw_tags})
+
+
+def test_lookups():
+    index = TagIndex(
+        [
+            entity("HOST-1", ("CONTEXTLESS", "env", "prod"), ("CONTEXTLESS", "owner", "team-a")),
+            entity("HOST-2", ("CONTEXTLESS", "env", "prod"), ("KUBERNETES", "app", "frontend")),
+        ],
+        [entity("HOST-3", ("CONTEXTLESS", "env", "dev"), ("CONTEXTLESS", "critical", None)), entity("HOST-4")],
+    )
+    assert len(index) == 4 and "HOST-4" in index
+
+    assert index.entities("env", "prod") == ["HOST-1", "HOST-2"]
+    assert index.entities("env") == ["HOST-1", "HOST-2", "HOST-3"]
+    assert index.entities("app", context="KUBERNETES") == ["HOST-2"]
+    assert index.entities("app", context="CONTEXTLESS") == []
+    assert index.entities("unknown") == []
+    assert index.count("critical") == 1
+
+    # Production hosts without owner, untagged hosts
+    assert index.entity_ids(index.bitmap("env", "prod") & ~index.bitmap("owner")) == ["HOST-2"]
+    assert index.entity_ids(index.bitmap() & ~index.bitmap("env")) == ["HOST-4"]
+
+    assert index.tags_of("HOST-2", context="CONTEXTLESS") == {("CONTEXTLESS", "env", "prod")}
+    assert next(iter(index.tags().items())) == (("CONTEXTLESS", "env", "prod"), 2)
+
+
+def test_updates():
+    index = TagIndex([entity("HOST-1", ("CONTEXTLESS", "env", "prod")), entity("HOST-2", ("CONTEXTLESS", "env", "prod"))])
+
+    # Listed again, the entity only has its new tags
+    index.update([entity("HOST-1", ("CONTEXTLESS", "env", "dev"))])
+    assert index.entities("env", "prod") == ["HOST-2"]
+    assert index.entities("env", "dev") == ["HOST-1"]
+
+    index.add_tag("HOST-3", "env", "prod")
+    index.remove_tag("HOST-2", "env", "prod")
+    index.remove_tag("HOST-9", "env", "prod")
+    assert index.entities("env", "prod") == ["HOST-3"]
+
+    index.remove("HOST-1")
+    assert "HOST-1" not in index and index.entities("env") == ["HOST-3"]
+    assert index.entity_ids(index.bitmap()) == ["HOST-2", "HOST-3"]
+    assert ("CONTEXTLESS", "env", "dev") not in index.tags()
+
+
+def test_large_bitmaps():
+    index = TagIndex(entity(f"HOST-{i}", ("CONTEXTLESS", "parity", str(i % 2))) for i in range(20000))
+    odd = index.entities("parity", "1")
+    assert len(odd) == 10000
+    assert odd[:2] == ["HOST-1", "HOST-3"] and odd[-1] == "HOST-19999"
@@ -0,0 +1,9 @@
+"""A clock for the classes that take a clock callable (rate limiter, retry policy, metadata cache), tests move it by setting now"""
+
+
+class FakeClock:
+    def __init__(self, now: float = 0.0):
+        self.now = now
+
+    def __call__(self):
+        return self.now
@@ -0,0 +1,85 @@
+"""A minimal HTTP/2 server (cleartext, prior knowledge) answering every request with a JSON body, used by the transport tests and benchmark"""
+
+import json
+import socket
+import threading
+import time
+
+from h2.config import H2Configuration
+from h2.connection import H2Connection
+from h2.events import ConnectionTerminated, RequestReceived, StreamEnded
+
+
+class H2Server:
+    def __init__(self, delay: float = 0.0):
+        self.delay = delay
+        self.lock = threading.Lock()
+        self.connections = 0
+        self.requests = []
+        self.in_flight = 0
+        self.max_in_flight = 0
+        self.sock = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
+        self.sock.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEADDR, 1)
+        self.sock.bind(("127.0.0.1", 0))
+        self.sock.listen(64)
+        self.url = f"http://127.0.0.1:{self.sock.getsockname()[1]}"
+        self.__stopped = False
+        threading.Thread(target=self.__accept, daemon=True).start()
+
+    def close(self):
+        self.__stopped = True
+        self.sock.close()
+
+    def __accept(self):
+        while not self.__stopped:
+            try:
+                client, _ = self.sock.accept()
+            except OSError:
+                return
+            with self.lock:
+                self.connections += 1
+            threading.Thread(target=self.__serve, args=(client,), daemon=True).start()
+
+    def __serve(self, client: socket.socket):
+        conn = H2Connection(config=H2Configuration(client_side=False, header_encoding="utf-8"))
+        conn_lock = threading.Lock()
+        paths = {}
+        with conn_lock:
+            conn.initiate_connection()
+            client.sendall(conn.data_to_send())
+        while True:
+            try:
+                data = client.recv(65535)
+            except OSError:
+                return
+            if not data:
+                return
+            with conn_lock:
+                events = conn.receive_data(data)
+                for event in events:
+                    if isinstance(event, RequestReceived):
+                        paths[event.stream_id] = dict(event.headers)[":path"]
+                    elif isinstance(event, StreamEnded):
+                        with self.lock:
+                            self.requests.append(paths[event.stream_id])
+                            self.in_flight += 1
+                            self.max_in_flight = max(self.max_in_flight, self.in_flight)
+                        threading.Thread(target=self.__respond, args=(client, conn, conn_lock, event.stream_id, paths.pop(event.stream_id)), daemon=True).start()
+                    elif isinstance(event, ConnectionTerminated):
+                        client.close()
+                        return
+                client.sendall(conn.data_to_send())
+
+    def __respond(self, client, conn, conn_lock, stream_id, path):
+        if self.delay:
+            time.sleep(self.delay)
+        body = json.dumps({"path": path}).encode()
+        with self.lock:
+            self.in_flight -= 1
+        with conn_lock:
+            conn.send_headers(stream_id, [(":status", "200"), ("content-type", "application/json"), ("content-length", str(len(body)))])
+            conn.send_data(stream_id, body, end_stream=True)
+            try:
+                client.sendall(conn.data_to_send())
+            except OSError:
+                pass
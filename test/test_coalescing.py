@@ -0,0 +1,96 @@
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import pytest
+
+from dynatrace import Dynatrace
+from dynatrace.coalescing import RequestCoalescer
+from dynatrace.http_client import HttpClient, DynatraceHttpError
+from dynatrace.transport import Transport
+
+
+class FakeResponse:
+    def __init__(self, status_code, payload):
+        self.status_code = status_code
+        self.headers = {}
+        self.payload = payload
+        self.text = str(payload)
+
+    def json(self):
+        return dict(self.payload)
+
+    def close(self):
+        pass
+
+
+class SlowTransport(Transport):
+    """Answers after a delay, so that concurrent calls overlap"""
+
+    def __init__(self, status_code=200, delay=0.2):
+        self.status_code = status_code
+        self.delay = delay
+        self.calls = []
+        self.lock = threading.Lock()
+
+    def request(self, method, url, headers, params=None, **kwargs):
+        with self.lock:
+            self.calls.append((method, url, params))
+        time.sleep(self.delay)
+        return FakeResponse(self.status_code, {"url": url, "params": params})
+
+
+def test_key_normalization():
+    key = RequestCoalescer.key("get", "http://tenant/api/v2/entities", {"b": 1, "a": "x", "c": None}, {"Authorization": "t"})
+    assert key == RequestCoalescer.key("GET", "http://tenant/api/v2/entities", {"a": "x", "b": "1"}, {"authorization": "t"})
+    assert key != RequestCoalescer.key("GET", "http://tenant/api/v2/entities", {"a": "y", "b": 1}, {"Authorization": "t"})
+
+
+def test_concurrent_identical_gets_share_one_request():
+    transport = SlowTransport()
+    client = HttpClient("http://tenant", "mock_token", transport=transport, coalesce_requests=True)
+    with ThreadPoolExecutor(max_workers=10) as executor:
+        responses = list(executor.map(lambda _: client.make_request("/api/v2/entities/HOST-1", params={"fields": "+tags"}), range(10)))
+
+    assert len(transport.calls) == 1
+    assert all(r.json() == {"url": "http://tenant/api/v2/entities/HOST-1", "params": {"fields": "+tags"}} for r in responses)
+    assert (client.coalescer.requests, client.coalescer.deduplicated) == (1, 9)
+
+    # Nothing is kept once the request is done
+    client.make_request("/api/v2/entities/HOST-1", params={"fields": "+tags"})
+    assert len(transport.calls) == 2
+
+
+def test_different_or_unsafe_requests_are_not_coalesced():
+    transport = SlowTransport(delay=0.1)
+    with Dynatrace("http://tenant", "mock_token", transport=transport, coalesce_requests=True) as dt:
+        calls = [
+            lambda: dt.entities.get("HOST-1"),
+            lambda: dt.entities.get("HOST-2"),
+            lambda: dt.metrics.ingest(["my.metric 1"]),
+            lambda: dt.metrics.ingest(["my.metric 1"]),
+        ]
+        with ThreadPoolExecutor(max_workers=4) as executor:
+            list(executor.map(lambda call: call(), calls))
+    assert len(transport.calls) == 4
+
+
+def test_errors_are_shared():
+    transport = SlowTransport(status_code=404)
+    client = HttpClient("http://tenant", "mock_token", transport=transport, coalesce_requests=True)
+
+    def request():
+        with pytest.raises(DynatraceHttpError):
+            client.make_request("/api/v2/entities/HOST-1")
+
+    threads = [threading.Thread(target=request) for _ in range(5)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    assert len(transport.calls) == 1
+    assert client.coalescer.deduplicated == 4
+
+
+def test_disabled_by_default():
+    assert HttpClient("http://tenant", "mock_token").coalescer is None
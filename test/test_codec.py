@@ -0,0 +1,99 @@
+import json
+
+import pytest
+
+from dynatrace import Dynatrace
+from dynatrace.codec import CODEC_ORJSON, CODEC_STDLIB, JsonCodec, OrjsonCodec, get_codec
+from dynatrace.environment_v2.settings import SettingsObjectCreate
+from dynatrace.http_cache import HttpCache
+from dynatrace.http_client import HttpClient
+
+orjson = pytest.importorskip("orjson")
+
+
+def test_get_codec():
+    assert isinstance(get_codec(), OrjsonCodec)
+    assert get_codec(CODEC_ORJSON).name == CODEC_ORJSON
+    assert type(get_codec(CODEC_STDLIB)) is JsonCodec
+    codec = JsonCodec()
+    assert get_codec(codec) is codec
+    with pytest.raises(ValueError):
+        get_codec("ujson")
+
+
+@pytest.mark.parametrize("codec", [JsonCodec(), OrjsonCodec()], ids=["json", "orjson"])
+def test_round_trip(codec):
+    document = {"entityId": "HOST-1", "values": [1, 2.5, None, True], "name": "häst ✓", "nested": {"a": []}}
+    assert isinstance(codec.dumps(document), bytes)
+    assert codec.loads(codec.dumps(document)) == document
+    assert json.loads(codec.dumps_pretty(document)) == document
+
+
+def test_orjson_falls_back_to_json():
+    codec = OrjsonCodec()
+    # Integers beyond 64 bits are rejected by orjson
+    assert json.loads(codec.dumps({"big": 2 ** 70})) == {"big": 2 ** 70}
+    # NaN is not valid JSON, but the json module reads it
+    assert codec.loads(b'{"value": NaN}')["value"] != 0
+    # Non string keys are converted, like the json module does
+    assert codec.loads(codec.dumps({1: "a"})) == {"1": "a"}
+    with pytest.raises(ValueError):
+        codec.loads(b"{not json")
+
+
+@pytest.mark.parametrize("codec", [CODEC_STDLIB, CODEC_ORJSON])
+def test_request_bodies_and_responses(mock_tenant, codec):
+    mock_tenant.responses = [(200, {}, {"objectId": "abc", "big": 2 ** 40})]
+    body = [{"schemaId": "builtin:alerting.profile", "scope": "environment", "value": {"name": "ü"}}]
+    with Dynatrace(mock_tenant.url, "mock_token", codec=codec) as dt:
+        response = dt.settings.create_object(body=SettingsObjectCreate("builtin:alerting.profile", {"name": "ü"}, "environment"))
+
+    _, _, headers, sent = mock_tenant.requests[0]
+    assert headers["content-type"] == "application/json"
+    assert json.loads(sent) == body
+    assert response == {"objectId": "abc", "big": 2 ** 40}
+
+
+class CountingCodec(OrjsonCodec):
+    def __init__(self):
+        super().__init__()
+        self.calls = 0
+
+    def loads(self, data):
+        self.calls += 1
+        return super().loads(data)
+
+
+def test_responses_are_decoded_with_the_codec(mock_tenant):
+    codec = CountingCodec()
+    mock_tenant.responses = [(200, {"ETag": '"1"'}, {"values": [1, 2]}), (304, {"ETag": '"1"'}, None)]
+    client = HttpClient(mock_tenant.url, "mock_token", codec=codec, cache=HttpCache())
+    assert client.make_request("/api/config/v1/alertingProfiles").json() == {"values": [1, 2]}
+    assert codec.calls == 1
+
+    # Served from the cache, parsed once per entry
+    cached = client.make_request("/api/config/v1/alertingProfiles")
+    assert cached.from_cache
+    assert cached.json() == {"values": [1, 2]} and cached.json() is cached.json()
+    assert codec.calls == 2
+    client.close()
+
+
+def test_json_options_use_the_json_module(mock_tenant):
+    codec = CountingCodec()
+    mock_tenant.responses = [(200, {}, {"value": 1.5})]
+    client = HttpClient(mock_tenant.url, "mock_token", codec=codec)
+    response = client.make_request("/api/v2/metrics")
+    assert response.json(parse_float=str) == {"value": "1.5"}
+    assert codec.calls == 0
+    client.close()
+
+
+def test_print_bodies_uses_the_codec(mock_tenant, capsys):
+    mock_tenant.responses = [(200, {}, {})]
+    client = HttpClient(mock_tenant.url, "mock_token", print_bodies=True)
+    client.make_request("/api/v2/settings/objects", params=[{"value": {"a": 1}}], method="POST")
+    client.close()
+    method_line, body = capsys.readouterr().out.split("\n", 1)
+    assert method_line == f"POST {mock_tenant.url}/api/v2/settings/objects"
+    assert json.loads(body) == [{"value": {"a": 1}}]
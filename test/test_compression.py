@@ -0,0 +1,70 @@
+import gzip
+import json
+
+from dynatrace import Dynatrace
+from dynatrace.compression import RequestCompression, gzip_body
+from dynatrace.environment_v2.metrics import MetricIngestBatcher
+from dynatrace.http_client import HttpClient
+
+
+def _logs(count):
+    return [{"content": f"GET /api/v2/entities 200 in {i}ms", "log.source": "/var/log/app.log", "severity": "info"} for i in range(count)]
+
+
+def test_ingest_bodies_are_compressed(mock_tenant):
+    payload = _logs(100)
+    with Dynatrace(mock_tenant.url, "mock_token", compression=True) as dt:
+        dt.logs.ingest(payload)
+        dt.logs.ingest(_logs(1))
+        dt.settings.create_object(body=[])
+
+    command, path, headers, body = mock_tenant.requests[0]
+    assert headers["Content-Encoding"] == "gzip"
+    assert headers["Content-Type"] == "application/json; charset=utf-8"
+    assert headers["Accept-Encoding"] == "gzip, deflate"
+    assert json.loads(gzip.decompress(body)) == payload
+    assert len(body) < len(json.dumps(payload)) / 5
+
+    # Below the size threshold, and not an ingest endpoint
+    for _, _, headers, body in mock_tenant.requests[1:]:
+        assert "Content-Encoding" not in headers
+        json.loads(body)
+
+
+def test_metric_lines_are_compressed(mock_tenant):
+    compression = RequestCompression(min_size=10)
+    client = HttpClient(mock_tenant.url, "mock_token", compression=compression)
+    mock_tenant.responses = [(202, {}, {"linesOk": 2, "linesInvalid": 0})]
+    client.make_request("/api/v2/metrics/ingest", method="POST", data=b"my.metric 1\nmy.metric 2", headers={"Content-Type": "text/plain"})
+    client.close()
+
+    _, _, headers, body = mock_tenant.requests[0]
+    assert gzip.decompress(body) == b"my.metric 1\nmy.metric 2"
+    assert compression.compressed_requests == 1
+    assert compression.bytes_before == 23 and compression.ratio == len(body) / 23
+
+
+def test_batches_are_not_compressed_twice(mock_tenant):
+    mock_tenant.responses = [(202, {}, {"linesOk": 500, "linesInvalid": 0})]
+    client = HttpClient(mock_tenant.url, "mock_token", compression=RequestCompression(min_size=0))
+    with MetricIngestBatcher(client, max_age_seconds=None) as batcher:
+        batcher.add_lines([f"my.metric,host=host-{i} {i}" for i in range(500)])
+    client.close()
+
+    _, _, headers, body = mock_tenant.requests[0]
+    assert headers["Content-Encoding"] == "gzip"
+    assert gzip.decompress(body).decode().split("\n")[0] == "my.metric,host=host-0 0"
+    assert client.compression.compressed_requests == 0
+
+
+def test_configurable_paths():
+    compression = RequestCompression(paths=[r"^/api/config/v1/dashboards"])
+    assert compression.applies("PUT", "/api/config/v1/dashboards/abc")
+    assert not compression.applies("GET", "/api/config/v1/dashboards/abc")
+    assert not compression.applies("POST", "/api/v2/logs/ingest")
+    assert RequestCompression().applies("POST", "/api/v1/entity/infrastructure/custom/my-device")
+
+
+def test_gzip_body_is_deterministic():
+    assert gzip_body("a" * 100) == gzip_body(b"a" * 100)
+    assert gzip.decompress(gzip_body("payload")) == b"payload"
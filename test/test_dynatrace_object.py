@@ -0,0 +1,132 @@
+import sys
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+import pytest
+
+from dynatrace.dynatrace_object import DynatraceObject, LazyField, from_response
+from dynatrace.environment_v2.custom_tags import METag
+from dynatrace.environment_v2.monitored_entities import Entity
+
+RAW_ENTITY = {
+    "entityId": "HOST-82F576674F19AC16",
+    "displayName": "arch-david",
+    "type": "HOST",
+    "tags": [{"context": "CONTEXTLESS", "key": "citrix-prod", "stringRepresentation": "citrix-prod"}],
+    "fromRelationships": {"isHostOfContainer": [{"id": "DOCKER_CONTAINER_GROUP_INSTANCE-8E2ED6F4E2AFDD89", "type": "DOCKER_CONTAINER_GROUP_INSTANCE"}]},
+}
+
+
+class Decoded(DynatraceObject):
+    _lazy_fields = {
+        "name": LazyField("name", str.upper, required=True),
+        "values": LazyField("values", default=list),
+        "count": LazyField("count", default=0),
+    }
+
+
+def test_fields_are_decoded_on_first_access():
+    entity = Entity(raw_element=RAW_ENTITY)
+    decoded = Decoded(raw_element={"name": "abc"})
+    assert "name" not in vars(decoded)
+    assert decoded.name == "ABC"
+    assert vars(decoded)["name"] == "ABC"
+
+    assert entity.entity_id == "HOST-82F576674F19AC16"
+    tags = entity.tags
+    assert all(isinstance(tag, METag) for tag in tags)
+    assert entity.tags is tags
+    assert entity.from_relationships["isHostOfContainer"][0].type == "DOCKER_CONTAINER_GROUP_INSTANCE"
+    assert entity.to_relationships == {}
+    assert entity.management_zones == []
+    assert entity.icon is None
+    assert entity.first_seen is None
+
+
+def test_unread_fields_are_not_decoded():
+    # The tag is invalid (no context), this only fails when the tags are read
+    entity = Entity(raw_element=dict(RAW_ENTITY, tags=[{"key": "no-context"}]))
+    assert entity.display_name == "arch-david"
+    with pytest.raises(KeyError):
+        entity.tags
+
+
+def test_defaults_and_required_fields():
+    first, second = Decoded(raw_element={"name": "abc"}), Decoded(raw_element={})
+    assert first.name == "ABC"
+    assert first.count == 0
+    first.values.append(1)
+    assert Decoded(raw_element={"name": "def"}).values == []
+    with pytest.raises(KeyError):
+        second.name
+
+
+def test_fields_can_be_assigned():
+    entity = Entity(raw_element=RAW_ENTITY)
+    entity.display_name = "renamed"
+    assert entity.display_name == "renamed"
+    assert Entity(raw_element=RAW_ENTITY).display_name == "arch-david"
+
+
+class RawDroppingClient:
+    keep_raw_elements = False
+
+
+def test_slotted_objects_have_no_dict():
+    entity = Entity(raw_element=RAW_ENTITY)
+    assert not hasattr(entity, "__dict__")
+    with pytest.raises(AttributeError):
+        entity.unknown_attribute = 1
+    assert entity.json() is RAW_ENTITY
+
+
+def test_release_raw_elements():
+    # Only objects decoded from responses are released, objects created locally are sent with their raw element
+    assert Entity(RawDroppingClient(), {}, RAW_ENTITY).json() is RAW_ENTITY
+    entity = from_response(Entity, RawDroppingClient(), {}, RAW_ENTITY)
+    assert entity.json() is None
+    assert entity.display_name == "arch-david"
+    assert entity.tags[0].key == "citrix-prod"
+
+
+def test_released_fields_are_decoded_on_first_access():
+    raw = dict(RAW_ENTITY, unknown={"large": "member"})
+    entity = Entity(raw_element=raw)
+    tags = entity.tags
+    entity._release_raw_element()
+
+    # Nothing is decoded by the release, members no field reads and decoded fields are not kept
+    with pytest.raises(AttributeError):
+        Entity.from_relationships.slot.__get__(entity, Entity)
+    assert "unknown" not in entity._raw_element and "tags" not in entity._raw_element
+    assert entity.tags is tags
+
+    # A decoded field replaces its raw value
+    assert entity.from_relationships["isHostOfContainer"][0].id == "DOCKER_CONTAINER_GROUP_INSTANCE-8E2ED6F4E2AFDD89"
+    assert "fromRelationships" not in entity._raw_element
+    assert raw == dict(RAW_ENTITY, unknown={"large": "member"})
+
+    decoded = from_response(Decoded, RawDroppingClient(), {}, {"name": "abc", "values": [1], "other": 2})
+    assert "name" not in vars(decoded) and decoded.json() is None
+    assert (decoded.name, decoded.values, decoded.count) == ("ABC", [1], 0)
+
+
+def test_released_fields_read_by_concurrent_threads():
+    entities = [from_response(Entity, RawDroppingClient(), {}, RAW_ENTITY) for _ in range(5000)]
+    barrier = threading.Barrier(8)
+
+    def read(_):
+        barrier.wait()
+        return [entity.display_name for entity in entities]
+
+    # Switch threads as often as possible, so that threads decode the same fields at the same time
+    switch_interval = sys.getswitchinterval()
+    sys.setswitchinterval(1e-6)
+    try:
+        with ThreadPoolExecutor(max_workers=8) as executor:
+            results = list(executor.map(read, range(8)))
+    finally:
+        sys.setswitchinterval(switch_interval)
+
+    assert all(name == "arch-david" for names in results for name in names)
+    assert all(entity.display_name == "arch-david" for entity in entities)
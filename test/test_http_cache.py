@@ -0,0 +1,97 @@
+from dynatrace import Dynatrace
+from dynatrace.http_cache import CacheEntry, CachedResponse, HttpCache, MemoryCacheBackend
+from dynatrace.http_client import HttpClient
+
+PROFILES = "/api/config/v1/alertingProfiles"
+
+
+def test_not_modified_served_from_cache(mock_tenant):
+    body = {"values": [{"id": "1", "name": "profile"}]}
+    mock_tenant.responses = [(200, {"ETag": '"v1"'}, body), (304, {"ETag": '"v1"', "X-RateLimit-Remaining": "10"}, b""), (304, {}, b"")]
+    client = HttpClient(mock_tenant.url, "mock_token", cache=True)
+
+    first = client.make_request(PROFILES)
+    second = client.make_request(PROFILES)
+    third = client.make_request(PROFILES)
+    client.close()
+
+    assert first.json() == body
+    assert isinstance(second, CachedResponse) and second.status_code == 200
+    assert second.json() == body
+    # Not parsed again
+    assert second.json() is third.json()
+    assert second.headers["x-ratelimit-remaining"] == "10" and second.headers["Content-Type"] == "application/json"
+
+    assert "If-None-Match" not in mock_tenant.requests[0][2]
+    assert mock_tenant.requests[1][2]["If-None-Match"] == '"v1"'
+    assert (client.cache.hits, client.cache.misses) == (2, 1)
+
+
+def test_changed_resource_replaces_entry(mock_tenant):
+    client = HttpClient(mock_tenant.url, "mock_token", cache=True)
+    mock_tenant.responses = [
+        (200, {"Last-Modified": "Wed, 21 Oct 2015 07:28:00 GMT"}, {"version": 1}),
+        (200, {"ETag": '"v2"'}, {"version": 2}),
+        (304, {}, b""),
+    ]
+    assert client.make_request("/api/v2/settings/objects/abc").json() == {"version": 1}
+    assert client.make_request("/api/v2/settings/objects/abc").json() == {"version": 2}
+    assert client.make_request("/api/v2/settings/objects/abc").json() == {"version": 2}
+    client.close()
+
+    assert mock_tenant.requests[1][2]["If-Modified-Since"] == "Wed, 21 Oct 2015 07:28:00 GMT"
+    assert mock_tenant.requests[2][2]["If-None-Match"] == '"v2"'
+
+
+def test_only_configuration_gets_are_cached(mock_tenant):
+    mock_tenant.responses = [(200, {"ETag": '"a"'}, {}), (200, {"ETag": '"a"'}, {}), (200, {"ETag": '"a"'}, {}), (200, {"ETag": '"a"'}, {})]
+    client = HttpClient(mock_tenant.url, "mock_token", cache=True)
+    client.make_request("/api/v2/entities")
+    client.make_request("/api/v2/entities")
+    client.make_request(PROFILES, params={"id": "x"}, method="PUT")
+    client.make_request(PROFILES, headers={"If-None-Match": '"b"'})
+    client.close()
+
+    assert all("If-None-Match" not in request[2] for request in mock_tenant.requests[:3])
+    assert (client.cache.hits, client.cache.misses) == (0, 0)
+
+
+def test_key_depends_on_params_and_token():
+    key = HttpCache.key("http://tenant/api/config/v1/dashboards", {"owner": "a", "tags": None}, {"Authorization": "Api-Token 1"})
+    assert key == HttpCache.key("http://tenant/api/config/v1/dashboards", {"owner": "a"}, {"Authorization": "Api-Token 1"})
+    assert key != HttpCache.key("http://tenant/api/config/v1/dashboards", {"owner": "b"}, {"Authorization": "Api-Token 1"})
+    assert key != HttpCache.key("http://tenant/api/config/v1/dashboards", {"owner": "a"}, {"Authorization": "Api-Token 2"})
+
+
+def test_memory_lru():
+    backend = MemoryCacheBackend(max_entries=2)
+    for key in "abc":
+        backend.set(key, CacheEntry(key, None, {}, b"{}"))
+        if key == "b":
+            backend.get("a")
+    assert backend.get("a") is not None and backend.get("c") is not None
+    assert backend.get("b") is None
+
+
+def test_dynatrace_option(mock_tenant):
+    mock_tenant.responses = [(200, {"ETag": '"v1"'}, {"values": []}), (304, {}, b"")]
+    with Dynatrace(mock_tenant.url, "mock_token", cache=True) as dt:
+        assert list(dt.management_zones.list()) == []
+        assert list(dt.management_zones.list()) == []
+    assert mock_tenant.requests[1][2]["If-None-Match"] == '"v1"'
+
+
+def test_disk_backend(mock_tenant, tmp_path):
+    mock_tenant.responses = [(200, {"ETag": '"v1"'}, {"id": "dashboard"}), (304, {}, b"")]
+    first = HttpClient(mock_tenant.url, "mock_token", cache=HttpCache(directory=tmp_path))
+    first.make_request("/api/config/v1/dashboards/abc")
+    first.close()
+
+    # A new process (or client) starts with an empty memory cache and finds the entry on disk
+    second = HttpClient(mock_tenant.url, "mock_token", cache=HttpCache(directory=tmp_path))
+    assert second.make_request("/api/config/v1/dashboards/abc").json() == {"id": "dashboard"}
+    second.close()
+    assert mock_tenant.requests[1][2]["If-None-Match"] == '"v1"'
+    assert second.cache.hits == 1
+    assert not list(tmp_path.glob("*.tmp"))
+    assert "mock_token" not in "".join(path.read_text() for path in tmp_path.glob("*.cache"))
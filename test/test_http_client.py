@@ -0,0 +1,28 @@
+from dynatrace import Dynatrace
+from dynatrace.http_client import HttpClient, TOO_MANY_REQUESTS_WAIT
+
+
+def test_connections_are_reused(mock_tenant):
+    client = HttpClient(mock_tenant.url, "mock_token")
+    for _ in range(5):
+        assert client.make_request("/api/v2/entities").json() == {"path": "/api/v2/entities"}
+    client.close()
+
+    assert len(mock_tenant.requests) == 5
+    assert len(mock_tenant.connections) == 1
+
+
+def test_too_many_requests_uses_session(mock_tenant):
+    mock_tenant.responses = [(429, {"Retry-After": "0"}, {}), (200, {}, {"ok": True})]
+    client = HttpClient(mock_tenant.url, "mock_token", too_many_requests_strategy=TOO_MANY_REQUESTS_WAIT)
+
+    assert client.make_request("/api/v2/metrics").json() == {"ok": True}
+    assert len(mock_tenant.requests) == 2
+    assert len(mock_tenant.connections) == 1
+    assert mock_tenant.requests[1][2]["Authorization"] == "Api-Token mock_token"
+
+
+def test_context_manager(mock_tenant):
+    mock_tenant.responses = [(200, {}, 1621177614119)]
+    with Dynatrace(mock_tenant.url, "mock_token", pool_maxsize=4) as dt:
+        assert dt.cluster_time.time().year == 2021
@@ -0,0 +1,147 @@
+import logging
+
+import pytest
+
+from dynatrace import Dynatrace
+from dynatrace.http_client import HttpClient, DynatraceHttpError
+from dynatrace.instrumentation import (
+    HOOK_REQUEST_START,
+    HOOK_RESPONSE,
+    HOOK_RETRY,
+    HOOK_THROTTLE,
+    LatencyHistogram,
+    RequestHooks,
+    RequestStatsCollector,
+    endpoint_template,
+)
+from dynatrace.rate_limiter import RateLimiter
+from dynatrace.retry import RetryPolicy
+
+
+class Recorder:
+    def __init__(self, hooks):
+        self.calls = []
+        for hook in (HOOK_REQUEST_START, HOOK_RESPONSE, HOOK_RETRY, HOOK_THROTTLE):
+            hooks.register(hook, lambda event, hook=hook: self.calls.append((hook, event.status, event.retries, event.delay)))
+
+
+def test_endpoint_template():
+    assert endpoint_template("/api/v2/entities/HOST-0123456789ABCDEF") == "/api/v2/entities/{id}"
+    assert endpoint_template("/api/v2/metrics/builtin:host.cpu.usage") == "/api/v2/metrics/{id}"
+    assert endpoint_template("/api/v2/entityTypes/PROCESS_GROUP") == "/api/v2/entityTypes/{id}"
+    assert endpoint_template("/api/config/v1/alertingProfiles/8f5b8c9e-8a4d-4c0b-9a41-6a3c6b2b8f00/validator") == "/api/config/v1/alertingProfiles/{id}/validator"
+    assert endpoint_template("/api/v2/problems/-1719139739592062093_1623004451641V2/comments") == "/api/v2/problems/{id}/comments"
+    assert endpoint_template("/api/v2/metrics/ingest?x=1") == "/api/v2/metrics/ingest"
+
+
+def test_hooks_of_a_successful_request(mock_tenant):
+    mock_tenant.responses = [(200, {}, {"totalCount": 0, "entities": []})]
+    with Dynatrace(mock_tenant.url, "mock_token") as dt:
+        events = []
+        dt.hooks.register(HOOK_REQUEST_START, events.append)
+        dt.hooks.register(HOOK_RESPONSE, events.append)
+        dt.metrics.ingest(["my.metric 1"])
+
+    start, response = events
+    assert start is response
+    assert (response.method, response.endpoint, response.status, response.retries) == ("POST", "/api/v2/metrics/ingest", 200, 0)
+    assert response.bytes_sent == len(b"my.metric 1")
+    assert response.bytes_received == len(b'{"totalCount": 0, "entities": []}')
+    assert 0 <= response.ttfb_seconds <= response.total_seconds
+    assert response.error is None and not response.from_cache
+
+
+def test_hooks_of_retries_and_throttling(mock_tenant):
+    mock_tenant.responses = [(503, {}, {}), (429, {"Retry-After": "0"}, {}), (200, {}, {})]
+    # A frozen clock, every request after the first waits 10ms more than the previous one
+    limiter = RateLimiter(requests_per_minute=6000, burst=1, clock=lambda: 0.0)
+    client = HttpClient(mock_tenant.url, "mock_token", retry_policy=RetryPolicy(max_retries=3, base_delay_ms=1), rate_limiter=limiter)
+    recorder = Recorder(client.hooks)
+    client.make_request("/api/v2/entities/HOST-1")
+    client.close()
+
+    hooks = [call[0] for call in recorder.calls]
+    assert hooks[0] == HOOK_REQUEST_START and hooks[-1] == HOOK_RESPONSE
+    assert [call[:3] for call in recorder.calls if call[0] == HOOK_RETRY] == [(HOOK_RETRY, 503, 0), (HOOK_RETRY, 429, 1)]
+    throttles = [call[3] for call in recorder.calls if call[0] == HOOK_THROTTLE]
+    assert throttles == [pytest.approx(0.01), pytest.approx(0.02)]
+    assert recorder.calls[-1][1:3] == (200, 2)
+
+
+def test_hooks_of_failed_requests(mock_tenant):
+    mock_tenant.responses = [(404, {}, {"error": "not found"})]
+    client = HttpClient(mock_tenant.url, "mock_token")
+    events = []
+    client.hooks.register(HOOK_RESPONSE, events.append)
+    with pytest.raises(DynatraceHttpError):
+        client.make_request("/api/v2/entities/HOST-1")
+    client.close()
+
+    client = HttpClient("http://127.0.0.1:1", "mock_token")
+    client.hooks.register(HOOK_RESPONSE, events.append)
+    with pytest.raises(Exception):
+        client.make_request("/api/v2/entities/HOST-1")
+    client.close()
+
+    assert events[0].status == 404 and events[0].error is None
+    assert events[1].status is None and events[1].error is not None
+
+
+def test_failing_hooks_are_logged(mock_tenant, caplog):
+    def broken(event):
+        raise RuntimeError("broken hook")
+
+    hooks = RequestHooks(on_response=broken)
+    client = HttpClient(mock_tenant.url, "mock_token", hooks=hooks)
+    with caplog.at_level(logging.ERROR):
+        assert client.make_request("/api/v2/metrics").json() == {"path": "/api/v2/metrics"}
+    client.close()
+    assert "broken hook" in caplog.text
+    with pytest.raises(ValueError):
+        hooks.register("on_request_end", broken)
+
+
+def test_histogram():
+    histogram = LatencyHistogram((10, 100, 1000))
+    for value in [1] * 50 + [50] * 40 + [500] * 9 + [5000]:
+        histogram.add(value)
+    assert (histogram.count, histogram.min, histogram.max) == (100, 1, 5000)
+    assert histogram.counts == [50, 40, 9, 1]
+    assert histogram.percentile(50) == 10
+    assert histogram.percentile(90) == 100
+    assert histogram.percentile(99) == 1000
+    assert histogram.percentile(100) == 5000
+    assert LatencyHistogram().percentile(50) is None
+
+
+def test_collector_and_export(mock_tenant):
+    collector = RequestStatsCollector()
+    with Dynatrace(mock_tenant.url, "mock_token") as dt:
+        collector.register(dt.hooks)
+        for _ in range(3):
+            dt.metrics.ingest(["my.metric 1"])
+        mock_tenant.responses = [(400, {}, {"error": "invalid"})]
+        with pytest.raises(DynatraceHttpError):
+            dt.metrics.ingest(["invalid"])
+
+        stats = collector.stats()
+        assert len(stats) == 1
+        ingest = stats[0]
+        assert (ingest.method, ingest.endpoint, ingest.requests, ingest.errors) == ("POST", "/api/v2/metrics/ingest", 4, 1)
+        assert ingest.statuses == {200: 3, 400: 1}
+        assert ingest.bytes_sent == 3 * len("my.metric 1") + len("invalid")
+        assert ingest.latency.count == 4
+        assert collector.throughput() > 0
+
+        lines = collector.metric_lines(dimensions={"client": "test"})
+        assert 'api.client.requests,endpoint="/api/v2/metrics/ingest",method=POST,client="test" count,delta=4' in lines
+        assert any(line.startswith("api.client.request.duration,") and line.endswith(",count=4") for line in lines)
+
+        mock_tenant.requests.clear()
+        collector.export(dt.metrics, prefix="my.client")
+        _, path, _, body = mock_tenant.requests[0]
+        assert path == "/api/v2/metrics/ingest"
+        assert b'my.client.errors,endpoint="/api/v2/metrics/ingest",method=POST count,delta=1' in body.split(b"\n")
+
+    # The export itself is the only request recorded since
+    assert [(s.endpoint, s.requests) for s in collector.stats()] == [("/api/v2/metrics/ingest", 1)]
@@ -0,0 +1,112 @@
+import pytest
+
+from dynatrace import Dynatrace
+from dynatrace.environment_v2.events import EventServiceV2
+from dynatrace.environment_v2.extensions import ExtensionsServiceV2
+from dynatrace.environment_v2.metrics import MetricDescriptor, MetricService
+from dynatrace.environment_v2.monitored_entities import EntityService
+from dynatrace.environment_v2.settings import SettingService
+from dynatrace.http_client import HttpClient
+from dynatrace.metadata_cache import KIND_ENTITY_TYPE, KIND_METRIC, MetadataCache
+from dynatrace.pagination import PaginatedList
+from test.fake_clock import FakeClock
+
+
+def test_ttl_per_kind():
+    clock = FakeClock()
+    cache = MetadataCache(ttls={KIND_METRIC: 10}, default_ttl=100, clock=clock)
+    cache.put(KIND_METRIC, "builtin:host.cpu.idle", "descriptor")
+    cache.put("custom", "key", "value")
+    clock.now = 9.9
+    assert cache.get(KIND_METRIC, "builtin:host.cpu.idle") == "descriptor"
+    clock.now = 10
+    assert cache.get(KIND_METRIC, "builtin:host.cpu.idle") is None
+    assert cache.get("custom", "key") == "value"
+    assert len(cache) == 1
+
+
+def test_lru_eviction():
+    cache = MetadataCache(max_entries=2)
+    cache.put(KIND_METRIC, "a", 1)
+    cache.put(KIND_METRIC, "b", 2)
+    cache.get(KIND_METRIC, "a")
+    cache.put(KIND_METRIC, "c", 3)
+    assert cache.get(KIND_METRIC, "b") is None
+    assert (cache.get(KIND_METRIC, "a"), cache.get(KIND_METRIC, "c")) == (1, 3)
+
+
+def test_get_or_load_and_invalidate():
+    cache = MetadataCache()
+    loads = []
+
+    def loader():
+        loads.append(1)
+        return "value"
+
+    assert cache.get_or_load(KIND_METRIC, "a", loader) == "value"
+    assert cache.get_or_load(KIND_METRIC, "a", loader) == "value"
+    cache.put(KIND_ENTITY_TYPE, "HOST", "host")
+    assert len(loads) == 1
+    assert (cache.hits, cache.misses) == ({KIND_METRIC: 1}, {KIND_METRIC: 1})
+
+    cache.invalidate(KIND_METRIC, "a")
+    cache.get_or_load(KIND_METRIC, "a", loader)
+    assert len(loads) == 2
+    cache.invalidate(KIND_METRIC)
+    assert cache.get(KIND_METRIC, "a") is None and cache.get(KIND_ENTITY_TYPE, "HOST") == "host"
+    cache.invalidate()
+    assert len(cache) == 0
+
+
+def test_service_lookups_are_cached(mock_tenant):
+    mock_tenant.responses = [
+        (200, {}, {"metricId": "builtin:host.cpu.idle", "displayName": "CPU idle", "unit": "Percent"}),
+        (200, {}, {"type": "HOST", "displayName": "Host"}),
+        (200, {}, {"type": "CUSTOM_INFO", "displayName": "Custom info"}),
+        (200, {}, {"totalCount": 1, "items": [{"schemaId": "builtin:alerting.profile", "displayName": "Alerting", "latestSchemaVersion": "1"}]}),
+        (200, {}, {"type": "object"}),
+    ]
+    with Dynatrace(mock_tenant.url, "mock_token", metadata_cache=True) as dt:
+        for _ in range(3):
+            assert dt.metrics.get("builtin:host.cpu.idle").display_name == "CPU idle"
+            assert dt.entities.get_type("HOST").display_name == "Host"
+            assert dt.events_v2.get_type("CUSTOM_INFO").display_name == "Custom info"
+            assert [schema.schema_id for schema in dt.settings.list_schemas()] == ["builtin:alerting.profile"]
+            assert dt.extensions_v2.get_schema_file("1.230.0", "extension.schema.json") == {"type": "object"}
+
+    assert len(mock_tenant.requests) == 5
+    # The cached schemas are the same kind of list as without cache
+    assert isinstance(dt.settings.list_schemas(), PaginatedList)
+
+
+def test_without_cache_every_lookup_is_a_request(mock_tenant):
+    client = HttpClient(mock_tenant.url, "mock_token")
+    mock_tenant.responses = [(200, {}, {"type": "HOST", "displayName": "Host"})] * 2
+    service = EntityService(client)
+    service.get_type("HOST")
+    service.get_type("HOST")
+    client.close()
+    assert len(mock_tenant.requests) == 2
+    with pytest.raises(ValueError):
+        service.warm_up_cache()
+
+
+def test_warm_up(mock_tenant):
+    mock_tenant.responses = [
+        (200, {}, {"totalCount": 2, "metrics": [{"metricId": "builtin:host.cpu.idle", "displayName": "CPU idle"}, {"metricId": "builtin:host.cpu.user"}]}),
+        (200, {}, {"totalCount": 1, "types": [{"type": "HOST", "displayName": "Host"}]}),
+        (200, {}, {"totalCount": 1, "eventTypeInfos": [{"type": "CUSTOM_INFO", "displayName": "Custom info"}]}),
+    ]
+    client = HttpClient(mock_tenant.url, "mock_token", metadata_cache=MetadataCache())
+    dt_metrics = MetricService(client)
+    assert dt_metrics.warm_up_cache("builtin:host.*") == 2
+    assert EntityService(client).warm_up_cache() == 1
+    assert EventServiceV2(client).warm_up_cache() == 1
+    requests = len(mock_tenant.requests)
+
+    assert isinstance(dt_metrics.get("builtin:host.cpu.idle"), MetricDescriptor)
+    assert EntityService(client).get_type("HOST").display_name == "Host"
+    assert EventServiceV2(client).get_type("CUSTOM_INFO").display_name == "Custom info"
+    assert len(mock_tenant.requests) == requests
+    assert "fields=%2BdisplayName" in mock_tenant.requests[0][1]
+    client.close()
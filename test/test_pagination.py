@@ -0,0 +1,200 @@
+import json
+import threading
+
+import pytest
+
+from dynatrace.dynatrace_object import DynatraceObject
+from dynatrace.pagination import PaginatedList, HeaderPaginatedList
+
+
+class Item(DynatraceObject):
+    def _create_from_raw_data(self, raw_element):
+        self.id = raw_element["id"]
+
+
+class PageResponse:
+    def __init__(self, json_data, headers=None):
+        self.json_data = json_data
+        self.headers = headers or {}
+
+    def json(self):
+        return self.json_data
+
+
+class PagedClient:
+    """Serves `pages` pages of `page_size` items, using nextPageKey in the body or next-page-key in the headers"""
+
+    def __init__(self, pages, page_size=2, header_pagination=False, prefetch_pages=0):
+        self.pages = pages
+        self.page_size = page_size
+        self.header_pagination = header_pagination
+        self.prefetch_pages = prefetch_pages
+        self.requested = []
+        self.lock = threading.Lock()
+
+    def make_request(self, path, params=None, headers=None, **kwargs):
+        page = int((params or {}).get("nextPageKey", 0))
+        with self.lock:
+            self.requested.append(page)
+        items = [{"id": page * self.page_size + i} for i in range(self.page_size)]
+        next_page_key = str(page + 1) if page + 1 < self.pages else None
+        if self.header_pagination:
+            headers = {"total-count": str(self.pages * self.page_size)}
+            if next_page_key:
+                headers["next-page-key"] = next_page_key
+            return PageResponse(items, headers)
+        body = {"totalCount": self.pages * self.page_size}
+        if next_page_key:
+            body["nextPageKey"] = next_page_key
+        body["items"] = items
+        return PageResponse(body)
+
+
+@pytest.mark.parametrize("prefetch_pages", [0, 1, 3])
+def test_iterate_all_pages(prefetch_pages):
+    client = PagedClient(pages=5)
+    items = PaginatedList(Item, client, "/items", list_item="items", prefetch_pages=prefetch_pages)
+    assert [item.id for item in items] == list(range(10))
+    assert client.requested == [0, 1, 2, 3, 4]
+
+
+def test_prefetch_requests_next_page_while_consuming():
+    client = PagedClient(pages=3, prefetch_pages=1)
+    items = iter(PaginatedList(Item, client, "/items", list_item="items"))
+
+    next(items)
+    next(items)
+    # The consumer is still on the first page, the second one is being fetched in the background
+    assert next(items).id == 2
+    for _ in range(50):
+        if len(client.requested) == 3:
+            break
+        threading.Event().wait(0.01)
+    assert client.requested == [0, 1, 2]
+
+
+def test_prefetch_stops_when_consumer_stops():
+    client = PagedClient(pages=100, prefetch_pages=2)
+    for item in PaginatedList(Item, client, "/items", list_item="items"):
+        if item.id == 3:
+            break
+    threading.Event().wait(0.3)
+    # first page, the current one and at most the buffered pages plus the one blocked on the full buffer
+    assert len(client.requested) <= 6
+
+
+def test_prefetch_propagates_errors():
+    class FailingClient(PagedClient):
+        def make_request(self, path, params=None, headers=None, **kwargs):
+            if params and params.get("nextPageKey") == "2":
+                raise Exception("Error making request")
+            return super().make_request(path, params, headers, **kwargs)
+
+    client = FailingClient(pages=5, prefetch_pages=2)
+    with pytest.raises(Exception, match="Error making request"):
+        list(PaginatedList(Item, client, "/items", list_item="items"))
+
+
+def test_header_paginated_list_prefetch():
+    client = PagedClient(pages=4, header_pagination=True)
+    items = HeaderPaginatedList(Item, client, "/items", prefetch_pages=2)
+    assert [item.id for item in items] == list(range(8))
+
+
+def test_header_paginated_list_length():
+    # The total-count header is a string
+    items = HeaderPaginatedList(Item, PagedClient(pages=4, header_pagination=True), "/items")
+    assert len(items) == 8
+
+    class NoTotalCount:
+        def make_request(self, path, params=None, headers=None, **kwargs):
+            return PageResponse([{"id": 0}, {"id": 1}], {})
+
+    assert len(HeaderPaginatedList(Item, NoTotalCount(), "/items")) == 2
+
+
+@pytest.mark.parametrize("paginated_list_class", [PaginatedList, HeaderPaginatedList])
+def test_lazy_first_page(paginated_list_class):
+    header_pagination = paginated_list_class is HeaderPaginatedList
+    client = PagedClient(pages=2, header_pagination=header_pagination)
+    kwargs = {} if header_pagination else {"list_item": "items"}
+    items = paginated_list_class(Item, client, "/items", **kwargs)
+    assert client.requested == []
+
+    assert items.prefetch() is items
+    assert client.requested == [0]
+    items.prefetch()
+    assert client.requested == [0]
+
+    assert [item.id for item in items] == [0, 1, 2, 3]
+    assert client.requested == [0, 1]
+
+
+def test_len_fetches_first_page():
+    client = PagedClient(pages=3)
+    items = PaginatedList(Item, client, "/items", list_item="items")
+    assert len(items) == 6
+    assert client.requested == [0]
+
+
+class StreamedPageResponse(PageResponse):
+    def __init__(self, json_data, headers=None):
+        super().__init__(json_data, headers)
+        self.closed = False
+
+    def iter_content(self, chunk_size):
+        raw = json.dumps(self.json_data).encode()
+        for i in range(0, len(raw), 5):
+            yield raw[i : i + 5]
+
+    def close(self):
+        self.closed = True
+
+
+def test_stream_pages():
+    class StreamedClient(PagedClient):
+        def make_request(self, path, params=None, headers=None, stream=False, **kwargs):
+            assert stream
+            response = super().make_request(path, params, headers, **kwargs)
+            self.last_response = StreamedPageResponse(response.json_data)
+            return self.last_response
+
+    client = StreamedClient(pages=3, prefetch_pages=2)
+    items = PaginatedList(Item, client, "/items", list_item="items", stream=True)
+    assert len(items) == 6
+    assert client.requested == [0]
+
+    assert [item.id for item in items] == list(range(6))
+    assert client.requested == [0, 1, 2]
+    assert client.last_response.closed
+
+
+@pytest.mark.parametrize("prefetch_pages", [0, 2])
+def test_iterations_are_independent(prefetch_pages):
+    client = PagedClient(pages=3, prefetch_pages=prefetch_pages)
+    items = PaginatedList(Item, client, "/items", list_item="items")
+    first = iter(items)
+    assert [next(first).id for _ in range(3)] == [0, 1, 2]
+    # A second iteration starts over, the first page is not requested again
+    assert [item.id for item in items] == list(range(6))
+    assert [item.id for item in first] == [3, 4, 5]
+    assert sorted(client.requested) == [0, 1, 1, 2, 2]
+
+
+def test_shared_list_iterated_by_threads():
+    client = PagedClient(pages=20)
+    items = PaginatedList(Item, client, "/items", list_item="items")
+    results = []
+    barrier = threading.Barrier(8)
+
+    def consume():
+        barrier.wait()
+        results.append([item.id for item in items])
+
+    threads = [threading.Thread(target=consume) for _ in range(8)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    assert results == [list(range(40))] * 8
+    assert client.requested.count(0) == 1
@@ -0,0 +1,90 @@
+import time
+
+import pytest
+
+from dynatrace import Dynatrace
+from dynatrace.http_client import HttpClient
+from dynatrace.rate_limiter import RateLimiter, get_rate_limiter, rate_limits
+from test.fake_clock import FakeClock
+
+
+def test_not_paced_until_the_limit_is_known():
+    limiter = RateLimiter(clock=FakeClock(1000.0))
+    assert limiter.limit is None
+    assert all(limiter.reserve() == 0 for _ in range(1000))
+
+
+def test_token_bucket():
+    clock = FakeClock(1000.0)
+    limiter = RateLimiter(requests_per_minute=60, burst=2, clock=clock)
+    assert limiter.rate == 1
+
+    # The burst is available right away, then requests are spaced by one second and queue up behind each other
+    assert [limiter.reserve() for _ in range(4)] == [0, 0, 1, 2]
+    assert limiter.throttled_requests == 2 and limiter.throttled_seconds == 3
+
+    clock.now += 10
+    # Waiting for the queued requests refilled the bucket, it never holds more than the burst
+    assert [limiter.reserve() for _ in range(3)] == [0, 0, 1]
+
+
+def test_primed_from_headers():
+    clock = FakeClock(1000.0)
+    limiter = RateLimiter(clock=clock)
+    limiter.update_from_headers({"X-RateLimit-Limit": "120", "X-RateLimit-Remaining": "1"})
+
+    assert limiter.limit == 120 and limiter.remaining == 1
+    assert limiter.reserve() == 0
+    assert limiter.reserve() == pytest.approx(0.5)
+
+
+def test_exhausted_window_waits_for_reset():
+    clock = FakeClock(1000.0)
+    limiter = RateLimiter(requests_per_minute=600, clock=clock)
+    reset_us = int((time.time() + 30) * 1_000_000)
+    limiter.update_from_headers({"x-ratelimit-limit": "600", "x-ratelimit-remaining": "0", "x-ratelimit-reset": str(reset_us)})
+
+    assert limiter.reserve() == pytest.approx(30, abs=1)
+    clock.now += 31
+    assert limiter.reserve() == 0
+
+
+def test_retry_after_blocks_even_without_limit():
+    clock = FakeClock(1000.0)
+    limiter = RateLimiter(clock=clock)
+    limiter.update_from_headers({"Retry-After": "3"})
+    assert limiter.reserve() == 3
+    clock.now += 3
+    assert limiter.reserve() == 0
+
+
+def test_shared_per_tenant(mock_tenant):
+    base_url = mock_tenant.url
+    mock_tenant.responses = [(200, {"X-RateLimit-Limit": "600", "X-RateLimit-Remaining": "599"}, {"ok": True})]
+
+    first = HttpClient(base_url, "mock_token", rate_limiter=True)
+    second = Dynatrace(f"{base_url}/", "another_token", rate_limiter=True)
+    assert first.rate_limiter is get_rate_limiter(base_url)
+    assert rate_limits()[base_url.lower()] is first.rate_limiter
+
+    first.make_request("/api/v2/metrics")
+    limiter = get_rate_limiter(base_url)
+    assert limiter.limit == 600 and limiter.remaining == 599
+    first.close()
+    second.close()
+
+
+def test_client_waits_for_the_limiter(mock_tenant):
+    limiter = RateLimiter(requests_per_minute=600, burst=1)
+    client = HttpClient(mock_tenant.url, "mock_token", rate_limiter=limiter)
+    start = time.monotonic()
+    for _ in range(3):
+        client.make_request("/api/v2/metrics")
+    client.close()
+    # One request is sent right away, the next two are spaced by 100ms
+    assert time.monotonic() - start >= 0.19
+    assert limiter.throttled_requests == 2
+
+
+def test_disabled_by_default():
+    assert HttpClient("http://localhost", "mock_token").rate_limiter is None
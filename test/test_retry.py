@@ -0,0 +1,103 @@
+from email.utils import formatdate
+
+import pytest
+
+from dynatrace import Dynatrace
+from dynatrace.http_client import HttpClient, DynatraceHttpError
+from dynatrace.retry import RetryPolicy, parse_retry_after
+from test.fake_clock import FakeClock
+
+
+def test_retryable_statuses_and_methods():
+    policy = RetryPolicy(idempotent_posts=[r"/api/v2/entities/query$"])
+    assert policy.is_retryable("GET", "/api/v2/metrics", 503)
+    assert policy.is_retryable("delete", "/api/v2/tags", 429)
+    for status in (400, 401, 403, 404, 413):
+        assert not policy.is_retryable("GET", "/api/v2/metrics", status)
+    assert not policy.is_retryable("POST", "/api/v2/metrics/ingest", 503)
+    assert policy.is_retryable("POST", "/api/v2/entities/query", 503)
+    assert RetryPolicy().is_retryable("POST", "/api/config/v1/alertingProfiles/validator", 500)
+
+
+def test_decorrelated_jitter():
+    for value in (0.0, 0.5, 0.999):
+        policy = RetryPolicy(base_delay_ms=100, max_delay_ms=1000, random_func=lambda: value)
+        delay = None
+        for _ in range(10):
+            previous, delay = delay, policy.backoff(delay)
+            assert 0.1 <= delay <= 1.0
+            assert delay <= max((previous or 0.1) * 3, 0.1)
+
+    # The upper bound grows with the previous delay until it reaches the cap
+    policy = RetryPolicy(base_delay_ms=100, max_delay_ms=1000, random_func=lambda: 1.0)
+    assert [round(d, 3) for d in _delays(policy, 4)] == [0.3, 0.9, 1.0, 1.0]
+
+
+def _delays(policy, count):
+    delays, delay = [], None
+    for _ in range(count):
+        delay = policy.backoff(delay)
+        delays.append(delay)
+    return delays
+
+
+def test_retry_state_limits_and_stats():
+    policy = RetryPolicy(max_retries=2, base_delay_ms=10, random_func=lambda: 0)
+    retry = policy.start("GET", "/api/v2/metrics")
+    assert retry.next_delay(503) == pytest.approx(0.01)
+    assert retry.next_delay(429, {"Retry-After": "7"}) == 7
+    assert retry.next_delay(503) is None
+
+    permanent = policy.start("GET", "/api/v2/metrics")
+    assert permanent.next_delay(404) is None
+    policy.start("GET", "/api/v2/metrics").finish()
+
+    stats = policy.stats
+    assert (stats.requests, stats.retries, stats.retried_requests, stats.exhausted) == (3, 2, 1, 1)
+    assert stats.retries_by_status == {503: 1, 429: 1}
+
+
+def test_deadline():
+    clock = FakeClock()
+    policy = RetryPolicy(max_retries=10, base_delay_ms=1000, deadline_seconds=5, random_func=lambda: 0, clock=clock)
+    retry = policy.start("GET", "/api/v2/metrics")
+    assert retry.next_delay(503) == 1
+    clock.now = 4.5
+    assert retry.next_delay(503) is None
+    assert policy.stats.exhausted == 1
+
+
+def test_parse_retry_after():
+    assert parse_retry_after("12") == 12
+    assert parse_retry_after("soon") is None
+    assert parse_retry_after(formatdate(1000 + 30, usegmt=True), now=1000) == 30
+    assert parse_retry_after(formatdate(1000, usegmt=True), now=2000) == 0
+
+
+def test_client_retries_transient_errors(mock_tenant):
+    mock_tenant.responses = [(503, {}, {}), (429, {"Retry-After": "0"}, {}), (200, {}, {"ok": True})]
+    client = HttpClient(mock_tenant.url, "mock_token", retries=3)
+    assert client.make_request("/api/v2/metrics").json() == {"ok": True}
+    assert len(mock_tenant.requests) == 3
+    assert client.retry_policy.stats.retries == 2
+    client.close()
+
+
+def test_client_does_not_retry_client_errors(mock_tenant):
+    mock_tenant.responses = [(404, {}, {"error": "not found"}), (200, {}, {})]
+    client = HttpClient(mock_tenant.url, "mock_token", retries=3)
+    with pytest.raises(DynatraceHttpError) as error:
+        client.make_request("/api/v2/entities/HOST-1")
+    assert error.value.response.status_code == 404
+    assert len(mock_tenant.requests) == 1
+    client.close()
+
+
+def test_client_does_not_retry_post(mock_tenant):
+    mock_tenant.responses = [(503, {}, {}), (200, {}, {})]
+    policy = RetryPolicy(max_retries=3, base_delay_ms=0)
+    with Dynatrace(mock_tenant.url, "mock_token", retry_policy=policy) as dt:
+        with pytest.raises(DynatraceHttpError):
+            dt.metrics.ingest(["my.metric 1"])
+    assert len(mock_tenant.requests) == 1
+    assert policy.stats.requests == 1 and policy.stats.retries == 0
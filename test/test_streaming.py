@@ -0,0 +1,74 @@
+import json
+
+import pytest
+
+from dynatrace import streaming
+from dynatrace.streaming import JsonListStream
+
+PAGE = {
+    "totalCount": 3,
+    "nextPageKey": "next",
+    "entities": [{"entityId": "HOST-1", "tags": [{"key": "é"}]}, {"entityId": "HOST-2", "value": 1.5}, [1, [2]], 3, "text", None],
+    "pageSize": 50,
+    "warnings": ["w", {"nested": {}}],
+}
+
+parsers = [False, pytest.param(True, marks=pytest.mark.skipif(streaming.ijson is None, reason="ijson is not installed"))]
+
+
+def chunked(document, size):
+    raw = json.dumps(document, ensure_ascii=False).encode()
+    return [raw[i : i + size] for i in range(0, len(raw), size)]
+
+
+@pytest.mark.parametrize("use_ijson", parsers)
+@pytest.mark.parametrize("chunk_size", [1, 3, 64, 10000])
+def test_stream_list_items(use_ijson, chunk_size):
+    stream = JsonListStream(chunked(PAGE, chunk_size), "entities", use_ijson=use_ijson)
+
+    assert stream.read_until_list()
+    assert stream.top_level == {"totalCount": 3, "nextPageKey": "next"}
+
+    assert list(stream) == PAGE["entities"]
+    assert stream.top_level == {key: value for key, value in PAGE.items() if key != "entities"}
+
+
+@pytest.mark.parametrize("use_ijson", parsers)
+@pytest.mark.parametrize("document", [{}, {"totalCount": 0}, {"entities": []}, {"entities": [], "nextPageKey": None}])
+def test_stream_without_elements(use_ijson, document):
+    stream = JsonListStream(chunked(document, 2), "entities", use_ijson=use_ijson)
+    assert list(stream) == []
+    assert stream.top_level == {key: value for key, value in document.items() if key != "entities"}
+
+
+@pytest.mark.parametrize("use_ijson", parsers)
+def test_stream_elements_are_decoded_incrementally(use_ijson):
+    received = []
+
+    def chunks():
+        for chunk in chunked(PAGE, 8):
+            received.append(chunk)
+            yield chunk
+
+    stream = iter(JsonListStream(chunks(), "entities", use_ijson=use_ijson))
+    assert next(stream) == PAGE["entities"][0]
+    assert len(b"".join(received)) < len(json.dumps(PAGE).encode())
+
+
+NUMBERS = {"totalCount": 12345, "entities": [1.5, -123, 2.5e-10, 1e20, 0, -0.25, 123456789012, 3.0], "score": -98.75}
+
+
+@pytest.mark.parametrize("use_ijson", parsers)
+def test_stream_numbers_cut_by_chunks(use_ijson):
+    # Every chunk size, so each number is cut at every position ("1." of 1.5, "2.5e" of 2.5e-10, "-12" of -123)
+    raw = json.dumps(NUMBERS, separators=(",", ":")).encode()
+    for chunk_size in range(1, len(raw) + 1):
+        chunks = [raw[i : i + chunk_size] for i in range(0, len(raw), chunk_size)]
+        stream = JsonListStream(chunks, "entities", use_ijson=use_ijson)
+        assert list(stream) == NUMBERS["entities"], chunk_size
+        assert stream.top_level == {"totalCount": 12345, "score": -98.75}, chunk_size
+
+
+def test_invalid_json():
+    with pytest.raises(ValueError):
+        list(JsonListStream([b'{"entities": [1, 2'], "entities", use_ijson=False))
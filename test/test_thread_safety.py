@@ -0,0 +1,62 @@
+import random
+from concurrent.futures import ThreadPoolExecutor
+from urllib.parse import parse_qs, urlparse
+
+from dynatrace.environment_v2.metrics import MetricService
+from dynatrace.environment_v2.monitored_entities import EntityService
+from dynatrace.http_client import HttpClient
+
+PAGES = 4
+PAGE_SIZE = 25
+
+
+def route(command, path, headers, body):
+    """Entities in pages (the page key is the page number) and metric ingestion, echoing what was received"""
+    url = urlparse(path)
+    query = parse_qs(url.query)
+    if url.path == "/api/v2/entities":
+        page = int(query.get("nextPageKey", ["0"])[0])
+        entities = [{"entityId": f"HOST-{page * PAGE_SIZE + i:016X}", "displayName": f"host-{page * PAGE_SIZE + i}"} for i in range(PAGE_SIZE)]
+        payload = {"totalCount": PAGES * PAGE_SIZE, "pageSize": PAGE_SIZE, "entities": entities}
+        if page + 1 < PAGES:
+            payload["nextPageKey"] = str(page + 1)
+        return 200, {}, payload
+    if url.path == "/api/v2/metrics/ingest":
+        return 202, {}, {"linesOk": len(body.split(b"\n")), "linesInvalid": 0, "echo": body.decode()}
+    return 200, {}, {"path": path, "token": headers.get("Authorization"), "marker": headers.get("X-Marker")}
+
+
+def test_one_client_shared_by_many_threads(mock_tenant):
+    mock_tenant.route = route
+    expected_ids = [f"HOST-{i:016X}" for i in range(PAGES * PAGE_SIZE)]
+    shared_headers = {"X-Marker": "shared"}
+
+    client = HttpClient(mock_tenant.url, "mock_token", pool_maxsize=16)
+    entities, metrics = EntityService(client), MetricService(client)
+    shared_list = entities.list('type("HOST")')
+
+    def task(i):
+        kind = i % 4
+        if kind == 0:
+            return [e.entity_id for e in entities.list('type("HOST")')] == expected_ids
+        if kind == 1:
+            return [e.entity_id for e in shared_list] == expected_ids
+        if kind == 2:
+            lines = [f"my.metric,worker={i},n={n} {random.random()}" for n in range(random.randint(1, 20))]
+            response = metrics.ingest(lines)
+            return response["echo"] == "\n".join(lines) and response["linesOk"] == len(lines)
+        response = client.make_request(f"/api/v2/things/{i}", headers=shared_headers).json()
+        return response == {"path": f"/api/v2/things/{i}", "token": "Api-Token mock_token", "marker": "shared"}
+
+    with ThreadPoolExecutor(max_workers=16) as executor:
+        results = list(executor.map(task, range(400)))
+    client.close()
+
+    assert all(results)
+    # The caller's headers are not modified by the requests
+    assert shared_headers == {"X-Marker": "shared"}
+    # One connection pool, shared by the threads
+    assert len(mock_tenant.connections) <= 16
+    # The first page of the shared list was requested once
+    first_pages = [path for _, path, _, _ in mock_tenant.requests if path.startswith("/api/v2/entities?") and "nextPageKey" not in path]
+    assert len(first_pages) == 100 + 1
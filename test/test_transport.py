@@ -0,0 +1,76 @@
+from concurrent.futures import ThreadPoolExecutor
+
+import pytest
+
+httpx = pytest.importorskip("httpx")
+
+from dynatrace import Dynatrace
+from dynatrace.http_client import HttpClient, DynatraceHttpError
+from dynatrace.transport import HttpxTransport, RequestsTransport
+
+
+def _entity(entity_id):
+    return {"entityId": entity_id, "displayName": entity_id.lower(), "type": "HOST"}
+
+
+def test_default_transport():
+    client = HttpClient("http://localhost", "mock_token")
+    assert isinstance(client.transport, RequestsTransport)
+    assert client.session is client.transport.session
+    client.close()
+
+
+def test_unknown_transport():
+    with pytest.raises(ValueError):
+        HttpClient("http://localhost", "mock_token", transport="spdy")
+
+
+def test_http2_transport_by_name():
+    pytest.importorskip("h2")
+    client = HttpClient("http://localhost", "mock_token", transport="http2")
+    assert isinstance(client.transport, HttpxTransport)
+    assert client.session is None
+    client.close()
+
+
+def test_httpx_transport(mock_tenant):
+    mock_tenant.responses = [
+        (200, {}, {"totalCount": 3, "nextPageKey": "page2", "entities": [_entity("HOST-1"), _entity("HOST-2")]}),
+        (200, {}, {"totalCount": 3, "entities": [_entity("HOST-3")]}),
+        (202, {}, {"linesOk": 1, "linesInvalid": 0}),
+        (404, {}, {"error": "not found"}),
+    ]
+    with Dynatrace(mock_tenant.url, "mock_token", transport=HttpxTransport(http2=False)) as dt:
+        entities = dt.entities.list('type("HOST")', stream=True)
+        assert [e.entity_id for e in entities] == ["HOST-1", "HOST-2", "HOST-3"]
+        assert dt.metrics.ingest(["my.metric 1"]) == {"linesOk": 1, "linesInvalid": 0}
+        with pytest.raises(DynatraceHttpError) as error:
+            dt.metrics.get("builtin:host.cpu.idle")
+        assert error.value.response.status_code == 404
+
+    first_path = mock_tenant.requests[0][1]
+    assert "entitySelector=type" in first_path and "time" not in first_path
+    command, path, headers, body = mock_tenant.requests[2]
+    assert (command, body) == ("POST", b"my.metric 1")
+    assert headers["Authorization"] == "Api-Token mock_token"
+    assert len(mock_tenant.connections) == 1
+
+
+def test_http2_multiplexing():
+    pytest.importorskip("h2")
+    from test.h2_server import H2Server
+
+    server = H2Server(delay=0.2)
+    client = HttpClient(server.url, "mock_token", transport=HttpxTransport(http1=False))
+    try:
+        with ThreadPoolExecutor(max_workers=10) as executor:
+            responses = list(executor.map(lambda i: client.make_request(f"/api/v2/entities/HOST-{i}"), range(10)))
+    finally:
+        client.close()
+        server.close()
+
+    assert [r.json() for r in responses] == [{"path": f"/api/v2/entities/HOST-{i}"} for i in range(10)]
+    assert all(r.http_version == "HTTP/2" for r in responses)
+    # All the requests were in flight at the same time, over a single connection
+    assert server.connections == 1
+    assert server.max_in_flight > 1